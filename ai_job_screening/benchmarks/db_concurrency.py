@@ -0,0 +1,255 @@
+"""
+Concurrency benchmark for the database layer of the request handlers.
+
+Serves the same read-mostly handler twice on a scratch copy of the schema:
+once the way the handlers used to do it, an async endpoint calling the
+synchronous Session (every query blocks the event loop), and once through
+the AsyncSession used now. Each variant runs under uvicorn in a background
+thread while concurrent clients on the main thread drive it over HTTP, mixed
+with requests to an endpoint that does not touch the database at all, so a
+blocked server loop shows up in the latency of those requests too. A
+background writer holds short write transactions the way resume parsing and
+imports do, so handler commits sometimes have to wait for the lock.
+
+    python -m ai_job_screening.benchmarks.db_concurrency --concurrency 8 --requests 2000
+"""
+
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from ai_job_screening.src.database.database import set_sqlite_pragmas
+from ai_job_screening.src.database.models import Base, Candidate, CandidateMatch, JobDescription
+
+def seed(db_path: Path, jobs: int, candidates: int, matches_per_job: int) -> None:
+    Base.metadata.create_all(create_engine(f"sqlite:///{db_path}"))
+    random.seed(0)
+    conn = sqlite3.connect(str(db_path))
+    conn.executemany(
+        "INSERT INTO job_descriptions (title, company, description, required_skills) VALUES (?, ?, ?, ?)",
+        [(f"Job {i}", "Bench", "Python developer " * 50, '["python"]') for i in range(jobs)]
+    )
+    conn.executemany(
+        "INSERT INTO candidates (name, email, resume_text, skills) VALUES (?, ?, ?, ?)",
+        [(f"Candidate {i}", f"c{i}@example.com", "resume text " * 500, '["python"]') for i in range(candidates)]
+    )
+    conn.executemany(
+        "INSERT INTO candidate_matches (job_id, candidate_id, match_score, shortlisted) VALUES (?, ?, ?, ?)",
+        (
+            (job_id, random.randint(1, candidates), score, score >= 0.7)
+            for job_id in range(1, jobs + 1)
+            for score in (random.random() for _ in range(matches_per_job))
+        )
+    )
+    conn.commit()
+    conn.close()
+
+def top_matches_query(job_id: int):
+    return select(
+        CandidateMatch.id, CandidateMatch.candidate_id, CandidateMatch.match_score, Candidate.name
+    ).join(Candidate, Candidate.id == CandidateMatch.candidate_id).where(
+        CandidateMatch.job_id == job_id
+    ).order_by(CandidateMatch.match_score.desc(), CandidateMatch.id.desc()).limit(20)
+
+def sync_app(db_path: Path, pool_size: int) -> FastAPI:
+    """The pattern the handlers used before: async endpoints on a blocking Session"""
+    # The pool has to cover every in-flight request: a blocking checkout that
+    # waits for a connection would stall the loop that has to release it
+    engine = create_engine(
+        f"sqlite:///{db_path}", connect_args={"check_same_thread": False}, pool_size=pool_size
+    )
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/jobs/{job_id}/top")
+    async def top(job_id: int, write: bool = False, db: Session = Depends(get_db)):
+        job = db.get(JobDescription, job_id)
+        rows = db.execute(top_matches_query(job_id)).all()
+        if write and rows:
+            match = db.get(CandidateMatch, rows[-1].id)
+            match.match_score = round(match.match_score, 3)
+            db.commit()
+        return {"job": job.title, "matches": len(rows)}
+
+    return app
+
+def async_app(db_path: Path, pool_size: int) -> FastAPI:
+    """The pattern the handlers use now: AsyncSession over aiosqlite"""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}", poolclass=AsyncAdaptedQueuePool, pool_size=pool_size
+    )
+    event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+    AsyncSessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def get_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/jobs/{job_id}/top")
+    async def top(job_id: int, write: bool = False, db: AsyncSession = Depends(get_db)):
+        job = await db.get(JobDescription, job_id)
+        rows = (await db.execute(top_matches_query(job_id))).all()
+        if write and rows:
+            match = await db.get(CandidateMatch, rows[-1].id)
+            match.match_score = round(match.match_score, 3)
+            await db.commit()
+        return {"job": job.title, "matches": len(rows)}
+
+    app.router.on_shutdown.append(engine.dispose)
+    return app
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+async def drive(base_url: str, jobs: int, concurrency: int, requests: int,
+                write_ratio: float, ping_ratio: float) -> Dict:
+    latencies: Dict[str, List[float]] = {"db": [], "ping": []}
+    rng = random.Random(1)
+    plan = [
+        ("ping", "/ping") if rng.random() < ping_ratio
+        else ("db", f"/jobs/{rng.randint(1, jobs)}/top" + ("?write=true" if rng.random() < write_ratio else ""))
+        for _ in range(requests)
+    ]
+    queue = iter(plan)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # Warm up connections and caches before measuring
+        await asyncio.gather(*(client.get("/jobs/1/top") for _ in range(concurrency)))
+
+        async def worker():
+            for kind, url in queue:
+                start = time.perf_counter()
+                response = await client.get(url)
+                response.raise_for_status()
+                latencies[kind].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    result = {"requests": requests, "seconds": round(elapsed, 3), "requests_per_second": round(requests / elapsed, 1)}
+    for kind, values in latencies.items():
+        if values:
+            result[kind] = {
+                "count": len(values),
+                "p50_ms": round(statistics.median(values), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "max_ms": round(max(values), 2)
+            }
+    return result
+
+def background_writer(db_path: Path, hold_ms: float, interval_ms: float, stop: threading.Event) -> None:
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
+    conn.execute("PRAGMA busy_timeout=5000")
+    while not stop.is_set():
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE job_descriptions SET company = company WHERE id = 1")
+        time.sleep(hold_ms / 1000)
+        conn.execute("COMMIT")
+        stop.wait(interval_ms / 1000)
+    conn.close()
+
+def run_variant(app: FastAPI, db_path: Path, port: int, writer_hold_ms: float,
+                writer_interval_ms: float, **kwargs) -> Dict:
+    """Serve the app from a background thread and drive it from this one"""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    stop = threading.Event()
+    writer = threading.Thread(
+        target=background_writer, args=(db_path, writer_hold_ms, writer_interval_ms, stop), daemon=True
+    )
+    if writer_hold_ms > 0:
+        writer.start()
+    try:
+        return asyncio.run(drive(f"http://127.0.0.1:{port}", **kwargs))
+    finally:
+        stop.set()
+        if writer.is_alive():
+            writer.join()
+        server.should_exit = True
+        thread.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="p99 latency of sync vs async database sessions under concurrency")
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--matches-per-job", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--write-ratio", type=float, default=0.05, help="Share of database requests that also commit")
+    parser.add_argument("--ping-ratio", type=float, default=0.2, help="Share of requests that do not touch the database")
+    parser.add_argument("--writer-hold-ms", type=float, default=20,
+                        help="How long the background writer holds the write lock, 0 to disable")
+    parser.add_argument("--writer-interval-ms", type=float, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        seed(db_path, args.jobs, args.candidates, args.matches_per_job)
+        options = dict(
+            jobs=args.jobs, concurrency=args.concurrency, requests=args.requests,
+            write_ratio=args.write_ratio, ping_ratio=args.ping_ratio, port=args.port,
+            writer_hold_ms=args.writer_hold_ms, writer_interval_ms=args.writer_interval_ms
+        )
+        results = {
+            "sync_session": run_variant(sync_app(db_path, args.concurrency), db_path, **options),
+            "async_session": run_variant(async_app(db_path, args.concurrency), db_path, **options)
+        }
+
+    print(f"{'variant':<15} {'endpoint':<8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'req/s':>8}")
+    for variant, result in results.items():
+        for kind in ("db", "ping"):
+            if kind in result:
+                stats = result[kind]
+                print(
+                    f"{variant:<15} {kind:<8} {stats['p50_ms']:>8} {stats['p95_ms']:>8} "
+                    f"{stats['p99_ms']:>8} {stats['max_ms']:>8} {result['requests_per_second']:>8}"
+                )
+    if args.json:
+        args.json.write_text(json.dumps({"options": vars(args) | {"json": str(args.json)}, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
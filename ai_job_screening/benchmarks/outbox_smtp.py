@@ -0,0 +1,224 @@
+"""
+Outbox sender against a local stand-in SMTP server.
+
+Starts an aiosmtpd server that requires AUTH LOGIN/PLAIN and refuses one
+recipient with 550, then runs OutboxSender with the application's
+SMTPMailer over a scratch copy of the email_outbox table:
+
+1. a burst of invitations is delivered in batches over a single connection
+2. the refused recipient fails on its first attempt without any retry
+3. after the server restarts, the next batch reconnects once
+4. emails queued while the server is down wait and go out once it is back
+
+Each phase checks its outcome; the script exits non-zero when one fails.
+
+    python -m ai_job_screening.benchmarks.outbox_smtp --emails 500
+"""
+
+from pathlib import Path
+from typing import Callable, Dict
+import argparse
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import time
+import warnings
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from ai_job_screening.src.agents.interview_scheduler import InterviewScheduler
+from ai_job_screening.src.database.database import set_sqlite_pragmas
+from ai_job_screening.src.database.models import Base, EmailOutbox
+from ai_job_screening.src.database.outbox import OutboxSender
+
+USERNAME = "hr@bench.example.com"
+PASSWORD = "bench-secret"
+REFUSED = "nobody@bench.example.com"
+
+class RecordingHandler:
+    """Accepts every recipient except REFUSED and records deliveries per connection"""
+
+    def __init__(self):
+        self.delivered = []
+        self.connections = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == REFUSED:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered.extend(envelope.rcpt_tos)
+        self.connections.add(session.peer)
+        return "250 OK"
+
+# The stand-in server takes AUTH without TLS on purpose, the mailer is run with SMTP_STARTTLS=false
+warnings.filterwarnings("ignore", message="Requiring AUTH while not requiring TLS")
+
+def authenticate(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=auth_data.login == USERNAME.encode() and auth_data.password == PASSWORD.encode())
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class StandInServer:
+    """aiosmtpd controllers cannot be restarted, so each start builds a new one on the same port"""
+
+    def __init__(self, handler: RecordingHandler, port: int):
+        self.handler = handler
+        self.port = port
+        self.controller = None
+
+    def start(self) -> None:
+        self.controller = Controller(
+            self.handler, hostname="127.0.0.1", port=self.port,
+            authenticator=authenticate, auth_required=True, auth_require_tls=False
+        )
+        self.controller.start()
+
+    def stop(self) -> None:
+        if self.controller is not None:
+            self.controller.stop()
+            self.controller = None
+
+async def wait_for(condition: Callable[[], bool], timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        await asyncio.sleep(0.05)
+    return condition()
+
+async def run(args, db_path: Path) -> Dict:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    handler = RecordingHandler()
+    server = StandInServer(handler, free_port())
+    server.start()
+    # Configured through the same settings as the application
+    os.environ.update(
+        SMTP_SERVER="127.0.0.1", SMTP_PORT=str(server.port), SMTP_STARTTLS="false",
+        SENDER_EMAIL=USERNAME, SENDER_PASSWORD=PASSWORD
+    )
+    scheduler = InterviewScheduler()
+    mailer = scheduler.create_mailer()
+    sender = OutboxSender(
+        session_factory, mailer, scheduler.build_message,
+        batch_size=args.batch_size, max_attempts=3, retry_delay=0.2, poll_interval=0.2, batch_window=0.05
+    )
+
+    async def queue(recipients) -> None:
+        async with session_factory() as db:
+            for recipient in recipients:
+                sender.add(db, recipient, "Interview Invitation", "<p>Benchmark invitation</p>")
+            await db.commit()
+        sender.notify()
+
+    async def counts() -> Dict[str, int]:
+        async with session_factory() as db:
+            return await sender.counts(db)
+
+    results = {}
+    checks = {}
+    await sender.start()
+    try:
+        # 1. Burst over one connection
+        recipients = [f"candidate{i}@bench.example.com" for i in range(args.emails)]
+        start = time.perf_counter()
+        await queue(recipients + [REFUSED])
+        await wait_for(lambda: len(handler.delivered) >= args.emails, args.timeout)
+        elapsed = time.perf_counter() - start
+        results["burst"] = {
+            "emails": args.emails,
+            "seconds": round(elapsed, 3),
+            "emails_per_second": round(args.emails / elapsed, 1),
+            "smtp_connections_opened": mailer.connections_opened,
+            "server_connections": len(handler.connections)
+        }
+        checks["burst delivered"] = len(handler.delivered) == args.emails
+        checks["burst used one connection"] = mailer.connections_opened == 1 and len(handler.connections) == 1
+
+        # 2. The 550 recipient fails for good on its first attempt
+        async def refused_row():
+            async with session_factory() as db:
+                return (await db.execute(select(EmailOutbox).where(EmailOutbox.recipient == REFUSED))).scalar()
+        refused = await refused_row()
+        for _ in range(int(args.timeout / 0.05)):
+            if refused.status == "failed":
+                break
+            await asyncio.sleep(0.05)
+            refused = await refused_row()
+        results["refused"] = {"status": refused.status, "attempts": refused.attempts, "error": refused.error}
+        checks["550 failed without retry"] = refused.status == "failed" and refused.attempts == 1
+
+        # 3. The server restarts and drops the connection; the next batch reconnects
+        server.stop()
+        server.start()
+        await queue([f"after-restart{i}@bench.example.com" for i in range(10)])
+        await wait_for(lambda: len(handler.delivered) >= args.emails + 10, args.timeout)
+        results["restart"] = {"smtp_connections_opened": mailer.connections_opened}
+        checks["restart reconnected once"] = (
+            len(handler.delivered) == args.emails + 10 and mailer.connections_opened == 2
+        )
+
+        # 4. Emails queued while the server is down are retried once it is back
+        server.stop()
+        await queue([f"while-down{i}@bench.example.com" for i in range(10)])
+        await asyncio.sleep(0.5)
+        results["while_down"] = await counts()
+        server.start()
+        await wait_for(lambda: len(handler.delivered) >= args.emails + 20, args.timeout)
+        checks["queued while down delivered"] = len(handler.delivered) == args.emails + 20
+        # The sender records a batch after delivering it
+        expected = {"pending": 0, "sending": 0, "sent": args.emails + 20, "failed": 1}
+        deadline = time.monotonic() + args.timeout
+        results["final"] = await counts()
+        while results["final"] != expected and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            results["final"] = await counts()
+        checks["final counts"] = results["final"] == expected
+    finally:
+        await sender.stop()
+        server.stop()
+        await engine.dispose()
+    return {"results": results, "checks": checks}
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the outbox sender against a local stand-in SMTP server")
+    parser.add_argument("--emails", type=int, default=200, help="Invitations in the initial burst")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds each phase may take")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = asyncio.run(run(args, Path(tmp) / "outbox.db"))
+
+    burst = report["results"]["burst"]
+    print(
+        f"burst: {burst['emails']} emails in {burst['seconds']}s ({burst['emails_per_second']}/s), "
+        f"{burst['smtp_connections_opened']} SMTP connection(s)"
+    )
+    print(f"refused recipient: {report['results']['refused']}")
+    print(f"final outbox counts: {report['results']['final']}")
+    for name, passed in report["checks"].items():
+        print(f"{'ok  ' if passed else 'FAIL'} {name}")
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    if not all(report["checks"].values()):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
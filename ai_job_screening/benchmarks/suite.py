@@ -0,0 +1,440 @@
+"""
+Reproducible benchmark suite over the bundled dataset.
+
+Measures, each with warm-up and repeat statistics:
+
+- parse.<format>: CVParser.parse throughput for PDF, DOCX and TXT resumes
+- match.calculate_match: MatchingEngine.calculate_match pairs per second
+- rank.full_pool: ranking latency of one job over the whole candidate pool
+- import.resumes / import.jobs: import_dataset bulk import throughput, and
+  import.resumes_unchanged for a re-run the manifest turns into a no-op
+- api.*: end-to-end /job-descriptions/, /candidates/, /match and ranking
+  latency through an in-process ASGI client, with the LLM stubbed out
+
+Everything runs against a scratch data directory (JOB_SCREENING_DATA_DIR),
+never the application's own database. Results are written as JSON together
+with the commit and machine they were taken on; --compare diffs two result
+files and exits non-zero when a benchmark regressed past the threshold.
+
+    python -m ai_job_screening.benchmarks.suite --out bench.json
+    python -m ai_job_screening.benchmarks.suite --only parse,match --repeats 10
+    python -m ai_job_screening.benchmarks.suite --compare before.json after.json
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, List
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+REPO_ROOT = PACKAGE_DIR.parent
+SRC_DIR = PACKAGE_DIR / "src"
+DATASET_DIR = PACKAGE_DIR / "dataset"
+RESUMES_DIR = DATASET_DIR / "resumes"
+JOBS_CSV = DATASET_DIR / "job_description.csv"
+
+SECTIONS = ["parse", "match", "rank", "import", "api"]
+
+def summarize(samples: List[float]) -> Dict:
+    ordered = sorted(samples)
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+    return {
+        "n": len(ordered),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "max": ordered[-1]
+    }
+
+def throughput_result(fn: Callable[[], None], ops: int, unit: str, warmup: int, repeats: int,
+                      before_each: Callable[[], None] = None) -> Dict:
+    """Run fn warmup + repeats times; the headline value is ops per second of the median run"""
+    times = []
+    for run in range(warmup + repeats):
+        if before_each is not None:
+            before_each()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        if run >= warmup:
+            times.append(elapsed)
+    run_stats = summarize(times)
+    return {
+        "value": ops / run_stats["median"],
+        "unit": unit,
+        "higher_is_better": True,
+        "ops_per_run": ops,
+        "run_seconds": run_stats
+    }
+
+def latency_result(samples_ms: List[float]) -> Dict:
+    """Per-operation latencies; the headline value is the median in milliseconds"""
+    stats = summarize(samples_ms)
+    return {
+        "value": stats["median"],
+        "unit": "ms",
+        "higher_is_better": False,
+        "latency_ms": stats
+    }
+
+def git_revision() -> Dict:
+    def git(*args):
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, timeout=30
+            ).stdout.strip()
+        except Exception:
+            return ""
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+def load_jobs(limit: int) -> List[Dict]:
+    """Job dicts as stored by the importer, for the first `limit` rows of the dataset CSV"""
+    from ai_job_screening.src.agents.skill_vocabulary import extract_job_requirements
+    from import_dataset import read_job_csv
+
+    jobs = []
+    for _, row in read_job_csv(JOBS_CSV).head(limit).iterrows():
+        description = str(row["Job Description"])
+        requirements = extract_job_requirements(description)
+        jobs.append({
+            "description": description,
+            "required_skills": json.dumps(requirements["required_skills"]),
+            "required_experience": requirements["required_experience"],
+            "required_qualifications": json.dumps(requirements["required_qualifications"])
+        })
+    return jobs
+
+def bench_parse(args, workdir: Path) -> Dict:
+    import docx
+    from ai_job_screening.src.agents.cv_parser import CVParser
+
+    parser = CVParser()
+    pdfs = sorted(RESUMES_DIR.glob("*.pdf"))[:args.resumes]
+
+    # The same resumes as DOCX and TXT, so the formats are compared on equal content
+    formats_dir = workdir / "formats"
+    formats_dir.mkdir(exist_ok=True)
+    docx_files, txt_files = [], []
+    for pdf in pdfs:
+        text = parser.parse(str(pdf))["raw_text"]
+        txt_path = formats_dir / f"{pdf.stem}.txt"
+        txt_path.write_text(text, encoding="utf-8")
+        txt_files.append(txt_path)
+        document = docx.Document()
+        for line in text.splitlines():
+            document.add_paragraph(line)
+        docx_path = formats_dir / f"{pdf.stem}.docx"
+        document.save(str(docx_path))
+        docx_files.append(docx_path)
+
+    results = {}
+    for name, files in (("pdf", pdfs), ("docx", docx_files), ("txt", txt_files)):
+        results[f"parse.{name}"] = throughput_result(
+            lambda files=files: [parser.parse(str(path)) for path in files],
+            len(files), "files/s", args.warmup, args.repeats
+        )
+    return results
+
+def parsed_candidates(limit: int) -> List[Dict]:
+    """Candidate fields for the first `limit` dataset resumes, shaped like the database rows"""
+    from ai_job_screening.src.agents.cv_parser import CVParser
+    from import_dataset import candidate_fields
+
+    parser = CVParser()
+    candidates = []
+    for pdf in sorted(RESUMES_DIR.glob("*.pdf"))[:limit]:
+        fields = candidate_fields(pdf.stem, parser.parse(str(pdf)))
+        candidates.append({
+            "resume_text": fields["resume_text"],
+            "skills": fields["skills"],
+            "experience_years": fields["experience_years"],
+            "qualifications": fields["qualifications"]
+        })
+    return candidates
+
+def bench_match(args, workdir: Path) -> Dict:
+    from ai_job_screening.src.agents.matching_engine import MatchingEngine
+
+    engine = MatchingEngine()
+    jobs = load_jobs(args.jobs)
+    candidates = parsed_candidates(args.resumes)
+
+    def run():
+        for job in jobs:
+            for candidate in candidates:
+                engine.calculate_match(job, candidate)
+
+    return {
+        "match.calculate_match": throughput_result(
+            run, len(jobs) * len(candidates), "pairs/s", args.warmup, args.repeats
+        )
+    }
+
+def bench_rank(args, workdir: Path) -> Dict:
+    from ai_job_screening.src.agents.matching_engine import MatchingEngine
+
+    engine = MatchingEngine()
+    jobs = load_jobs(args.jobs)
+    for job in jobs:
+        job["tf_vector"] = engine.vectorizer.transform(job["description"].lower())
+    # Stored features of the dataset resumes, repeated up to the pool size
+    features = [engine.extract_features(candidate) for candidate in parsed_candidates(len(list(RESUMES_DIR.glob("*.pdf"))))]
+    pool = [
+        {"id": candidate_id, "name": f"Candidate {candidate_id}", "email": None,
+         "features": features[candidate_id % len(features)]}
+        for candidate_id in range(args.pool_size)
+    ]
+
+    latencies = []
+    for run in range(args.warmup + args.repeats):
+        for job in jobs:
+            start = time.perf_counter()
+            engine.rank_candidates(job, pool, k=50)
+            if run >= args.warmup:
+                latencies.append((time.perf_counter() - start) * 1000)
+    result = latency_result(latencies)
+    result["pool_size"] = args.pool_size
+    return {"rank.full_pool": result}
+
+def bench_import(args, workdir: Path) -> Dict:
+    import import_dataset
+    from sqlalchemy import text
+    from ai_job_screening.src.database.database import DATA_DIR, engine, add_missing_columns
+    from ai_job_screening.src.database.models import Base
+
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(Base.metadata)
+    resume_count = len(list(RESUMES_DIR.glob("*.pdf")))
+    job_count = len(import_dataset.read_job_csv(JOBS_CSV))
+
+    def reset():
+        with engine.begin() as conn:
+            for table in ("import_manifest", "candidate_features", "candidates", "job_descriptions"):
+                conn.execute(text(f"DELETE FROM {table}"))
+        # Parsed resumes are cached by content hash; a cold import has to parse them again
+        shutil.rmtree(DATA_DIR / "parse_cache", ignore_errors=True)
+
+    results = {
+        "import.resumes": throughput_result(
+            lambda: import_dataset.import_resumes_bulk(RESUMES_DIR, workers=args.import_workers),
+            resume_count, "files/s", args.warmup, args.repeats, before_each=reset
+        ),
+        "import.jobs": throughput_result(
+            lambda: import_dataset.import_job_descriptions_bulk(JOBS_CSV),
+            job_count, "rows/s", args.warmup, args.repeats, before_each=reset
+        )
+    }
+    # Re-running over an unchanged dataset only checks the manifest
+    import_dataset.import_resumes_bulk(RESUMES_DIR, workers=args.import_workers)
+    results["import.resumes_unchanged"] = throughput_result(
+        lambda: import_dataset.import_resumes_bulk(RESUMES_DIR, workers=args.import_workers),
+        resume_count, "files/s", args.warmup, args.repeats
+    )
+    results["import.resumes"]["workers"] = args.import_workers
+    return results
+
+class StubLLM:
+    """Stands in for ollama.AsyncClient: fixed answers after a fixed delay"""
+
+    ANALYSIS = "SCORE: 0.82\nREASONING: Strong overlap between the required skills and the resume."
+    QUESTIONS = "1. Describe a recent project.\n2. How do you test your code?\n3. How do you handle deadlines?"
+
+    def __init__(self, latency_ms: float):
+        import httpx
+        self.latency = latency_ms / 1000
+        self._client = httpx.AsyncClient()
+
+    async def chat(self, model, messages, stream=False, **kwargs):
+        await asyncio.sleep(self.latency)
+        content = self.QUESTIONS if "question" in messages[-1]["content"].lower() else self.ANALYSIS
+        if stream:
+            async def parts():
+                for word in content.split(" "):
+                    yield {"message": {"content": word + " "}}
+            return parts()
+        return {"message": {"content": content}}
+
+def bench_api(args, workdir: Path) -> Dict:
+    import httpx
+    import import_dataset
+
+    # main is written to run from src/ with src-relative imports
+    sys.path.insert(0, str(SRC_DIR))
+    import main
+
+    main.ai_matcher.client = StubLLM(args.llm_latency_ms)
+    # The candidate pool the ranking endpoint scores, loaded before startup builds the indexes
+    main.Base.metadata.create_all(bind=main.engine)
+    main.add_missing_columns(main.Base.metadata)
+    import_dataset.import_resumes_bulk(RESUMES_DIR, workers=args.import_workers)
+    # Uploads of the same files would otherwise be parse cache hits
+    for entry in main.parse_cache.cache_dir.glob("*.json"):
+        entry.unlink()
+    jobs = load_jobs(1)
+    uploads = sorted(RESUMES_DIR.glob("*.pdf"))[:args.api_requests + args.warmup_requests]
+
+    async def timed(samples: List[float], record: bool, request):
+        start = time.perf_counter()
+        response = await request
+        elapsed = (time.perf_counter() - start) * 1000
+        response.raise_for_status()
+        if record:
+            samples.append(elapsed)
+        return response
+
+    async def run():
+        await main.app.router.startup()
+        latencies = {name: [] for name in ("create_job", "upload_candidate", "match", "match_stored", "ranking")}
+        try:
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+                job_ids = []
+                for i in range(args.warmup_requests + args.api_requests):
+                    response = await timed(latencies["create_job"], i >= args.warmup_requests, client.post(
+                        "/job-descriptions/",
+                        data={"title": f"Benchmark job {i}", "company": "Bench", "description": jobs[0]["description"]}
+                    ))
+                    job_ids.append(response.json()["job_id"])
+                job_id = job_ids[0]
+
+                # The in-process transport returns once the app is done, background parsing included
+                candidate_ids = []
+                for i, pdf in enumerate(uploads):
+                    with open(pdf, "rb") as f:
+                        content = f.read()
+                    response = await timed(latencies["upload_candidate"], i >= args.warmup_requests, client.post(
+                        "/candidates/",
+                        data={"name": f"Upload {i}", "email": f"upload-{i}@bench.example.com"},
+                        files={"resume": (pdf.name, content, "application/pdf")}
+                    ))
+                    candidate_ids.append(response.json()["candidate_id"])
+
+                # A new pair per request so every /match goes through scoring, the LLM and the insert
+                for i, candidate_id in enumerate(candidate_ids):
+                    await timed(latencies["match"], i >= args.warmup_requests,
+                                client.post(f"/match/{job_id}/{candidate_id}"))
+                for i, candidate_id in enumerate(candidate_ids):
+                    await timed(latencies["match_stored"], i >= args.warmup_requests,
+                                client.post(f"/match/{job_id}/{candidate_id}"))
+
+                for i in range(args.warmup_requests + args.api_requests):
+                    await timed(latencies["ranking"], i >= args.warmup_requests,
+                                client.get(f"/jobs/{job_id}/ranking", params={"k": 50}))
+        finally:
+            await main.app.router.shutdown()
+        return latencies
+
+    latencies = asyncio.run(run())
+    results = {f"api.{name}": latency_result(samples) for name, samples in latencies.items()}
+    for result in results.values():
+        result["llm_latency_ms"] = args.llm_latency_ms
+    results["api.ranking"]["pool_size"] = len(main.skill_index)
+    return results
+
+def compare(base_path: Path, new_path: Path, threshold: float) -> int:
+    base = json.loads(base_path.read_text())
+    new = json.loads(new_path.read_text())
+    print(f"base: {base['meta']['git']['commit'][:12]}  new: {new['meta']['git']['commit'][:12]}")
+    base_settings, new_settings = base["meta"]["settings"], new["meta"]["settings"]
+    differing = sorted(key for key in base_settings.keys() | new_settings.keys()
+                       if key != "only" and base_settings.get(key) != new_settings.get(key))
+    if differing:
+        print(f"warning: the runs used different settings ({', '.join(differing)}), results may not be comparable")
+    print(f"{'benchmark':<28} {'base':>12} {'new':>12} {'unit':>9} {'change':>8}")
+    regressions = 0
+    for name in sorted(set(base["results"]) | set(new["results"])):
+        if name not in base["results"] or name not in new["results"]:
+            print(f"{name:<28} {'only in ' + ('base' if name in base['results'] else 'new'):>34}")
+            continue
+        old_result, new_result = base["results"][name], new["results"][name]
+        change = new_result["value"] / old_result["value"] - 1 if old_result["value"] else 0.0
+        worse = -change if new_result["higher_is_better"] else change
+        flag = "  REGRESSION" if worse > threshold else ""
+        regressions += bool(flag)
+        print(
+            f"{name:<28} {old_result['value']:>12.3f} {new_result['value']:>12.3f} "
+            f"{new_result['unit']:>9} {change:>+8.1%}{flag}"
+        )
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite over the bundled dataset")
+    parser.add_argument("--out", type=Path, default=Path("benchmark-results.json"), help="Where to write the JSON results")
+    parser.add_argument("--only", default=",".join(SECTIONS), help=f"Comma separated sections to run: {', '.join(SECTIONS)}")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs before the measured ones")
+    parser.add_argument("--repeats", type=int, default=5, help="Measured runs per benchmark")
+    parser.add_argument("--resumes", type=int, default=20, help="Dataset resumes used by the parse and match benchmarks")
+    parser.add_argument("--jobs", type=int, default=20, help="Dataset jobs used by the match and rank benchmarks")
+    parser.add_argument("--pool-size", type=int, default=5000, help="Candidates in the ranking pool")
+    parser.add_argument("--import-workers", type=int, default=1)
+    parser.add_argument("--api-requests", type=int, default=20, help="Measured requests per API endpoint")
+    parser.add_argument("--warmup-requests", type=int, default=3)
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="Delay of the stubbed LLM per call")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("BASE", "NEW"), help="Compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(*args.compare, args.threshold))
+
+    sections = [section.strip() for section in args.only.split(",") if section.strip()]
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        parser.error(f"Unknown sections: {', '.join(sorted(unknown))}")
+    out_path = args.out.resolve()
+
+    # Point every database, cache and upload directory at a scratch directory before
+    # anything from the application is imported, and work from there
+    workdir = Path(tempfile.mkdtemp(prefix="job-screening-bench-"))
+    os.environ["JOB_SCREENING_DATA_DIR"] = str(workdir / "data")
+    os.chdir(workdir)
+    sys.path.insert(0, str(REPO_ROOT))
+
+    benchmarks = {"parse": bench_parse, "match": bench_match, "rank": bench_rank, "import": bench_import, "api": bench_api}
+    results = {}
+    try:
+        for section in sections:
+            # The application logs at INFO per request and per row; keep that out of the timings
+            logging.getLogger().setLevel(logging.WARNING)
+            start = time.perf_counter()
+            results.update(benchmarks[section](args, workdir))
+            print(f"{section}: done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    import numpy
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": numpy.__version__,
+            "settings": {key: value for key, value in vars(args).items() if key not in ("out", "compare", "threshold")}
+        },
+        "results": results
+    }
+    out_path.write_text(json.dumps(report, indent=2))
+
+    print(f"{'benchmark':<28} {'value':>12} {'unit':>9}")
+    for name, result in results.items():
+        print(f"{name:<28} {result['value']:>12.3f} {result['unit']:>9}")
+    print(f"Results written to {out_path}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
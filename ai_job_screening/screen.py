@@ -0,0 +1,334 @@
+"""
+Offline screening of every job in a CSV against every resume in a folder.
+
+Resumes are parsed across processes with CVParser (through the parse cache)
+and turned into MatchingEngine features, then scored against all jobs at once
+in batches of candidates: each score component is a matrix product over a
+skill vocabulary or a shared qualification / keyword vocabulary, so a batch of candidates
+is scored against thousands of jobs in a handful of BLAS calls. Only the
+running top k per job is kept, so memory does not grow with the pool.
+No server, database or LLM is involved.
+
+    python -m ai_job_screening.screen --jobs ai_job_screening/dataset/job_description.csv \
+        --resumes ai_job_screening/dataset/resumes --out top_candidates.csv
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+import argparse
+import importlib.util
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from ai_job_screening.src.agents.cv_parser import CVParser
+from ai_job_screening.src.agents.matching_engine import MatchingEngine
+from ai_job_screening.src.agents.parse_cache import ParseCache, hash_file
+from ai_job_screening.src.database.database import DATA_DIR
+from ai_job_screening.src.agents.skill_vocabulary import SKILL_VOCABULARY, extract_job_requirements
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESUME_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+def load_jobs(csv_path: Path) -> List[Dict]:
+    """Read jobs from a CSV with 'Job Title' and 'Job Description' columns"""
+    df = None
+    for encoding in ['utf-8', 'latin1', 'cp1252', 'ISO-8859-1']:
+        try:
+            df = pd.read_csv(csv_path, encoding=encoding)
+            break
+        except UnicodeDecodeError:
+            logger.warning(f"Failed to decode {csv_path} with {encoding}, trying next encoding")
+    if df is None:
+        raise ValueError(f"Could not decode {csv_path}")
+    if 'Job Title' not in df.columns or 'Job Description' not in df.columns:
+        raise ValueError("CSV must contain columns: 'Job Title', 'Job Description'")
+
+    jobs = []
+    for _, row in df.iterrows():
+        title, description = row['Job Title'], row['Job Description']
+        if pd.isna(title) or pd.isna(description) or not str(title).strip() or not str(description).strip():
+            continue
+        jobs.append({"title": str(title).strip(), "description": str(description), **extract_job_requirements(str(description))})
+    return jobs
+
+class JobVocabulary:
+    """
+    Every qualification and keyword required by any of the jobs, each with a
+    column number. Skills need no such table, their columns are the skill
+    vocabulary ids. Small enough to hand to every parsing process.
+    """
+
+    def __init__(self, prepared_jobs: List[Dict]):
+        self.quals = self._vocab(p["required_qualifications"] for p in prepared_jobs)
+        self.keywords = self._vocab((k for k, _ in p["keywords"]) for p in prepared_jobs)
+        # Keywords are also found through the resume's token hashes
+        self.keyword_hashes: Dict[int, List[int]] = {}
+        for p in prepared_jobs:
+            for k, k_hash in p["keywords"]:
+                cols = self.keyword_hashes.setdefault(k_hash, [])
+                if self.keywords[k] not in cols:
+                    cols.append(self.keywords[k])
+
+    @staticmethod
+    def _vocab(item_sets) -> Dict[str, int]:
+        vocab: Dict[str, int] = {}
+        for items in item_sets:
+            for item in items:
+                vocab.setdefault(item, len(vocab))
+        return vocab
+
+    def candidate_columns(self, features: Dict) -> Tuple[List[int], List[int], List[int]]:
+        """Columns a candidate has, for the skill, qualification and keyword matrices"""
+        skills = SKILL_VOCABULARY.ids(features["skills"])
+        quals = [self.quals[q] for q in features["qualifications"] if q in self.quals]
+        keywords = {self.keywords[k] for k in features["keywords"] if k in self.keywords}
+        for token_hash in features["token_hashes"]:
+            keywords.update(self.keyword_hashes.get(token_hash, ()))
+        return skills, quals, sorted(keywords)
+
+class JobMatrices:
+    """
+    The job side of MatchingEngine.score_features for many jobs at once.
+    Every set a job is compared against becomes a 0/1 column over the shared
+    vocabulary, so "how many of job j's items does candidate i have" is
+    entry (i, j) of a candidate-by-vocabulary times vocabulary-by-job product.
+    """
+
+    def __init__(self, engine: MatchingEngine, jobs: List[Dict]):
+        prepared = [engine.prepare_job(job) for job in jobs]
+        self.n_jobs = len(prepared)
+        self.vocabulary = JobVocabulary(prepared)
+
+        # Skill bitsets unpacked into 0/1 columns, so the overlap popcount of every pair is one product
+        self.skills = np.zeros((len(SKILL_VOCABULARY), self.n_jobs), dtype=np.float32)
+        for j, p in enumerate(prepared):
+            self.skills[SKILL_VOCABULARY.ids(p["required_skills"]), j] = 1.0
+        self.quals = self._incidence(self.vocabulary.quals, [p["required_qualifications"] for p in prepared])
+        self.keywords = self._incidence(self.vocabulary.keywords, [[k for k, _ in p["keywords"]] for p in prepared])
+        self.skill_counts = self.skills.sum(axis=0)
+        self.qual_counts = self.quals.sum(axis=0)
+        self.keyword_counts = self.keywords.sum(axis=0)
+        self.required_experience = np.array([p["required_experience"] for p in prepared], dtype=np.float32)
+
+        vectors = np.stack([p["tf_vector"] for p in prepared]).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = vectors / np.where(norms > 0, norms, 1)
+
+    def _incidence(self, vocab: Dict[str, int], job_items: List) -> np.ndarray:
+        matrix = np.zeros((max(len(vocab), 1), self.n_jobs), dtype=np.float32)
+        for j, items in enumerate(job_items):
+            for item in items:
+                matrix[vocab[item], j] = 1.0
+        return matrix
+
+    def score(self, batch: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Scores of a batch of candidates against every job, the same as
+        MatchingEngine.score_features with keyword-overlap scoring.
+        Returns (scores, components), shaped (batch, jobs) and (batch, jobs, 5)
+        with components skills, experience, qualifications, keywords, semantic.
+        """
+        n = len(batch)
+        cand_skills = np.zeros((n, len(self.skills)), dtype=np.float32)
+        cand_quals = np.zeros((n, len(self.quals)), dtype=np.float32)
+        cand_keywords = np.zeros((n, len(self.keywords)), dtype=np.float32)
+        for i, candidate in enumerate(batch):
+            cand_skills[i, candidate["skill_cols"]] = 1.0
+            cand_quals[i, candidate["qual_cols"]] = 1.0
+            cand_keywords[i, candidate["keyword_cols"]] = 1.0
+        experience = np.array([c["experience_years"] for c in batch], dtype=np.float32)[:, None]
+        vectors = np.stack([c["tf_vector"] for c in batch])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            skill = np.where(self.skill_counts > 0, (cand_skills @ self.skills) / self.skill_counts, 0.0)
+            required = self.required_experience[None, :]
+            exp = np.where(
+                required > 0,
+                np.minimum(1.2, experience / np.where(required > 0, required, 1)),
+                (experience > 0).astype(np.float32)
+            )
+            qual = np.where(self.qual_counts > 0, (cand_quals @ self.quals) / self.qual_counts, 1.0)
+            keyword = np.where(self.keyword_counts > 0, (cand_keywords @ self.keywords) / self.keyword_counts, 0.0)
+        semantic = vectors @ self.vectors.T
+
+        final = skill * 0.5 + exp * 0.3 + qual * 0.1 + keyword * 0.1
+        bonus = (skill > 0.8) & (exp > 1.0) & (qual > 0.8)
+        final = np.where(bonus, np.minimum(1.0, final * 1.1), final)
+        return final.astype(np.float32), np.stack([skill, exp, qual, keyword, semantic], axis=2).astype(np.float32)
+
+class TopK:
+    """Running top k candidates for every job, merged one batch at a time"""
+
+    def __init__(self, k: int, n_jobs: int):
+        self.k = k
+        self.scores = np.zeros((0, n_jobs), dtype=np.float32)
+        self.indices = np.zeros((0, n_jobs), dtype=np.int64)
+        self.components = np.zeros((0, n_jobs, 5), dtype=np.float32)
+
+    def merge(self, scores: np.ndarray, components: np.ndarray, first_index: int) -> None:
+        indices = np.broadcast_to(np.arange(first_index, first_index + len(scores))[:, None], scores.shape)
+        all_scores = np.concatenate([self.scores, scores])
+        all_indices = np.concatenate([self.indices, indices])
+        all_components = np.concatenate([self.components, components])
+        if len(all_scores) > self.k:
+            keep = np.argpartition(-all_scores, self.k - 1, axis=0)[:self.k]
+            all_scores = np.take_along_axis(all_scores, keep, axis=0)
+            all_indices = np.take_along_axis(all_indices, keep, axis=0)
+            all_components = np.take_along_axis(all_components, keep[:, :, None], axis=0)
+        self.scores, self.indices, self.components = all_scores, all_indices, all_components
+
+# Per-process state for parsing resumes
+_worker_parser = None
+_worker_cache = None
+_worker_engine = None
+_worker_vocabulary = None
+
+def _init_worker(vocabulary: JobVocabulary):
+    global _worker_parser, _worker_cache, _worker_engine, _worker_vocabulary
+    _worker_parser = CVParser()
+    _worker_cache = ParseCache(DATA_DIR / "parse_cache", parser_version=_worker_parser.cache_version)
+    _worker_engine = MatchingEngine()
+    _worker_vocabulary = vocabulary
+
+def _candidate_worker(resume_path: str) -> Dict:
+    """
+    Parse one resume and reduce its features to vocabulary columns, so only
+    a few small arrays travel back to the main process
+    """
+    path = Path(resume_path)
+    try:
+        data = _worker_cache.parse(_worker_parser, resume_path, hash_file(resume_path))
+        error = None
+    except Exception as e:
+        data = {}
+        error = str(e)
+    experience = data.get('experience') or {}
+    features = _worker_engine.extract_features({
+        "resume_text": data.get('raw_text', ''),
+        "skills": data.get('skills', []),
+        "experience_years": experience.get('years', 0),
+        "qualifications": data.get('qualifications', [])
+    })
+    skill_cols, qual_cols, keyword_cols = _worker_vocabulary.candidate_columns(features)
+    vector = features["tf_vector"]
+    norm = float(np.linalg.norm(vector))
+    return {
+        "file": path.name,
+        "name": data.get('name', f"Candidate_{path.stem}"),
+        "email": data.get('email', ''),
+        "error": error,
+        "skill_cols": skill_cols,
+        "qual_cols": qual_cols,
+        "keyword_cols": keyword_cols,
+        "experience_years": features["experience_years"],
+        "tf_vector": (vector / norm if norm else vector).astype(np.float32)
+    }
+
+def write_results(jobs: List[Dict], candidates: List[Dict], top: TopK, out_path: Path) -> int:
+    order = np.argsort(-top.scores, axis=0, kind="stable")
+    rows = []
+    for j, job in enumerate(jobs):
+        for rank, position in enumerate(order[:, j], start=1):
+            score = float(top.scores[position, j])
+            candidate = candidates[top.indices[position, j]]
+            skill, exp, qual, keyword, semantic = top.components[position, j].tolist()
+            rows.append({
+                "job_index": j,
+                "job_title": job["title"],
+                "rank": rank,
+                "resume_file": candidate["file"],
+                "candidate_name": candidate["name"],
+                "candidate_email": candidate["email"],
+                "match_score": round(score, 4),
+                "skills": round(skill, 4),
+                "experience": round(exp, 4),
+                "qualifications": round(qual, 4),
+                "keywords": round(keyword, 4),
+                "semantic": round(semantic, 4),
+                "shortlisted": score >= 0.7
+            })
+
+    df = pd.DataFrame(rows)
+    if out_path.suffix.lower() == ".parquet":
+        df.to_parquet(out_path, index=False)
+    else:
+        df.to_csv(out_path, index=False)
+    return len(rows)
+
+def screen(jobs_csv: Path, resumes_dir: Path, out_path: Path, k: int = 10,
+           workers: int = os.cpu_count() or 1, batch_size: int = 1024) -> int:
+    start_time = time.perf_counter()
+    jobs = load_jobs(jobs_csv)
+    if not jobs:
+        raise ValueError(f"No jobs found in {jobs_csv}")
+    job_matrices = JobMatrices(MatchingEngine(), jobs)
+    logger.info(
+        f"Loaded {len(jobs)} jobs ({int(job_matrices.skills.any(axis=1).sum())} skills, "
+        f"{len(job_matrices.vocabulary.keywords)} keywords, {len(job_matrices.vocabulary.quals)} qualifications)"
+    )
+
+    resume_paths = sorted(str(p) for p in resumes_dir.iterdir() if p.suffix.lower() in RESUME_EXTENSIONS)
+    top = TopK(k, len(jobs))
+    candidates: List[Dict] = []
+    batch: List[Dict] = []
+    errors = 0
+
+    def flush():
+        scores, components = job_matrices.score(batch)
+        top.merge(scores, components, len(candidates) - len(batch))
+        batch.clear()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(job_matrices.vocabulary,)) as executor:
+        for candidate in executor.map(_candidate_worker, resume_paths, chunksize=16):
+            if candidate["error"]:
+                logger.warning(f"Error parsing resume {candidate['file']}, scoring it with empty data: {candidate['error']}")
+                errors += 1
+            # The vector is only needed until its batch is scored
+            batch.append(candidate)
+            candidates.append({"file": candidate["file"], "name": candidate["name"], "email": candidate["email"]})
+            if len(batch) >= batch_size:
+                flush()
+                logger.info(f"Scored {len(candidates)}/{len(resume_paths)} resumes")
+        if batch:
+            flush()
+
+    rows = write_results(jobs, candidates, top, out_path)
+    elapsed = time.perf_counter() - start_time
+    logger.info(
+        f"Screened {len(candidates)} resumes against {len(jobs)} jobs "
+        f"({len(candidates) * len(jobs)} pairs, {errors} parse errors) in {elapsed:.2f}s; "
+        f"wrote {rows} rows to {out_path}"
+    )
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every job against every resume and write the top k per job")
+    parser.add_argument("--jobs", type=Path, required=True, help="CSV with 'Job Title' and 'Job Description' columns")
+    parser.add_argument("--resumes", type=Path, required=True, help="Folder of PDF, DOCX or TXT resumes")
+    parser.add_argument("--out", type=Path, required=True, help="Output file, .csv or .parquet")
+    parser.add_argument("--top-k", type=int, default=10, help="Candidates kept per job (default: 10)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes used to parse resumes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=1024,
+                        help="Candidates scored per matrix batch (default: 1024)")
+    args = parser.parse_args()
+
+    if not args.resumes.is_dir():
+        parser.error(f"Resumes directory not found: {args.resumes}")
+    # Checked before any scoring, pandas only finds out when it writes the file
+    if args.out.suffix.lower() == ".parquet" and not any(
+        importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet")
+    ):
+        parser.error("Writing .parquet needs pyarrow (pip install pyarrow), or use a .csv output")
+    screen(args.jobs, args.resumes, args.out, args.top_k, args.workers, args.batch_size)
+
+if __name__ == "__main__":
+    main()
@@ -1,189 +1,384 @@
 import ollama
+import httpx
+import asyncio
 import json
-from typing import Dict, List, Tuple
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import logging
+from .llm_cache import LLMCache
+from .prompt_builder import PromptBuilder
+from .skill_vocabulary import SKILL_VOCABULARY
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class AIMatchingEngine:
-    def __init__(self, model_name="llama2"):
+    # Returned when question generation fails, so they are never stored as the model's answer
+    FALLBACK_QUESTIONS = [
+        "Describe your most challenging project and how you overcame obstacles.",
+        "How do you stay updated with the latest developments in your field?",
+        "Explain your approach to problem-solving in a technical environment."
+    ]
+    
+    def __init__(self, model_name="llama2", cache: Optional[LLMCache] = None,
+                 prompt_builder: Optional[PromptBuilder] = None,
+                 host: Optional[str] = None,
+                 max_concurrency: int = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2")),
+                 timeout: float = float(os.getenv("OLLAMA_TIMEOUT_SECONDS", "120"))):
         self.model_name = model_name
+        self.cache = cache
+        self.prompt_builder = prompt_builder or PromptBuilder()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
         
-    async def analyze_match(self, job: Dict, candidate: Dict) -> Tuple[float, str]:
-        """
-        Use Ollama to analyze the match between a job and candidate
-        Returns a tuple of (score, reasoning)
-        """
+        # One pooled async client shared by every request, connections are kept alive between calls
+        self.client = ollama.AsyncClient(
+            host=host,
+            timeout=httpx.Timeout(timeout, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+                keepalive_expiry=300
+            )
+        )
+        # Caps simultaneous generations; waiters are served in arrival order
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        
+        # Metrics
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.prompt_calls = 0
+        self.prompt_tokens = 0
+        self.full_text_prompt_tokens = 0
+    
+    async def close(self):
+        # ollama.AsyncClient does not expose a close method of its own
+        await self.client._client.aclose()
+    
+    def stats(self) -> Dict:
+        stats = {
+            "model": self.model_name,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "prompts_built": self.prompt_calls,
+            "avg_prompt_tokens": round(self.prompt_tokens / self.prompt_calls, 1) if self.prompt_calls else 0,
+            "avg_full_text_prompt_tokens": round(self.full_text_prompt_tokens / self.prompt_calls, 1) if self.prompt_calls else 0
+        }
+        if self.cache is not None:
+            stats["cache_hits"] = self.cache.hits
+            stats["cache_misses"] = self.cache.misses
+        return stats
+    
+    @asynccontextmanager
+    async def _generation_slot(self):
+        """Wait for a free generation slot while keeping the queue metrics up to date"""
+        self.queue_depth += 1
+        started = False
         try:
-            # Process skills and qualifications
-            job_skills = job.get('required_skills', [])
-            if isinstance(job_skills, str):
+            async with self._semaphore:
+                self.queue_depth -= 1
+                started = True
+                self.in_flight += 1
                 try:
-                    job_skills = json.loads(job_skills)
-                except json.JSONDecodeError:
-                    job_skills = [s.strip() for s in job_skills.split(',')]
-                    
-            job_quals = job.get('required_qualifications', [])
-            if isinstance(job_quals, str):
-                try:
-                    job_quals = json.loads(job_quals)
-                except json.JSONDecodeError:
-                    job_quals = [q.strip() for q in job_quals.split(',')]
-                    
-            candidate_skills = candidate.get('skills', [])
-            if isinstance(candidate_skills, str):
-                try:
-                    candidate_skills = json.loads(candidate_skills)
-                except json.JSONDecodeError:
-                    candidate_skills = [s.strip() for s in candidate_skills.split(',')]
+                    yield
+                finally:
+                    self.in_flight -= 1
+        finally:
+            if not started:
+                self.queue_depth -= 1
+    
+    def _record_prompt(self, kind: str, system_msg: str, prompt: str, compact_text: str, raw_text: str) -> None:
+        """Log the size of a prompt and what it would have been with the raw text"""
+        stats = self.prompt_builder.prompt_stats(system_msg, prompt, compact_text, raw_text)
+        self.prompt_calls += 1
+        self.prompt_tokens += stats["prompt_tokens"]
+        self.full_text_prompt_tokens += stats["full_text_prompt_tokens"]
+        logger.info(
+            f"{kind} prompt: ~{stats['prompt_tokens']} tokens "
+            f"(~{stats['full_text_prompt_tokens']} with the full text)"
+        )
+    
+    def _messages(self, system_msg: str, prompt: str) -> List[Dict]:
+        return [{
+            "role": "system",
+            "content": system_msg
+        }, {
+            "role": "user",
+            "content": prompt
+        }]
+    
+    async def _chat(self, system_msg: str, prompt: str) -> str:
+        """
+        Send a system + user prompt to Ollama and return the response text.
+        Responses are served from the cache when an identical request was answered before.
+        """
+        key = LLMCache.make_key(self.model_name, system_msg, prompt)
+        if self.cache is not None:
+            # The cache reads SQLite, keep that off the event loop
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                logger.info("Using cached Ollama response")
+                return cached
+        
+        async with self._generation_slot():
+            try:
+                response = await asyncio.wait_for(
+                    self.client.chat(
+                        model=self.model_name,
+                        messages=self._messages(system_msg, prompt)
+                    ),
+                    timeout=self.timeout
+                )
+                self.completed += 1
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise
+            except Exception:
+                self.failed += 1
+                raise
+        response_text = response['message']['content']
+        
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.set, key, self.model_name, response_text)
+        return response_text
+    
+    async def _stream_chat(self, system_msg: str, prompt: str) -> AsyncIterator[str]:
+        """
+        Yield the response text in chunks as Ollama generates it.
+        A cached response is yielded as a single chunk; a completed stream is cached.
+        """
+        key = LLMCache.make_key(self.model_name, system_msg, prompt)
+        if self.cache is not None:
+            # The cache reads SQLite, keep that off the event loop
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                logger.info("Using cached Ollama response")
+                yield cached
+                return
+        
+        chunks = []
+        async with self._generation_slot():
+            try:
+                stream = await asyncio.wait_for(
+                    self.client.chat(
+                        model=self.model_name,
+                        messages=self._messages(system_msg, prompt),
+                        stream=True
+                    ),
+                    timeout=self.timeout
+                )
+                while True:
+                    # The timeout applies to the wait for each chunk
+                    try:
+                        part = await asyncio.wait_for(stream.__anext__(), timeout=self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    text = part['message']['content']
+                    if text:
+                        chunks.append(text)
+                        yield text
+                self.completed += 1
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise
+            except Exception:
+                self.failed += 1
+                raise
+        
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.set, key, self.model_name, "".join(chunks))
+    
+    def _build_match_prompt(self, job: Dict, candidate: Dict) -> Tuple[str, str, float, float]:
+        """
+        Build the system and user prompts for a match analysis.
+        Also returns the preliminary skill and experience scores used when the AI fails.
+        """
+        # Process skills and qualifications
+        job_skills = job.get('required_skills', [])
+        if isinstance(job_skills, str):
+            try:
+                job_skills = json.loads(job_skills)
+            except json.JSONDecodeError:
+                job_skills = [s.strip() for s in job_skills.split(',')]
                 
-            # Prepare the prompt
-            # Log input data
-            logger.info(f"Job Skills: {job_skills}")
-            logger.info(f"Candidate Skills: {candidate_skills}")
-            
-            # Calculate preliminary score based on skill matching
-            # This helps provide a more accurate score even if AI analysis fails
-            matching_skills = set([s.lower() for s in job_skills]) & set([s.lower() for s in candidate_skills])
-            skill_match_score = len(matching_skills) / len(job_skills) if job_skills else 0.0
-            logger.info(f"Preliminary skill match score: {skill_match_score}")
-            
-            # Extract job experience requirement and candidate experience
-            job_exp = job.get('required_experience', 0)
-            candidate_exp = candidate.get('experience_years', 0)
-            
-            # Calculate experience match
-            exp_match_score = min(1.0, candidate_exp / job_exp) if job_exp > 0 else 0.5
-            logger.info(f"Experience match score: {exp_match_score}")
+        job_quals = job.get('required_qualifications', [])
+        if isinstance(job_quals, str):
+            try:
+                job_quals = json.loads(job_quals)
+            except json.JSONDecodeError:
+                job_quals = [q.strip() for q in job_quals.split(',')]
+                
+        candidate_skills = candidate.get('skills', [])
+        if isinstance(candidate_skills, str):
+            try:
+                candidate_skills = json.loads(candidate_skills)
+            except json.JSONDecodeError:
+                candidate_skills = [s.strip() for s in candidate_skills.split(',')]
             
-            prompt = f"""
-            You are an expert AI recruiter. Your task is to evaluate if this candidate is a good match for the job.
-            Focus especially on technical skills and experience in machine learning and AI.
+        # Prepare the prompt
+        # Log input data
+        logger.info(f"Job Skills: {job_skills}")
+        logger.info(f"Candidate Skills: {candidate_skills}")
+        
+        # Calculate preliminary score based on skill matching
+        # This helps provide a more accurate score even if AI analysis fails
+        required_bits = SKILL_VOCABULARY.to_bits(job_skills)
+        matching_bits = required_bits & SKILL_VOCABULARY.to_bits(candidate_skills)
+        skill_match_score = matching_bits.bit_count() / required_bits.bit_count() if required_bits else 0.0
+        logger.info(f"Preliminary skill match score: {skill_match_score}")
+        
+        # Extract job experience requirement and candidate experience
+        job_exp = job.get('required_experience', 0)
+        candidate_exp = candidate.get('experience_years', 0)
+        
+        # Calculate experience match
+        exp_match_score = min(1.0, candidate_exp / job_exp) if job_exp > 0 else 0.5
+        logger.info(f"Experience match score: {exp_match_score}")
+        
+        # Compact, token-budgeted views of the description and resume
+        description = self.prompt_builder.compact_description(job.get('description', ''))
+        profile = self.prompt_builder.candidate_profile(candidate.get('resume_text', ''), job_skills)
+        
+        prompt = f"""
+        You are an expert AI recruiter. Your task is to evaluate if this candidate is a good match for the job.
+        Focus especially on technical skills and experience in machine learning and AI.
+        
+        JOB POSTING:
+        Title: {job.get('title', '')}
+        Company: {job.get('company', '')}
+        Key Requirements:
+        1. Technical Skills Required: {', '.join(job_skills)}
+        2. Years of Experience Needed: {job.get('required_experience', 0)}
+        3. Required Qualifications: {', '.join(job_quals)}
+        4. Description: {description}
+        
+        CANDIDATE:
+        Name: {candidate.get('name', '')}
+        Technical Skills: {', '.join(candidate_skills)}
+        Years of Experience: {candidate.get('experience_years', 0)}
+        Resume Profile:
+        {profile}
+        
+        EVALUATION INSTRUCTIONS:
+        1. Score each category:
+           a) SKILLS (40 points):
+              - Award points for each matching technical skill
+              - Extra points for ML/AI framework expertise
+              - Bonus for additional relevant skills
+           
+           b) EXPERIENCE (30 points):
+              - Points for years of experience
+              - Extra points for ML/AI specific experience
+              - Bonus for leadership roles
+           
+           c) QUALIFICATIONS (20 points):
+              - Points for matching education level
+              - Extra points for relevant certifications
+              - Bonus for advanced degrees in ML/AI
+           
+           d) ACHIEVEMENTS (10 points):
+              - Points for relevant projects
+              - Extra points for quantified improvements
+              - Bonus for innovations/patents
+        
+        2. Calculate final score:
+           - Add up all points and divide by 100
+           - This gives a score between 0.0 and 1.0
+           - Round to 2 decimal places
+        
+        YOUR RESPONSE MUST BE IN THIS EXACT FORMAT:
+        SCORE: [number between 0.0 and 1.0]
+        REASONING: [detailed point breakdown and explanation]
+        """
+        
+        # Get response from Ollama
+        system_msg = """You are an expert AI recruitment system specialized in technical roles.
+        Your task is to accurately evaluate candidates for technical positions.
+        You must be thorough in your analysis and provide scores based on concrete evidence.
+        Always format your response with SCORE: and REASONING: on separate lines."""
+        
+        self._record_prompt(
+            "Match analysis", system_msg, prompt,
+            description + profile,
+            (job.get('description') or '') + (candidate.get('resume_text') or '')
+        )
+        return system_msg, prompt, skill_match_score, exp_match_score
+    
+    def _parse_match_response(self, response_text: str, skill_match_score: float,
+                              exp_match_score: float) -> Tuple[float, str]:
+        """Extract the score and reasoning from an analysis response"""
+        # Extract score and reasoning with better error handling
+        try:
+            # First try to find exact SCORE: and REASONING: lines
+            lines = [line.strip() for line in response_text.split('\n') if line.strip()]
             
-            JOB POSTING:
-            Title: {job.get('title', '')}
-            Company: {job.get('company', '')}
-            Key Requirements:
-            1. Technical Skills Required: {', '.join(job_skills)}
-            2. Years of Experience Needed: {job.get('required_experience', 0)}
-            3. Required Qualifications: {', '.join(job_quals)}
-            4. Full Description: {job.get('description', '')}
+            # Log all lines for debugging
+            logger.info("Response lines:")
+            for line in lines:
+                logger.info(f"Line: {line}")
             
-            CANDIDATE:
-            Name: {candidate.get('name', '')}
-            Technical Skills: {', '.join(candidate_skills)}
-            Years of Experience: {candidate.get('experience_years', 0)}
-            Full Resume:
-            {candidate.get('resume_text', '')}
+            score_line = next(line for line in lines if line.startswith('SCORE:'))
+            reasoning_line = next(line for line in lines if line.startswith('REASONING:'))
             
-            EVALUATION INSTRUCTIONS:
-            1. Score each category:
-               a) SKILLS (40 points):
-                  - Award points for each matching technical skill
-                  - Extra points for ML/AI framework expertise
-                  - Bonus for additional relevant skills
-               
-               b) EXPERIENCE (30 points):
-                  - Points for years of experience
-                  - Extra points for ML/AI specific experience
-                  - Bonus for leadership roles
-               
-               c) QUALIFICATIONS (20 points):
-                  - Points for matching education level
-                  - Extra points for relevant certifications
-                  - Bonus for advanced degrees in ML/AI
-               
-               d) ACHIEVEMENTS (10 points):
-                  - Points for relevant projects
-                  - Extra points for quantified improvements
-                  - Bonus for innovations/patents
+            score = float(score_line.split(':')[1].strip())
+            reasoning = reasoning_line.split(':')[1].strip()
             
-            2. Calculate final score:
-               - Add up all points and divide by 100
-               - This gives a score between 0.0 and 1.0
-               - Round to 2 decimal places
+            logger.info(f"Extracted score: {score}")
+            logger.info(f"Extracted reasoning: {reasoning}")
             
-            YOUR RESPONSE MUST BE IN THIS EXACT FORMAT:
-            SCORE: [number between 0.0 and 1.0]
-            REASONING: [detailed point breakdown and explanation]
-            """
+        except Exception as e:
+            logger.error(f"Error parsing AI response: {str(e)}")
+            logger.error(f"Full response text: {response_text}")
             
-            # Get response from Ollama
-            system_msg = """You are an expert AI recruitment system specialized in technical roles.
-            Your task is to accurately evaluate candidates for technical positions.
-            You must be thorough in your analysis and provide scores based on concrete evidence.
-            Always format your response with SCORE: and REASONING: on separate lines."""
+            # More aggressive fallback parsing
+            try:
+                # Try to find any number in the response
+                import re
+                numbers = re.findall(r'\d+\.\d+', response_text)
+                if numbers:
+                    score = float(numbers[0])  # Take the first number found
+                else:
+                    # Use our preliminary score calculation instead of a static default
+                    combined_score = (skill_match_score * 0.6) + (exp_match_score * 0.4)
+                    score = round(combined_score, 2)
+                    logger.info(f"Using calculated fallback score: {score}")
+                
+                # Use everything else as reasoning
+                reasoning = f"Score calculated based on skill match ({skill_match_score:.2f}) and experience match ({exp_match_score:.2f}). AI analysis failed to provide detailed scoring."
+            except:
+                # If all else fails, use our preliminary score calculation
+                combined_score = (skill_match_score * 0.6) + (exp_match_score * 0.4)
+                score = round(combined_score, 2)
+                logger.info(f"Using calculated fallback score: {score}")
+                reasoning = f"Score calculated based on skill match ({skill_match_score:.2f}) and experience match ({exp_match_score:.2f}). AI analysis failed to provide detailed scoring."
+        
+        return score, reasoning
+    
+    async def analyze_match(self, job: Dict, candidate: Dict) -> Tuple[float, str]:
+        """
+        Use Ollama to analyze the match between a job and candidate
+        Returns a tuple of (score, reasoning)
+        """
+        try:
+            system_msg, prompt, skill_match_score, exp_match_score = self._build_match_prompt(job, candidate)
             
             logger.info("Sending request to Ollama...")
             try:
-                response = await ollama.chat(
-                    model=self.model_name,
-                    messages=[{
-                        "role": "system",
-                        "content": system_msg
-                    }, {
-                        "role": "user",
-                        "content": prompt
-                    }]
-                )
-                
-                # Parse the response
-                response_text = response['message']['content']
+                response_text = await self._chat(system_msg, prompt)
                 logger.info("Received response from Ollama")
                 logger.info(f"Raw AI response:\n{response_text}")
-                
-                # Extract score and reasoning with better error handling
-                try:
-                    # First try to find exact SCORE: and REASONING: lines
-                    lines = [line.strip() for line in response_text.split('\n') if line.strip()]
-                    
-                    # Log all lines for debugging
-                    logger.info("Response lines:")
-                    for line in lines:
-                        logger.info(f"Line: {line}")
-                    
-                    score_line = next(line for line in lines if line.startswith('SCORE:'))
-                    reasoning_line = next(line for line in lines if line.startswith('REASONING:'))
-                    
-                    score = float(score_line.split(':')[1].strip())
-                    reasoning = reasoning_line.split(':')[1].strip()
-                    
-                    logger.info(f"Extracted score: {score}")
-                    logger.info(f"Extracted reasoning: {reasoning}")
-                    
-                except Exception as e:
-                    logger.error(f"Error parsing AI response: {str(e)}")
-                    logger.error(f"Full response text: {response_text}")
-                    
-                    # More aggressive fallback parsing
-                    try:
-                        # Try to find any number in the response
-                        import re
-                        numbers = re.findall(r'\d+\.\d+', response_text)
-                        if numbers:
-                            score = float(numbers[0])  # Take the first number found
-                        else:
-                            # Use our preliminary score calculation instead of a static default
-                            combined_score = (skill_match_score * 0.6) + (exp_match_score * 0.4)
-                            score = round(combined_score, 2)
-                            logger.info(f"Using calculated fallback score: {score}")
-                        
-                        # Use everything else as reasoning
-                        reasoning = f"Score calculated based on skill match ({skill_match_score:.2f}) and experience match ({exp_match_score:.2f}). AI analysis failed to provide detailed scoring."
-                    except:
-                        # If all else fails, use our preliminary score calculation
-                        combined_score = (skill_match_score * 0.6) + (exp_match_score * 0.4)
-                        score = round(combined_score, 2)
-                        logger.info(f"Using calculated fallback score: {score}")
-                        reasoning = f"Score calculated based on skill match ({skill_match_score:.2f}) and experience match ({exp_match_score:.2f}). AI analysis failed to provide detailed scoring."
+                score, reasoning = self._parse_match_response(response_text, skill_match_score, exp_match_score)
                 
             except Exception as e:
                 logger.error(f"Error calling Ollama: {str(e)}")
-                # If Ollama call fails, use our preliminary calculation
-                combined_score = (skill_match_score * 0.6) + (exp_match_score * 0.4)
-                score = round(combined_score, 2)
-                logger.info(f"Using calculated fallback score (Ollama unavailable): {score}")
-                reasoning = f"Score calculated based on skill match ({skill_match_score:.2f}) and experience match ({exp_match_score:.2f}). AI service unavailable for detailed analysis."
+                score, reasoning = self._unavailable_result(skill_match_score, exp_match_score)
                 
             return score, reasoning
             
@@ -191,6 +386,50 @@ class AIMatchingEngine:
             logger.error(f"Error in AI matching: {str(e)}")
             return 0.5, f"Error in AI analysis: {str(e)}"
     
+    @staticmethod
+    def is_fallback_reasoning(reasoning: str) -> bool:
+        """True when the reasoning was produced without an answer from the model"""
+        return (reasoning.startswith("Error in AI analysis")
+                or reasoning.endswith("AI service unavailable for detailed analysis."))
+    
+    @classmethod
+    def is_fallback_questions(cls, questions: List[str]) -> bool:
+        """True when the questions are the canned ones returned because the model could not be reached"""
+        return list(questions) == cls.FALLBACK_QUESTIONS
+    
+    def _unavailable_result(self, skill_match_score: float, exp_match_score: float) -> Tuple[float, str]:
+        # If Ollama call fails, use our preliminary calculation
+        combined_score = (skill_match_score * 0.6) + (exp_match_score * 0.4)
+        score = round(combined_score, 2)
+        logger.info(f"Using calculated fallback score (Ollama unavailable): {score}")
+        reasoning = f"Score calculated based on skill match ({skill_match_score:.2f}) and experience match ({exp_match_score:.2f}). AI service unavailable for detailed analysis."
+        return score, reasoning
+    
+    async def stream_match_analysis(self, job: Dict, candidate: Dict) -> AsyncIterator[Tuple[str, object]]:
+        """
+        Streaming version of analyze_match.
+        Yields ("token", text) for each chunk of reasoning as it is generated,
+        then a final ("result", (score, reasoning)).
+        """
+        try:
+            system_msg, prompt, skill_match_score, exp_match_score = self._build_match_prompt(job, candidate)
+        except Exception as e:
+            logger.error(f"Error in AI matching: {str(e)}")
+            yield "result", (0.5, f"Error in AI analysis: {str(e)}")
+            return
+        
+        chunks = []
+        try:
+            async for text in self._stream_chat(system_msg, prompt):
+                chunks.append(text)
+                yield "token", text
+            result = self._parse_match_response("".join(chunks), skill_match_score, exp_match_score)
+        except Exception as e:
+            logger.error(f"Error calling Ollama: {str(e)}")
+            result = self._unavailable_result(skill_match_score, exp_match_score)
+        
+        yield "result", result
+    
     async def get_interview_questions(self, job: Dict, candidate: Dict, match_score: float) -> List[str]:
         """
         Generate personalized interview questions based on the job and candidate profile.
@@ -233,12 +472,13 @@ class AIMatchingEngine:
         else:
             missing_skills = []
         
+        description = self.prompt_builder.compact_description(job.get('description', ''))
         prompt = f"""
         You are an expert technical interviewer for a {job.get('title', 'technical')} position.
         
         JOB DETAILS:
         Title: {job.get('title', '')}
-        Description: {job.get('description', '')}
+        Description: {description}
         Required Skills: {', '.join(job_skills)}
         
         CANDIDATE PROFILE:
@@ -266,20 +506,10 @@ class AIMatchingEngine:
         Keep your questions clear, concise and directly relevant to the job requirements.
         Format your response as a simple list of questions, one per line, with no additional text."""
         
+        self._record_prompt("Interview questions", system_msg, prompt, description, job.get('description') or '')
+        
         try:
-            response = await ollama.chat(
-                model=self.model_name,
-                messages=[{
-                    "role": "system",
-                    "content": system_msg
-                }, {
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
-            
-            # Parse the response
-            response_text = response['message']['content']
+            response_text = await self._chat(system_msg, prompt)
             logger.info("Received interview questions from Ollama")
             
             # Clean and extract questions
@@ -301,8 +531,4 @@ class AIMatchingEngine:
             
         except Exception as e:
             logger.error(f"Error generating interview questions: {str(e)}")
-            return [
-                "Describe your most challenging project and how you overcame obstacles.",
-                "How do you stay updated with the latest developments in your field?",
-                "Explain your approach to problem-solving in a technical environment."
-            ]
+            return list(self.FALLBACK_QUESTIONS)
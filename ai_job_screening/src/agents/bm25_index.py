@@ -0,0 +1,182 @@
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import threading
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Keeps terms such as "c++", "c#", "node.js" and "ci/cd" in one piece
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()[:16]
+
+class BM25Index:
+    """
+    Incremental BM25 inverted index over resume text.
+
+    Postings map each term to {candidate id: term frequency}. Every change is
+    appended to a JSONL log, so updates cost one line of I/O and the index is
+    restored by replaying the log on startup. compact() rewrites the log with
+    one line per document once superseded entries pile up. Each document keeps
+    a hash of the text it was indexed from, so is_current() can tell when the
+    text has since changed.
+    """
+
+    def __init__(self, path: Path, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_terms: Dict[int, Dict[str, int]] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.doc_hashes: Dict[int, Optional[str]] = {}
+        self.total_length = 0
+        self.log_entries = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from an interrupted write
+                    continue
+                self.log_entries += 1
+                if entry.get("op") == "remove":
+                    self._remove(entry["id"])
+                else:
+                    self._add(entry["id"], entry["tf"], entry.get("hash"))
+        logger.info(f"Loaded BM25 index: {len(self.doc_terms)} documents, {len(self.postings)} terms")
+
+    def _append(self, entries: List[Dict]) -> None:
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+            self.log_entries += len(entries)
+        except OSError as e:
+            logger.warning(f"Could not persist BM25 index update: {str(e)}")
+
+    def _add(self, doc_id: int, term_freqs: Dict[str, int], content_hash: Optional[str] = None) -> None:
+        self._remove(doc_id)
+        self.doc_terms[doc_id] = term_freqs
+        self.doc_hashes[doc_id] = content_hash
+        self.doc_lengths[doc_id] = sum(term_freqs.values())
+        self.total_length += self.doc_lengths[doc_id]
+        for term, tf in term_freqs.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+    def _remove(self, doc_id: int) -> None:
+        term_freqs = self.doc_terms.pop(doc_id, None)
+        if term_freqs is None:
+            return
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        self.doc_hashes.pop(doc_id, None)
+        for term in term_freqs:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+
+    def add(self, doc_id: int, text: str) -> None:
+        """Index a document, replacing any previous version of it"""
+        self.add_many([(doc_id, text)])
+
+    def add_many(self, docs: Iterable[Tuple[int, str]]) -> int:
+        entries = [
+            {"op": "add", "id": doc_id, "tf": dict(Counter(tokenize(text))), "hash": text_hash(text)}
+            for doc_id, text in docs
+        ]
+        with self._lock:
+            for entry in entries:
+                self._add(entry["id"], entry["tf"], entry["hash"])
+            self._append(entries)
+        return len(entries)
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            if doc_id in self.doc_terms:
+                self._remove(doc_id)
+                self._append([{"op": "remove", "id": doc_id}])
+
+    def compact(self) -> None:
+        """Rewrite the log with a single entry per indexed document"""
+        with self._lock:
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for doc_id, term_freqs in self.doc_terms.items():
+                    entry = {"op": "add", "id": doc_id, "tf": term_freqs, "hash": self.doc_hashes.get(doc_id)}
+                    f.write(json.dumps(entry) + "\n")
+            os.replace(tmp_path, self.path)
+            self.log_entries = len(self.doc_terms)
+
+    def needs_compaction(self) -> bool:
+        return self.log_entries > 2 * len(self.doc_terms) + 100
+
+    def doc_ids(self) -> set:
+        with self._lock:
+            return set(self.doc_terms)
+
+    def is_current(self, doc_id: int, text: str) -> bool:
+        """True when the document is indexed from exactly this text"""
+        with self._lock:
+            return doc_id in self.doc_terms and self.doc_hashes.get(doc_id) == text_hash(text)
+
+    def idf(self, term: str) -> float:
+        n = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.doc_terms) - n + 0.5) / (n + 0.5))
+
+    def _query_terms(self, query: str) -> List[str]:
+        # Repeated query terms would only inflate the score, count each once
+        return list(dict.fromkeys(tokenize(query)))
+
+    def score_all(self, query: str, normalize: bool = False) -> Dict[int, float]:
+        """
+        BM25 score of every document matching at least one query term, accumulated
+        term at a time over the postings. With normalize=True scores are divided by
+        the query's upper bound, the score of a document saturating every term, so
+        they fall in [0, 1] and are comparable across queries.
+        """
+        terms = self._query_terms(query)
+        scores: Dict[int, float] = {}
+        with self._lock:
+            if not self.doc_terms:
+                return scores
+            avg_length = self.total_length / len(self.doc_terms) or 1.0
+            upper_bound = 0.0
+            for term in terms:
+                idf = self.idf(term)
+                upper_bound += idf * (self.k1 + 1)
+                for doc_id, tf in self.postings.get(term, {}).items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        if normalize and upper_bound:
+            return {doc_id: score / upper_bound for doc_id, score in scores.items()}
+        return scores
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """Top k (candidate id, score) pairs for a free-text query"""
+        scores = self.score_all(query)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
@@ -1,67 +1,73 @@
-from typing import Dict
+from typing import Dict, Iterator, List, Optional, Tuple
 import PyPDF2
 import docx
+import logging
+import os
 import re
 from datetime import datetime
+from .skill_vocabulary import SKILL_VOCABULARY
+
+logger = logging.getLogger(__name__)
 
 class CVParser:
-    def __init__(self):
-        # Technical skills and frameworks
-        self.skill_keywords = {
-            # Programming Languages
-            "python": ["python", "django", "flask", "fastapi"],
-            "javascript": ["javascript", "js", "node.js", "typescript"],
-            "java": ["java", "spring", "hibernate"],
-            "c++": ["c++", "cpp"],
-            
-            # Web Technologies
-            "react": ["react", "reactjs", "react.js"],
-            "angular": ["angular", "angularjs"],
-            "vue": ["vue", "vuejs", "vue.js"],
-            
-            # Databases
-            "sql": ["sql", "mysql", "postgresql", "oracle"],
-            "mongodb": ["mongodb", "mongo", "nosql"],
-            
-            # Cloud & DevOps
-            "aws": ["aws", "amazon web services", "ec2", "s3", "lambda"],
-            "docker": ["docker", "container"],
-            "kubernetes": ["kubernetes", "k8s"],
-            
-            # AI/ML
-            "machine learning": ["machine learning", "ml", "deep learning", "dl"],
-            "tensorflow": ["tensorflow", "tf"],
-            "pytorch": ["pytorch", "torch"],
-            "nlp": ["nlp", "natural language processing"],
-            "computer vision": ["computer vision", "cv", "image processing"],
-            
-            # Big Data
-            "spark": ["spark", "pyspark"],
-            "hadoop": ["hadoop", "hdfs", "mapreduce"],
-            "kafka": ["kafka", "event streaming"],
-            
-            # Other
-            "git": ["git", "github", "gitlab"],
-            "agile": ["agile", "scrum", "kanban"],
-            "devops": ["devops", "ci/cd", "jenkins"]
-        }
+    # Bump whenever parse() output changes so cached results are not reused
+    PARSER_VERSION = "3"
+
+    def __init__(self, max_pages: Optional[int] = None, max_chars: Optional[int] = None):
+        # Upper bounds on how much of a document is read, whatever its size
+        self.max_pages = max_pages or int(os.getenv("CV_MAX_PAGES", "30"))
+        self.max_chars = max_chars or int(os.getenv("CV_MAX_CHARS", "200000"))
+
+        # Skills come from the shared vocabulary, compiled into one matcher so they are found in a single pass
+        self.skill_matcher = SKILL_VOCABULARY.matcher
+    
+    @property
+    def cache_version(self) -> str:
+        """Parser version plus the budgets, which decide how much text a parse keeps"""
+        return f"{self.PARSER_VERSION}-p{self.max_pages}-c{self.max_chars}"
         
-    def read_pdf(self, file_path: str) -> str:
+    def iter_pdf_pages(self, file_path: str, max_pages: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield the text of each PDF page in turn, stopping once the page or
+        character budget is used up so oversized documents stay cheap.
+        """
+        with open(file_path, 'rb') as file:
+            yield from self._iter_reader_pages(PyPDF2.PdfReader(file), file_path, max_pages)
+    
+    def read_pdf_pages(self, file_path: str, max_pages: Optional[int] = None) -> Tuple[List[str], int]:
+        """Page texts within the budgets and the document's total page count, from one open reader"""
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-        return text
+            return list(self._iter_reader_pages(pdf_reader, file_path, max_pages)), len(pdf_reader.pages)
+    
+    def _iter_reader_pages(self, pdf_reader: PyPDF2.PdfReader, file_path: str,
+                           max_pages: Optional[int] = None) -> Iterator[str]:
+        max_pages = min(max_pages or self.max_pages, self.max_pages)
+        remaining_chars = self.max_chars
+        for page_number, page in enumerate(pdf_reader.pages):
+            if page_number >= max_pages or remaining_chars <= 0:
+                logger.info(f"Stopped reading {file_path} after {page_number} of {len(pdf_reader.pages)} pages")
+                break
+            text = (page.extract_text() or "")[:remaining_chars]
+            remaining_chars -= len(text)
+            yield text
+    
+    def read_pdf(self, file_path: str, max_pages: Optional[int] = None) -> str:
+        return "".join(self.iter_pdf_pages(file_path, max_pages))
     
     def read_docx(self, file_path: str) -> str:
         try:
             doc = docx.Document(file_path)
-            text = ""
+            lines = []
+            remaining_chars = self.max_chars
             for paragraph in doc.paragraphs:
+                if remaining_chars <= 0:
+                    break
                 if paragraph.text.strip():
-                    text += paragraph.text.strip() + "\n"
-            return text
+                    line = (paragraph.text.strip() + "\n")[:remaining_chars]
+                    remaining_chars -= len(line)
+                    lines.append(line)
+            return "".join(lines)
         except Exception as e:
             raise ValueError(f"Error reading Word document: {str(e)}")
     
@@ -144,27 +150,30 @@ class CVParser:
         return total_years
     
     def extract_skills(self, text: str) -> list:
-        """Extract skills from text using keyword matching"""
-        skills = set()
-        text_lower = text.lower()
-        
-        # Look for skill keywords and their variations
-        for main_skill, variations in self.skill_keywords.items():
-            if any(variation in text_lower for variation in variations):
-                skills.add(main_skill)
-        
-        return list(skills)
+        """Extract skills from text using keyword matching, as canonical names in vocabulary order"""
+        return SKILL_VOCABULARY.find(text)
     
     def read_txt(self, file_path: str) -> str:
         """Read content from a text file"""
         with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
+            return file.read(self.max_chars)
 
-    def parse(self, file_path: str) -> Dict:
-        """Parse a CV file and extract relevant information"""
+    def parse(self, file_path: str, max_pages: Optional[int] = None) -> Dict:
+        """
+        Parse a CV file and extract relevant information.
+        max_pages limits a PDF to its first pages for a quick preview parse;
+        pages_parsed and page_count in the result show whether it was cut short.
+        """
+        pages = {}
+        
         # Read file based on extension
         if file_path.endswith('.pdf'):
-            text = self.read_pdf(file_path)
+            page_texts, page_count = self.read_pdf_pages(file_path, max_pages)
+            text = "".join(page_texts)
+            pages = {
+                "pages_parsed": len(page_texts),
+                "page_count": page_count
+            }
         elif file_path.endswith('.docx'):
             text = self.read_docx(file_path)
         elif file_path.endswith('.txt'):
@@ -181,5 +190,22 @@ class CVParser:
             "contact": contact_info,
             "experience": experience,
             "skills": skills,
-            "raw_text": text
+            "raw_text": text,
+            **pages
         }
+    
+    def is_partial(self, cv_data: Dict) -> bool:
+        """True when a preview parse stopped before the full page budget"""
+        if "page_count" not in cv_data or len(cv_data["raw_text"]) >= self.max_chars:
+            return False
+        return cv_data["pages_parsed"] < min(cv_data["page_count"], self.max_pages)
+
+# Parser reused by every call within an executor worker process
+_worker_parser = None
+
+def parse_in_worker(file_path: str, max_pages: Optional[int] = None) -> Dict:
+    """Module-level parse entry point that can be submitted to a process pool"""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = CVParser()
+    return _worker_parser.parse(file_path, max_pages=max_pages)
@@ -1,42 +1,157 @@
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import smtplib
+import ssl
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
+import logging
 from pathlib import Path
 from jinja2 import Template
 
+logger = logging.getLogger(__name__)
+
+class SMTPMailer:
+    """
+    One SMTP connection, opened and authenticated on first use and then kept
+    for every following message. Not thread-safe: the outbox sender is its
+    only user. A connection the server dropped is reopened once per message.
+    """
+
+    def __init__(self, server: str, port: int, username: str = "", password: str = "",
+                 starttls: bool = True, timeout: float = 30.0):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._smtp: Optional[smtplib.SMTP] = None
+        self.last_used = 0.0
+        self.connections_opened = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._smtp is not None
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+                smtp.ehlo()
+            if self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self.connections_opened += 1
+        logger.info(f"Opened SMTP connection to {self.server}:{self.port}")
+        return smtp
+
+    def send(self, message: MIMEMultipart) -> None:
+        """Send over the open connection, reconnecting once if the server dropped it"""
+        for attempt in range(2):
+            if self._smtp is None:
+                self._smtp = self._connect()
+            try:
+                self._smtp.send_message(message)
+                self.last_used = time.monotonic()
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                self._smtp = None
+                if attempt:
+                    raise
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
 class InterviewScheduler:
     def __init__(self):
         self.template_dir = Path(__file__).parent.parent.parent / "templates"
         self.email_settings = {
             "smtp_server": os.getenv("SMTP_SERVER", "smtp.gmail.com"),
             "smtp_port": int(os.getenv("SMTP_PORT", "587")),
+            "smtp_starttls": os.getenv("SMTP_STARTTLS", "true").lower() != "false",
             "sender_email": os.getenv("SENDER_EMAIL", ""),
             "sender_password": os.getenv("SENDER_PASSWORD", "")
         }
+        self._invitation_template: Optional[Template] = None
+    
+    @property
+    def invitation_template(self) -> Template:
+        """The invitation template, read and compiled on first use only"""
+        if self._invitation_template is None:
+            with open(self.template_dir / "interview_invitation.html", "r") as f:
+                self._invitation_template = Template(f.read())
+        return self._invitation_template
+    
+    def create_mailer(self) -> SMTPMailer:
+        return SMTPMailer(
+            self.email_settings["smtp_server"],
+            self.email_settings["smtp_port"],
+            username=self.email_settings["sender_email"],
+            password=self.email_settings["sender_password"],
+            starttls=self.email_settings["smtp_starttls"]
+        )
+    
+    @staticmethod
+    def meeting_link(job_id: int, candidate_id: int) -> str:
+        # Mock meeting link (in real implementation, this would integrate with
+        # calendar/meeting services like Google Calendar or Zoom)
+        return f"https://meet.company.com/{job_id}-{candidate_id}"
+    
+    def render_invitation(self, candidate_name: str, job_title: str, company: str,
+                          interview_datetime: datetime, meeting_link: str = None) -> Tuple[str, str]:
+        """Subject and HTML body of an interview invitation"""
+        subject = f"Interview Invitation: {job_title} at {company}"
+        body = self.invitation_template.render(
+            candidate_name=candidate_name,
+            job_title=job_title,
+            company=company,
+            interview_datetime=interview_datetime.strftime("%Y-%m-%d %H:%M"),
+            meeting_link=meeting_link
+        )
+        return subject, body
+    
+    def build_message(self, recipient: str, subject: str, html_body: str) -> MIMEMultipart:
+        msg = MIMEMultipart()
+        msg["Subject"] = subject
+        msg["From"] = self.email_settings["sender_email"]
+        msg["To"] = recipient
+        msg.attach(MIMEText(html_body, "html"))
+        return msg
     
     def generate_time_slots(self, start_date: datetime, 
                           num_days: int = 5, 
                           slots_per_day: int = 8) -> List[datetime]:
-        """Generate available interview time slots"""
+        """Generate available interview time slots over the next num_days weekdays"""
         time_slots = []
-        current_date = start_date
+        current_date = start_date.replace(hour=9, minute=0, second=0, microsecond=0)  # Start at 9 AM
+        days = 0
         
-        for _ in range(num_days):
-            # Skip weekends
+        while days < num_days:
+            # Skip weekends without using up a day
             if current_date.weekday() >= 5:
                 current_date += timedelta(days=1)
                 continue
                 
             # Generate slots for the day
-            slot_time = current_date.replace(hour=9, minute=0)  # Start at 9 AM
+            slot_time = current_date
             for _ in range(slots_per_day):
                 time_slots.append(slot_time)
                 slot_time += timedelta(minutes=60)  # 1-hour slots
                 
             current_date += timedelta(days=1)
+            days += 1
             
         return time_slots
     
@@ -47,53 +162,26 @@ class InterviewScheduler:
                                 company: str,
                                 interview_datetime: datetime,
                                 meeting_link: str = None) -> bool:
-        """Send interview invitation email to candidate"""
+        """Send interview invitation email to candidate over a connection of its own"""
+        mailer = self.create_mailer()
         try:
-            # Load email template
-            template_path = self.template_dir / "interview_invitation.html"
-            with open(template_path, "r") as f:
-                template = Template(f.read())
-            
-            # Prepare email content
-            email_content = template.render(
-                candidate_name=candidate_name,
-                job_title=job_title,
-                company=company,
-                interview_datetime=interview_datetime.strftime("%Y-%m-%d %H:%M"),
-                meeting_link=meeting_link
+            subject, email_content = self.render_invitation(
+                candidate_name, job_title, company, interview_datetime, meeting_link
             )
-            
-            # Create email message
-            msg = MIMEMultipart()
-            msg["Subject"] = f"Interview Invitation: {job_title} at {company}"
-            msg["From"] = self.email_settings["sender_email"]
-            msg["To"] = candidate_email
-            
-            msg.attach(MIMEText(email_content, "html"))
-            
-            # Send email
-            with smtplib.SMTP(self.email_settings["smtp_server"], 
-                            self.email_settings["smtp_port"]) as server:
-                server.starttls()
-                server.login(
-                    self.email_settings["sender_email"],
-                    self.email_settings["sender_password"]
-                )
-                server.send_message(msg)
-                
+            mailer.send(self.build_message(candidate_email, subject, email_content))
             return True
             
         except Exception as e:
             print(f"Error sending interview invitation: {str(e)}")
             return False
+        finally:
+            mailer.close()
     
     def schedule_interview(self, candidate: Dict, job: Dict, 
                          interview_datetime: datetime) -> bool:
         """Schedule an interview and send invitation"""
         try:
-            # Generate a mock meeting link (in real implementation, this would integrate with
-            # calendar/meeting services like Google Calendar or Zoom)
-            meeting_link = f"https://meet.company.com/{job['id']}-{candidate['id']}"
+            meeting_link = self.meeting_link(job["id"], candidate["id"])
             
             # Send interview invitation
             success = self.send_interview_invitation(
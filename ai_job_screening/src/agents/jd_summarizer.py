@@ -1,26 +1,14 @@
 import re
 from typing import Dict, List
+from .skill_vocabulary import SKILL_VOCABULARY
 
 class JobDescriptionSummarizer:
     def __init__(self):
-        # Common technical skills and keywords
-        self.skill_patterns = [
-            "python", "java", "javascript", "sql", "aws", "docker", "kubernetes",
-            "machine learning", "ai", "data science", "agile", "scrum",
-            "communication", "leadership", "problem solving"
-        ]
+        # Technical and soft skills come from the shared vocabulary
+        self.vocabulary = SKILL_VOCABULARY
         
     def extract_skills(self, text: str) -> List[str]:
-        text = text.lower()
-        skills = set()
-        
-        # Simple word matching for skills
-        words = text.split()
-        for word in words:
-            if word in self.skill_patterns:
-                skills.add(word)
-                
-        return list(skills)
+        return self.vocabulary.find(text)
     
     def extract_experience(self, text: str) -> int:
         # Look for patterns like "X years of experience"
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class LLMCache:
+    """
+    Two-tier cache for LLM responses: an in-memory LRU in front of a
+    persistent SQLite table. Keys are derived from the model name and the
+    exact system and user prompts, so any change to either misses.
+    """
+
+    def __init__(self, db_path: Path,
+                 max_entries: int = int(os.getenv("LLM_CACHE_SIZE", "512")),
+                 ttl_seconds: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> (expires_at, model, response)
+        self._lock = threading.Lock()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_model ON llm_cache (model)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, system_msg: str, prompt: str) -> str:
+        payload = json.dumps([model, system_msg, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT model, response, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[2] <= now:
+                self.misses += 1
+                return None
+
+            # Promote to the memory tier
+            self._remember(key, (row[2], row[0], row[1]))
+            self.hits += 1
+            return row[1]
+
+    def set(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, (expires_at, model, response))
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, model, response, now, expires_at)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not persist LLM cache entry: {str(e)}")
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def invalidate(self, key: Optional[str] = None, model: Optional[str] = None) -> int:
+        """
+        Drop cached responses. With no arguments everything is removed,
+        otherwise only the given key or the entries for the given model.
+        Returns the number of persisted entries deleted.
+        """
+        with self._lock:
+            if key is not None:
+                self._memory.pop(key, None)
+                cursor = self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            elif model is not None:
+                for k in [k for k, entry in self._memory.items() if entry[1] == model]:
+                    del self._memory[k]
+                cursor = self._conn.execute("DELETE FROM llm_cache WHERE model = ?", (model,))
+            else:
+                self._memory.clear()
+                cursor = self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            return cursor.rowcount
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            for k in [k for k, entry in self._memory.items() if entry[0] <= now]:
+                del self._memory[k]
+            cursor = self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+            return cursor.rowcount
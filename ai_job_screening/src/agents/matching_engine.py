@@ -1,95 +1,60 @@
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
+import heapq
 import json
 import logging
+import string
+import zlib
+from .skill_matcher import KeywordMatcher
+from .skill_vocabulary import SKILL_VOCABULARY
+from .text_vectorizer import HashingVectorizer, cosine_similarity
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def token_hash(token: str) -> int:
+    """Stable 32-bit hash of a token, the same in every process"""
+    return zlib.crc32(token.encode('utf-8'))
+
+def token_variants(token: str) -> set:
+    """A whitespace token as is and without surrounding punctuation, so "cybersecurity." still counts as cybersecurity"""
+    return {token, token.strip(string.punctuation)} - {""}
+
 class MatchingEngine:
+    # Bump whenever extract_features output changes so stored features get recomputed
+    FEATURE_VERSION = 4
+    # Bump whenever scoring or the AI prompts change so stored match results get recomputed
+    SCORING_VERSION = 5
+
     def __init__(self):
-        # Initialize skill variations dictionary for better matching
-        self.skill_variations = {
-            'python': ['py', 'python3'],
-            'javascript': ['js', 'ecmascript', 'node.js', 'nodejs'],
-            'java': ['java programming', 'core java', 'java ee'],
-            'c++': ['cpp', 'c plus plus'],
-            'react': ['reactjs', 'react.js'],
-            'angular': ['angularjs', 'angular.js'],
-            'vue': ['vuejs', 'vue.js'],
-            'aws': ['amazon web services', 'amazon aws'],
-            'docker': ['containerization'],
-            'kubernetes': ['k8s'],
-            'machine learning': ['ml', 'machine-learning'],
-            'artificial intelligence': ['ai'],
-            'natural language processing': ['nlp'],
-            'tensorflow': ['tf'],
-            'pytorch': ['torch'],
-            'sql': ['mysql', 'postgresql', 'oracle', 'tsql', 'sql server'],
-            'mongodb': ['mongo', 'nosql'],
-            'bigdata': ['big data', 'hadoop', 'spark'],
-            'devops': ['ci/cd', 'continuous integration'],
-            'git': ['github', 'gitlab', 'version control'],
-            'data science': ['data analysis', 'data analytics', 'analytics'],
-            'web development': ['web dev', 'frontend', 'backend', 'fullstack'],
-            'api': ['rest api', 'graphql', 'web services']
-        }
+        # Skills are matched as bitsets over the shared vocabulary's ids
+        self.vocabulary = SKILL_VOCABULARY
+
+        # Common technical keywords looked for in job descriptions
+        self.tech_keywords = [
+            'algorithm', 'analytics', 'api', 'architecture', 'automation',
+            'cloud', 'database', 'deploy', 'design', 'development',
+            'devops', 'distributed', 'framework', 'infrastructure', 'integration',
+            'machine learning', 'microservices', 'optimization', 'pipeline', 'platform',
+            'programming', 'scalable', 'security', 'software', 'system',
+            'testing', 'tool', 'web', 'agile', 'data'
+        ]
+        # Keywords only need to start a word, so "deploy" also finds "deployment"
+        self.keyword_matcher = KeywordMatcher(
+            {keyword: keyword for keyword in self.tech_keywords},
+            whole_words=False
+        )
+        self.vectorizer = HashingVectorizer()
 
     def calculate_skill_match(self, required_skills: List[str], candidate_skills: List[str]) -> float:
         if not required_skills or not candidate_skills:
             return 0.0
-            
-        # Convert skills to lowercase for comparison
-        required_skills = [skill.lower() for skill in required_skills]
-        candidate_skills = [skill.lower() for skill in candidate_skills]
-        
-        # Group skills into categories
-        categories = {
-            'programming': ['python', 'java', 'javascript', 'c++'],
-            'web': ['react', 'angular', 'vue'],
-            'database': ['sql', 'mongodb'],
-            'cloud': ['aws', 'docker', 'kubernetes'],
-            'ai_ml': ['machine learning', 'tensorflow', 'pytorch', 'nlp', 'computer vision'],
-            'big_data': ['spark', 'hadoop', 'kafka'],
-            'other': ['git', 'agile', 'devops']
-        }
-        
-        # Calculate category scores
-        category_scores = {}
-        for category, skills in categories.items():
-            req_skills_in_category = [s for s in required_skills if s in skills]
-            if not req_skills_in_category:
-                continue
-                
-            cand_skills_in_category = [s for s in candidate_skills if s in skills]
-            matches = set(req_skills_in_category) & set(cand_skills_in_category)
-            
-            if req_skills_in_category:
-                category_scores[category] = len(matches) / len(req_skills_in_category)
-        
-        if not category_scores:
-            return 0.0
-            
-        # Calculate weighted average across categories
-        weights = {
-            'programming': 0.25,
-            'web': 0.15,
-            'database': 0.15,
-            'cloud': 0.15,
-            'ai_ml': 0.25,
-            'big_data': 0.15,
-            'other': 0.1
-        }
-        
-        total_score = 0.0
-        total_weight = 0.0
-        
-        for category, score in category_scores.items():
-            weight = weights.get(category, 0.1)
-            total_score += score * weight
-            total_weight += weight
-        
-        return total_score / total_weight if total_weight > 0 else 0.0
+
+        # Weighted share of the required skills covered in each category the job asks for
+        return self.vocabulary.category_coverage(
+            self.vocabulary.to_bits(required_skills),
+            self.vocabulary.to_bits(candidate_skills)
+        )
     
     def calculate_experience_match(self, required_years: int, candidate_years: int) -> float:
         if required_years <= 0:
@@ -212,126 +177,173 @@ class MatchingEngine:
         
         return overall_score, detailed_scores
     
-    def calculate_match(self, job: Dict, candidate: Dict) -> Tuple[float, Dict]:
-        """Calculate match score between job and candidate"""
+    def _load_list(self, value) -> List[str]:
+        """Decode a JSON list column, falling back to comma separated text"""
+        if isinstance(value, (list, tuple, set)):
+            return list(value)
         try:
-            # Process skills with better error handling
-            try:
-                required_skills = json.loads(job.get('required_skills', '[]'))
-            except json.JSONDecodeError:
-                required_skills = [s.strip() for s in job.get('required_skills', '').split(',')]
+            return json.loads(value or '[]')
+        except json.JSONDecodeError:
+            return [s.strip() for s in value.split(',')]
 
-            try:
-                candidate_skills = json.loads(candidate.get('skills', '[]'))
-            except json.JSONDecodeError:
-                candidate_skills = [s.strip() for s in candidate.get('skills', '').split(',')]
+    def prepare_job(self, job: Dict) -> Dict:
+        """Pre-compute the job side of a match so it can be reused across candidates"""
+        required_skills = self._load_list(job.get('required_skills', '[]'))
+        required_quals = self._load_list(job.get('required_qualifications', '[]'))
+        job_desc = (job.get('description') or '').lower()
 
-            # Normalize skills
-            req_skills_norm = self.normalize_skills(required_skills)
-            cand_skills_norm = self.normalize_skills(candidate_skills)
+        return {
+            "required_skills": self.vocabulary.to_bits(required_skills),
+            "required_experience": float(job.get('required_experience') or 0),
+            "required_qualifications": {q.lower().strip() for q in required_quals},
+            "keywords": [(k, token_hash(k)) for k in self.extract_keywords(job_desc)],
+            "tf_vector": job['tf_vector'] if job.get('tf_vector') is not None else self.vectorizer.transform(job_desc)
+        }
 
-            # Calculate skill match with variations
-            matching_skills = req_skills_norm & cand_skills_norm
-            skill_score = len(matching_skills) / len(req_skills_norm) if req_skills_norm else 0
+    def extract_features(self, candidate: Dict) -> Dict:
+        """
+        Derive the compact feature record that scoring reads from a candidate's stored fields.
+        Computed once at ingest time so matching never has to touch the resume text again.
+        """
+        resume_text = (candidate.get('resume_text') or '').lower()
+        return {
+            # Bitset over the skill vocabulary
+            "skills": self.vocabulary.to_bits(self._load_list(candidate.get('skills', '[]'))),
+            # Technical keywords present in the resume, found the same way as in job descriptions
+            "keywords": self.keyword_matcher.find(resume_text),
+            "token_hashes": {token_hash(variant) for token in resume_text.split() for variant in token_variants(token)},
+            "experience_years": float(candidate.get('experience_years') or 0),
+            "qualifications": {q.lower().strip() for q in self._load_list(candidate.get('qualifications', '[]'))},
+            "tf_vector": self.vectorizer.transform(resume_text)
+        }
 
-            # Calculate experience match with bonus for extra experience
-            required_exp = float(job.get('required_experience', 0))
-            candidate_exp = float(candidate.get('experience_years', 0))
-            if required_exp > 0:
-                exp_score = min(1.2, candidate_exp / required_exp)  # Allow 20% bonus
-            else:
-                exp_score = 1.0 if candidate_exp > 0 else 0.0
+    def score_candidate(self, prepared_job: Dict, candidate: Dict) -> Tuple[float, Dict]:
+        """
+        Score a candidate against a job produced by prepare_job.
+        Uses the candidate's precomputed "features" when present.
+        """
+        features = candidate.get("features") or self.extract_features(candidate)
+        return self.score_features(prepared_job, features)
 
-            # Calculate qualification match
-            try:
-                required_quals = json.loads(job.get('required_qualifications', '[]'))
-            except json.JSONDecodeError:
-                required_quals = [q.strip() for q in job.get('required_qualifications', '').split(',')]
+    def score_features(self, prepared_job: Dict, features: Dict) -> Tuple[float, Dict]:
+        """Score a candidate feature record against a job produced by prepare_job"""
+        # Calculate skill match on the skill bitsets: popcount of the overlap over popcount of the requirement
+        required_skills = prepared_job["required_skills"]
+        matching_skills = required_skills & features["skills"]
+        skill_score = matching_skills.bit_count() / required_skills.bit_count() if required_skills else 0
+        # Per-category coverage of the same bitsets, reported but not weighted into the score
+        category_score = self.vocabulary.category_coverage(required_skills, features["skills"])
 
-            try:
-                candidate_quals = json.loads(candidate.get('qualifications', '[]'))
-            except json.JSONDecodeError:
-                candidate_quals = [q.strip() for q in candidate.get('qualifications', '').split(',')]
+        # Calculate experience match with bonus for extra experience
+        required_exp = prepared_job["required_experience"]
+        candidate_exp = features["experience_years"]
+        if required_exp > 0:
+            exp_score = min(1.2, candidate_exp / required_exp)  # Allow 20% bonus
+        else:
+            exp_score = 1.0 if candidate_exp > 0 else 0.0
 
-            # Normalize and match qualifications
-            req_quals_norm = {q.lower().strip() for q in required_quals}
-            cand_quals_norm = {q.lower().strip() for q in candidate_quals}
-            matching_quals = req_quals_norm & cand_quals_norm
-            qual_score = len(matching_quals) / len(req_quals_norm) if req_quals_norm else 1
+        # Normalize and match qualifications
+        req_quals_norm = prepared_job["required_qualifications"]
+        cand_quals_norm = features["qualifications"]
+        matching_quals = req_quals_norm & cand_quals_norm
+        qual_score = len(matching_quals) / len(req_quals_norm) if req_quals_norm else 1
 
-            # Calculate keyword match
-            resume_text = candidate.get('resume_text', '').lower()
-            job_desc = job.get('description', '').lower()
-            
-            # Extract keywords from job description
-            keywords = self.extract_keywords(job_desc)
-            found_keywords = sum(1 for k in keywords if k in resume_text)
+        # Calculate keyword match, preferring a BM25 score supplied by the caller.
+        # Keywords count as whole words only, a keyword inside a longer word ("api" in "shaping") does not
+        keywords = prepared_job["keywords"]
+        if features.get("keyword_score") is not None:
+            keyword_score = features["keyword_score"]
+        else:
+            found_keywords = sum(
+                1 for k, k_hash in keywords
+                if k in features["keywords"] or k_hash in features["token_hashes"]
+            )
             keyword_score = found_keywords / len(keywords) if keywords else 0
 
-            # Calculate final score with weights
-            final_score = (skill_score * 0.5) + (exp_score * 0.3) + (qual_score * 0.1) + (keyword_score * 0.1)
+        # Text similarity, reported alongside the other components but not weighted into the score.
+        # Callers with corpus statistics supply a TF-IDF cosine, otherwise fall back to a plain one
+        if features.get("semantic_score") is not None:
+            semantic_score = features["semantic_score"]
+        elif features.get("tf_vector") is not None:
+            semantic_score = cosine_similarity(prepared_job["tf_vector"], features["tf_vector"])
+        else:
+            semantic_score = 0.0
 
-            # Add small bonus for exceeding minimum requirements
-            if skill_score > 0.8 and exp_score > 1.0 and qual_score > 0.8:
-                final_score = min(1.0, final_score * 1.1)  # 10% bonus capped at 1.0
-                
-            # Determine if shortlisted
-            shortlisted = final_score >= 0.7
-                
-            # Create detailed scores dictionary
-            detailed_scores = {
-                "overall": round(final_score, 2),
-                "skills": round(skill_score, 2),
-                "experience": round(exp_score, 2),
-                "qualifications": round(qual_score, 2),
-                "keywords": round(keyword_score, 2),
-                "shortlisted": shortlisted,
-                "matching_skills": list(matching_skills)
-            }
+        # Calculate final score with weights
+        final_score = (skill_score * 0.5) + (exp_score * 0.3) + (qual_score * 0.1) + (keyword_score * 0.1)
 
-            return final_score, detailed_scores
-            
+        # Add small bonus for exceeding minimum requirements
+        if skill_score > 0.8 and exp_score > 1.0 and qual_score > 0.8:
+            final_score = min(1.0, final_score * 1.1)  # 10% bonus capped at 1.0
+
+        # Determine if shortlisted
+        shortlisted = final_score >= 0.7
+
+        # Create detailed scores dictionary
+        detailed_scores = {
+            "overall": round(final_score, 2),
+            "skills": round(skill_score, 2),
+            "skill_categories": round(category_score, 2),
+            "experience": round(exp_score, 2),
+            "qualifications": round(qual_score, 2),
+            "keywords": round(keyword_score, 2),
+            "semantic": round(semantic_score, 2),
+            "shortlisted": shortlisted,
+            "matching_skills": self.vocabulary.from_bits(matching_skills)
+        }
+
+        return final_score, detailed_scores
+
+    def calculate_match(self, job: Dict, candidate: Dict) -> Tuple[float, Dict]:
+        """Calculate match score between job and candidate"""
+        try:
+            return self.score_candidate(self.prepare_job(job), candidate)
         except Exception as e:
             logger.error(f"Error calculating match: {str(e)}")
             # Return a fallback score and empty details
             return 0.5, {"error": str(e)}
 
+    def rank_candidates(self, job: Dict, candidates: Iterable[Dict], k: int = 50) -> List[Dict]:
+        """
+        Score every candidate against one job in a single pass and return the top k.
+        The job is only prepared once, so the cost per candidate is just the scoring itself.
+        """
+        prepared_job = self.prepare_job(job)
+
+        scored = []
+        for candidate in candidates:
+            try:
+                score, detailed_scores = self.score_candidate(prepared_job, candidate)
+            except Exception as e:
+                logger.error(f"Error scoring candidate {candidate.get('id')}: {str(e)}")
+                continue
+            scored.append((score, candidate, detailed_scores))
+
+        top = heapq.nlargest(k, scored, key=lambda item: item[0])
+        return [
+            {
+                "candidate_id": candidate.get("id"),
+                "name": candidate.get("name"),
+                "email": candidate.get("email"),
+                "match_score": score,
+                "detailed_scores": detailed_scores
+            }
+            for score, candidate, detailed_scores in top
+        ]
+
     def normalize_skills(self, skills: List[str]) -> set:
-        """Normalize skills for better matching across variations"""
-        normalized = set()
-        
-        for skill in skills:
-            skill = skill.lower().strip()
-            normalized.add(skill)
-            
-            # Add common variations
-            if skill in self.skill_variations:
-                for variation in self.skill_variations[skill]:
-                    normalized.add(variation)
-                    
-        return normalized
+        """Canonical vocabulary names of the given skills, so aliases such as "k8s" and "kubernetes" agree"""
+        return self.vocabulary.canonicalize(skills)
         
     def extract_keywords(self, text: str) -> List[str]:
         """Extract important keywords from text"""
-        # Define common technical keywords
-        tech_keywords = [
-            'algorithm', 'analytics', 'api', 'architecture', 'automation',
-            'cloud', 'database', 'deploy', 'design', 'development',
-            'devops', 'distributed', 'framework', 'infrastructure', 'integration',
-            'machine learning', 'microservices', 'optimization', 'pipeline', 'platform',
-            'programming', 'scalable', 'security', 'software', 'system',
-            'testing', 'tool', 'web', 'agile', 'data'
-        ]
-        
         # Find all keywords in the text
-        found_keywords = []
-        for keyword in tech_keywords:
-            if keyword in text:
-                found_keywords.append(keyword)
+        found_keywords = list(self.keyword_matcher.find(text))
                 
         # If we found very few keywords, try some basic word extraction
         if len(found_keywords) < 5:
-            words = [w.strip().lower() for w in text.split() if len(w) > 5]
+            words = [w.strip(string.punctuation).lower() for w in text.split()]
+            words = [w for w in words if len(w) > 5]
             words = [w for w in words if not w in ['their', 'there', 'these', 'those', 'about', 'would', 'should']]
             found_keywords.extend(words[:10])  # Add up to 10 additional words
             
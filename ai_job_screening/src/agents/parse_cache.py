@@ -0,0 +1,117 @@
+from pathlib import Path
+from typing import Dict, Optional
+import hashlib
+import json
+import logging
+import os
+import threading
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+def hash_bytes(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ParseCache:
+    """
+    Persistent, content-addressed cache of CVParser output.
+
+    Entries are keyed by the SHA-256 of the uploaded bytes plus the parser
+    version (CVParser.cache_version, which covers the page and character
+    budgets), stored as one JSON file each, and evicted least-recently-used
+    first once the directory grows past max_bytes. A file's mtime is bumped on
+    every hit, so mtime order is LRU order and survives restarts.
+    """
+
+    def __init__(self, cache_dir: Path, parser_version: str = "1",
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.parser_version = parser_version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = sum(p.stat().st_size for p in self.cache_dir.glob("*.json"))
+
+    def _path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}-v{self.parser_version}.json"
+
+    def get(self, digest: str) -> Optional[Dict]:
+        path = self._path(digest)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        # Mark as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, digest: str, data: Dict) -> None:
+        path = self._path(digest)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write parse cache entry {path.name}: {str(e)}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return
+
+        with self._lock:
+            self._total_bytes += path.stat().st_size - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for p in self.cache_dir.glob("*.json"):
+            try:
+                stat = p.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, p))
+
+        # Recount, other processes may share the directory
+        self._total_bytes = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+                self._total_bytes -= size
+            except OSError:
+                continue
+
+    def parse(self, parser, file_path: str, digest: Optional[str] = None) -> Dict:
+        """Return the parsed resume, running parser.parse only on a cache miss"""
+        digest = digest or hash_file(file_path)
+        cached = self.get(digest)
+        if cached is not None:
+            logger.info(f"Parse cache hit for {Path(file_path).name}")
+            return cached
+
+        data = parser.parse(file_path)
+        self.put(digest, data)
+        return data
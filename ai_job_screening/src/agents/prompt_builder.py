@@ -0,0 +1,116 @@
+from typing import Dict, List, Optional
+import os
+import re
+from .cv_parser import CVParser
+from .skill_matcher import KeywordMatcher
+
+EDUCATION_PATTERN = re.compile(
+    r"\b(bachelor|master|ph\.?d|doctorate|degree|diploma|university|college|institute|"
+    r"b\.?sc|m\.?sc|b\.?tech|m\.?tech|mba|certification|certified)\b",
+    re.IGNORECASE
+)
+DATE_RANGE_PATTERN = re.compile(r"\b(?:19|20)\d{2}\s*(?:-|to|–)\s*(?:(?:19|20)\d{2}|present|current)\b", re.IGNORECASE)
+
+class PromptBuilder:
+    """
+    Builds compact, token-budgeted text for LLM prompts.
+
+    Instead of the raw resume the candidate is described by a profile made of
+    the resume lines that evidence required skills (best first), the experience
+    timeline from CVParser.extract_experience and education lines. The job
+    description gets a share of the same budget.
+    """
+
+    # Rough characters-per-token ratio for English text with Llama-style tokenizers
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, token_budget: int = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "1500")),
+                 description_share: float = 0.3, cv_parser: Optional[CVParser] = None):
+        self.token_budget = token_budget
+        self.description_share = description_share
+        self.cv_parser = cv_parser or CVParser()
+
+    @classmethod
+    def estimate_tokens(cls, text: str) -> int:
+        return (len(text) + cls.CHARS_PER_TOKEN - 1) // cls.CHARS_PER_TOKEN
+
+    def _fit_lines(self, lines: List[str], budget_tokens: int) -> List[str]:
+        """Take lines in order until the token budget is used up"""
+        selected = []
+        used = 0
+        for line in lines:
+            cost = self.estimate_tokens(line) + 1
+            if used + cost > budget_tokens:
+                remaining_chars = (budget_tokens - used - 1) * self.CHARS_PER_TOKEN
+                if remaining_chars > 40:
+                    selected.append(line[:remaining_chars].rstrip() + "...")
+                break
+            selected.append(line)
+            used += cost
+        return selected
+
+    def compact_description(self, description: str, budget_tokens: Optional[int] = None) -> str:
+        if budget_tokens is None:
+            budget_tokens = int(self.token_budget * self.description_share)
+        lines = [" ".join(line.split()) for line in (description or "").splitlines()]
+        return "\n".join(self._fit_lines([line for line in lines if line], budget_tokens))
+
+    def candidate_profile(self, resume_text: str, required_skills: List[str],
+                          budget_tokens: Optional[int] = None) -> str:
+        if budget_tokens is None:
+            budget_tokens = self.token_budget - int(self.token_budget * self.description_share)
+
+        lines = []
+        seen = set()
+        for line in (resume_text or "").splitlines():
+            line = " ".join(line.split())
+            if line and line not in seen:
+                seen.add(line)
+                lines.append(line)
+
+        # Rank lines by how many required skills they evidence, then by any known skill
+        required_matcher = KeywordMatcher({skill: skill for skill in required_skills})
+        evidence = []
+        for position, line in enumerate(lines):
+            required_hits = len(required_matcher.find(line))
+            other_hits = len(self.cv_parser.skill_matcher.find(line))
+            if required_hits or other_hits:
+                evidence.append((-required_hits, -other_hits, position, line))
+        skill_lines = [line for *_, line in sorted(evidence)]
+
+        education = [line for line in lines if EDUCATION_PATTERN.search(line)]
+
+        # Month-year mentions from the parser, plus lines with year ranges such as "(2019-2023)"
+        timeline = []
+        for entry in self.cv_parser.extract_experience(resume_text or "")["timeline"]:
+            entry = " ".join(entry.split())
+            if entry not in timeline:
+                timeline.append(entry)
+        timeline.extend(
+            line for line in lines
+            if DATE_RANGE_PATTERN.search(line) and line not in education and line not in timeline
+        )
+
+        # Half the budget for skill evidence, the rest split between timeline and education
+        sections = [
+            ("Skill evidence", skill_lines, budget_tokens // 2),
+            ("Experience timeline", timeline, budget_tokens // 4),
+            ("Education", education, budget_tokens // 4)
+        ]
+        parts = []
+        for title, section_lines, section_budget in sections:
+            fitted = self._fit_lines(section_lines, section_budget)
+            if fitted:
+                parts.append(f"{title}:\n" + "\n".join(f"- {line}" for line in fitted))
+        return "\n".join(parts) if parts else "No resume details available."
+
+    def prompt_stats(self, system_msg: str, prompt: str, compact_text: str, raw_text: str) -> Dict:
+        """
+        Token estimates for a prompt, and for the same prompt had the raw
+        text been sent in place of its compact version.
+        """
+        prompt_tokens = self.estimate_tokens(system_msg) + self.estimate_tokens(prompt)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "full_text_prompt_tokens": prompt_tokens - self.estimate_tokens(compact_text) + self.estimate_tokens(raw_text)
+        }
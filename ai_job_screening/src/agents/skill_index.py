@@ -0,0 +1,97 @@
+from typing import Callable, Dict, Iterable, List, Set, Tuple, Union
+import bisect
+import heapq
+import json
+import logging
+import threading
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class SkillIndex:
+    """
+    In-process inverted index from normalized skill to the sorted ids of the
+    candidates that have it. Used to prefilter candidates before scoring so
+    only those sharing at least one required skill are looked at.
+    """
+
+    def __init__(self, normalize_skills: Callable[[List[str]], Set[str]]):
+        # Use the matching engine's normalisation so the index agrees with scoring
+        self.normalize_skills = normalize_skills
+        self.postings: Dict[str, List[int]] = {}
+        self.candidate_skills: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _decode(self, skills: Union[str, Iterable[str], None]) -> List[str]:
+        if skills is None:
+            return []
+        if isinstance(skills, str):
+            try:
+                return json.loads(skills or '[]')
+            except json.JSONDecodeError:
+                return [s.strip() for s in skills.split(',') if s.strip()]
+        return list(skills)
+
+    def build(self, rows: Iterable[Tuple[int, Union[str, List[str]]]]) -> None:
+        """Rebuild the index from (candidate_id, skills) rows"""
+        postings: Dict[str, List[int]] = {}
+        candidate_skills: Dict[int, Set[str]] = {}
+
+        for candidate_id, skills in rows:
+            normalized = self.normalize_skills(self._decode(skills))
+            candidate_skills[candidate_id] = normalized
+            for skill in normalized:
+                postings.setdefault(skill, []).append(candidate_id)
+
+        for ids in postings.values():
+            ids.sort()
+
+        with self._lock:
+            self.postings = postings
+            self.candidate_skills = candidate_skills
+
+        logger.info(f"Built skill index: {len(candidate_skills)} candidates, {len(postings)} skills")
+
+    def add(self, candidate_id: int, skills: Union[str, List[str], None]) -> None:
+        """Add or replace a single candidate in the index"""
+        normalized = self.normalize_skills(self._decode(skills))
+
+        with self._lock:
+            self._remove(candidate_id)
+            self.candidate_skills[candidate_id] = normalized
+            for skill in normalized:
+                bisect.insort(self.postings.setdefault(skill, []), candidate_id)
+
+    def remove(self, candidate_id: int) -> None:
+        with self._lock:
+            self._remove(candidate_id)
+
+    def _remove(self, candidate_id: int) -> None:
+        for skill in self.candidate_skills.pop(candidate_id, ()):
+            ids = self.postings.get(skill)
+            if not ids:
+                continue
+            pos = bisect.bisect_left(ids, candidate_id)
+            if pos < len(ids) and ids[pos] == candidate_id:
+                del ids[pos]
+            if not ids:
+                del self.postings[skill]
+
+    def candidates_for(self, skills: Union[str, List[str], None]) -> List[int]:
+        """Return the sorted ids of candidates sharing at least one of the given skills"""
+        normalized = self.normalize_skills(self._decode(skills))
+
+        with self._lock:
+            lists = [self.postings[skill] for skill in normalized if skill in self.postings]
+
+            # Merge the sorted posting lists, dropping duplicates
+            result: List[int] = []
+            for candidate_id in heapq.merge(*lists):
+                if not result or result[-1] != candidate_id:
+                    result.append(candidate_id)
+
+        return result
+
+    def __len__(self) -> int:
+        return len(self.candidate_skills)
@@ -0,0 +1,88 @@
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Union
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+class KeywordMatcher:
+    """
+    Aho-Corasick multi-pattern matcher. The automaton is compiled once from a
+    pattern -> label mapping and then finds every pattern in a single pass over
+    the text, so the cost depends on the text length rather than the vocabulary.
+
+    With whole_words=True a match must start and end on a word boundary, so
+    "java" does not fire inside "javascript" and "ai" not inside "maintain".
+    With whole_words=False only the start is checked, which lets "deploy" match
+    "deployment". Boundaries are only enforced where the pattern itself starts or
+    ends with a word character, so patterns like "c++" or ".net" still match.
+    """
+
+    def __init__(self, patterns: Union[Dict[str, str], Iterable[Tuple[str, str]]], whole_words: bool = True):
+        self.whole_words = whole_words
+
+        # Trie as parallel lists indexed by state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+
+        items = patterns.items() if isinstance(patterns, dict) else patterns
+        for pattern, label in items:
+            pattern = pattern.lower().strip()
+            if pattern:
+                self._add(pattern, label)
+
+        self._build_failure_links()
+
+    def _add(self, pattern: str, label: str) -> None:
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][ch] = next_state
+            state = next_state
+        self._output[state].append((len(pattern), label))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                # Inherit the outputs of the longest proper suffix
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, label) for every boundary-respecting match in text"""
+        text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        text_len = len(text)
+        state = 0
+
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not output[state]:
+                continue
+
+            end = i + 1
+            for length, label in output[state]:
+                start = end - length
+                if _is_word_char(text[start]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if (self.whole_words and _is_word_char(text[i])
+                        and end < text_len and _is_word_char(text[end])):
+                    continue
+                yield start, end, label
+
+    def find(self, text: str) -> Set[str]:
+        """Return the set of labels found in text"""
+        return {label for _, _, label in self.iter_matches(text)}
@@ -0,0 +1,175 @@
+from typing import Dict, Iterable, List, Optional, Set, Union
+import json
+import re
+from .skill_matcher import KeywordMatcher
+
+# The one list of skills known to the system: canonical name -> (category, aliases).
+# A skill's id is its position here and skill sets are bitsets over those ids, so
+# add new skills at the end and bump MatchingEngine.FEATURE_VERSION whenever this
+# table changes, since stored candidate features hold bitsets.
+SKILLS = {
+    # Programming Languages
+    "python": ("programming", ["python3", "py", "django", "flask", "fastapi"]),
+    "javascript": ("programming", ["js", "ecmascript", "typescript", "node.js", "nodejs"]),
+    "java": ("programming", ["core java", "java ee", "spring", "hibernate"]),
+    "c++": ("programming", ["cpp", "c plus plus"]),
+
+    # Web Technologies
+    "react": ("web", ["reactjs", "react.js"]),
+    "angular": ("web", ["angularjs", "angular.js"]),
+    "vue": ("web", ["vuejs", "vue.js"]),
+    "web development": ("web", ["web dev", "frontend", "front end", "backend", "back end", "fullstack", "full stack"]),
+    "api": ("web", ["rest api", "restful", "graphql"]),
+
+    # Databases
+    "sql": ("database", ["mysql", "postgresql", "postgres", "oracle", "tsql", "sql server"]),
+    "mongodb": ("database", ["mongo", "nosql"]),
+
+    # Cloud & DevOps
+    "aws": ("cloud", ["amazon web services", "amazon aws", "ec2", "s3", "lambda"]),
+    "docker": ("cloud", ["container", "containers", "containerization"]),
+    "kubernetes": ("cloud", ["k8s"]),
+    "cloud": ("cloud", ["cloud computing"]),
+
+    # AI/ML
+    "machine learning": ("ai_ml", ["ml", "machine-learning"]),
+    "deep learning": ("ai_ml", ["dl", "neural networks"]),
+    "artificial intelligence": ("ai_ml", ["ai"]),
+    "tensorflow": ("ai_ml", ["tf"]),
+    "pytorch": ("ai_ml", ["torch"]),
+    "nlp": ("ai_ml", ["natural language processing"]),
+    "computer vision": ("ai_ml", ["image processing"]),
+    "data science": ("ai_ml", ["data analysis", "data analytics"]),
+
+    # Big Data
+    "big data": ("big_data", ["bigdata"]),
+    "spark": ("big_data", ["pyspark"]),
+    "hadoop": ("big_data", ["hdfs", "mapreduce"]),
+    "kafka": ("big_data", ["event streaming"]),
+
+    # Other
+    "git": ("other", ["github", "gitlab", "version control"]),
+    "agile": ("other", ["scrum", "kanban"]),
+    "devops": ("other", ["ci/cd", "continuous integration", "jenkins"]),
+
+    # Soft skills
+    "communication": ("soft", ["communication skills"]),
+    "leadership": ("soft", ["team lead", "team leadership"]),
+    "problem solving": ("soft", ["problem-solving"])
+}
+
+# Relative importance of each category when scoring skill coverage per category
+CATEGORY_WEIGHTS = {
+    "programming": 0.25,
+    "web": 0.15,
+    "database": 0.15,
+    "cloud": 0.15,
+    "ai_ml": 0.25,
+    "big_data": 0.15,
+    "other": 0.1,
+    "soft": 0.1
+}
+
+class SkillVocabulary:
+    """
+    Compiled skill vocabulary. Every skill gets an integer id and every
+    category a bitmask of its skills' ids, so a set of skills is a single
+    Python int: overlap is popcount(a & b) and per-category coverage is the
+    same with a category mask applied.
+    """
+
+    def __init__(self, skills: Dict[str, tuple] = SKILLS):
+        self.names: List[str] = list(skills)
+        self.categories: List[str] = [category for category, _ in skills.values()]
+        self._ids: Dict[str, int] = {}
+        self.category_masks: Dict[str, int] = {}
+
+        for skill_id, (name, (category, aliases)) in enumerate(skills.items()):
+            for alias in [name] + aliases:
+                self._ids[alias.lower()] = skill_id
+            self.category_masks[category] = self.category_masks.get(category, 0) | (1 << skill_id)
+
+        # Finds every alias in a single pass, labelled with the canonical name
+        self.matcher = KeywordMatcher([(alias, self.names[skill_id]) for alias, skill_id in self._ids.items()])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def skill_id(self, skill: str) -> Optional[int]:
+        return self._ids.get(skill.lower().strip())
+
+    def _decode(self, skills: Union[str, Iterable[str], None]) -> List[str]:
+        if skills is None:
+            return []
+        if isinstance(skills, str):
+            try:
+                return json.loads(skills or '[]')
+            except json.JSONDecodeError:
+                return [s.strip() for s in skills.split(',') if s.strip()]
+        return list(skills)
+
+    def to_bits(self, skills: Union[str, Iterable[str], None]) -> int:
+        """Bitset of a list of skill names or aliases (or its JSON); unknown names are ignored"""
+        bits = 0
+        for skill in self._decode(skills):
+            skill_id = self.skill_id(skill)
+            if skill_id is not None:
+                bits |= 1 << skill_id
+        return bits
+
+    def ids(self, bits: int) -> List[int]:
+        ids = []
+        while bits:
+            low = bits & -bits
+            ids.append(low.bit_length() - 1)
+            bits ^= low
+        return ids
+
+    def from_bits(self, bits: int) -> List[str]:
+        return [self.names[skill_id] for skill_id in self.ids(bits)]
+
+    def canonicalize(self, skills: Union[str, Iterable[str], None]) -> Set[str]:
+        """Canonical names of the known skills in a list of names or aliases"""
+        return set(self.from_bits(self.to_bits(skills)))
+
+    def find(self, text: str) -> List[str]:
+        """Canonical names of the skills mentioned in text, in vocabulary order"""
+        return self.from_bits(self.to_bits(self.matcher.find(text)))
+
+    def category_coverage(self, required: int, candidate: int) -> float:
+        """
+        Share of the required skills the candidate has, per category, averaged
+        with CATEGORY_WEIGHTS over the categories the job asks for
+        """
+        total_score = 0.0
+        total_weight = 0.0
+        for category, mask in self.category_masks.items():
+            required_in_category = required & mask
+            if not required_in_category:
+                continue
+            weight = CATEGORY_WEIGHTS.get(category, 0.1)
+            total_score += weight * (required_in_category & candidate).bit_count() / required_in_category.bit_count()
+            total_weight += weight
+        return total_score / total_weight if total_weight else 0.0
+
+SKILL_VOCABULARY = SkillVocabulary()
+
+def extract_job_skills(text: str) -> List[str]:
+    """Extract the known skills mentioned in a job description, in vocabulary order"""
+    return SKILL_VOCABULARY.find(text)
+
+EXPERIENCE_PATTERN = re.compile(r'(\d+)\+?\s*(?:years?|yrs?)')
+QUALIFICATION_KEYWORDS = ["bachelor", "master", "phd", "degree", "certification"]
+
+def extract_job_requirements(description: str) -> Dict:
+    """Required skills, years of experience and qualification lines stated in a job description"""
+    text = description.lower()
+    experience_match = EXPERIENCE_PATTERN.search(text)
+    return {
+        "required_skills": extract_job_skills(text),
+        "required_experience": int(experience_match.group(1)) if experience_match else 0,
+        "required_qualifications": [
+            line.strip() for line in text.split('\n')
+            if any(keyword in line for keyword in QUALIFICATION_KEYWORDS)
+        ]
+    }
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+import bisect
+import heapq
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Interval = Tuple[datetime, datetime]
+
+def naive_utc(value: datetime) -> datetime:
+    """Bookings are stored as naive UTC; convert an offset-aware time to that, leave a naive one as is"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+class IntervalIndex:
+    """
+    Busy intervals per owner (interviewer or candidate), kept as
+    non-overlapping intervals sorted by start. Only the intervals next to a
+    query's position can overlap it, so each check is one bisect.
+    """
+
+    def __init__(self):
+        self.starts: Dict[Hashable, List[datetime]] = {}
+        self.ends: Dict[Hashable, List[datetime]] = {}
+
+    def overlaps(self, owner: Hashable, start: datetime, end: datetime) -> bool:
+        starts = self.starts.get(owner)
+        if not starts:
+            return False
+        # The last interval starting before `end` is the only one that can reach past `start`
+        position = bisect.bisect_left(starts, end)
+        return position > 0 and self.ends[owner][position - 1] > start
+
+    def add(self, owner: Hashable, start: datetime, end: datetime) -> None:
+        starts = self.starts.setdefault(owner, [])
+        ends = self.ends.setdefault(owner, [])
+        position = bisect.bisect_left(starts, start)
+        # Merge with any intervals it touches so the lists stay non-overlapping
+        while position > 0 and ends[position - 1] >= start:
+            position -= 1
+            start = min(start, starts[position])
+            end = max(end, ends[position])
+            del starts[position], ends[position]
+        while position < len(starts) and starts[position] <= end:
+            end = max(end, ends[position])
+            del starts[position], ends[position]
+        starts.insert(position, start)
+        ends.insert(position, end)
+
+class SlotAllocator:
+    """
+    Assigns interview slots to candidates from interviewer availability windows.
+    Windows are cut into back-to-back slots of `duration`, and candidates are
+    served in the order given (best match first), each taking the earliest free
+    slot. A slot is never given out if it overlaps anything already booked for
+    its interviewer or for the candidate, including bookings made earlier in the
+    same run.
+    """
+
+    def __init__(self, duration: timedelta = timedelta(hours=1), gap: timedelta = timedelta(0)):
+        self.duration = duration
+        self.gap = gap
+
+    def slots(self, windows: Iterable[Tuple[str, datetime, datetime]]) -> List[Tuple[datetime, str, datetime]]:
+        """Candidate slots (start, interviewer, end) cut from the windows, earliest first"""
+        slots = []
+        for interviewer, window_start, window_end in windows:
+            start = window_start
+            while start + self.duration <= window_end:
+                slots.append((start, interviewer, start + self.duration))
+                start += self.duration + self.gap
+        heapq.heapify(slots)
+        return slots
+
+    def allocate(self,
+                 candidates: List[Hashable],
+                 windows: Iterable[Tuple[str, datetime, datetime]],
+                 interviewer_bookings: Iterable[Tuple[str, datetime, datetime]] = (),
+                 candidate_bookings: Iterable[Tuple[Hashable, datetime, datetime]] = ()
+                 ) -> Tuple[Dict[Hashable, Tuple[str, datetime, datetime]], List[Hashable]]:
+        """
+        Returns the (interviewer, start, end) booked per candidate and the
+        candidates left without a slot.
+        """
+        interviewers = IntervalIndex()
+        for interviewer, start, end in interviewer_bookings:
+            interviewers.add(interviewer, start, end)
+        busy_candidates = IntervalIndex()
+        for candidate, start, end in candidate_bookings:
+            busy_candidates.add(candidate, start, end)
+
+        free = self.slots(windows)
+        assigned: Dict[Hashable, Tuple[str, datetime, datetime]] = {}
+        unassigned: List[Hashable] = []
+
+        for candidate in candidates:
+            # Slots this candidate cannot take stay available for the next one
+            skipped = []
+            slot: Optional[Tuple[datetime, str, datetime]] = None
+            while free:
+                start, interviewer, end = heapq.heappop(free)
+                if interviewers.overlaps(interviewer, start, end):
+                    continue  # Taken for good, overlapping windows or an existing booking
+                if busy_candidates.overlaps(candidate, start, end):
+                    skipped.append((start, interviewer, end))
+                    continue
+                slot = (start, interviewer, end)
+                break
+            for skipped_slot in skipped:
+                heapq.heappush(free, skipped_slot)
+
+            if slot is None:
+                unassigned.append(candidate)
+                continue
+            start, interviewer, end = slot
+            interviewers.add(interviewer, start, end)
+            busy_candidates.add(candidate, start, end)
+            assigned[candidate] = (interviewer, start, end)
+
+        logger.info(f"Allocated {len(assigned)} interview slots, {len(unassigned)} candidates left without one")
+        return assigned, unassigned
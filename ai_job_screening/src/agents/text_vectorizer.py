@@ -0,0 +1,162 @@
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+import math
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from .bm25_index import tokenize
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+VECTOR_DIM = int(os.getenv("TEXT_VECTOR_DIM", "1024"))
+
+class HashingVectorizer:
+    """
+    Maps text to a fixed-width float32 term-frequency vector without a
+    vocabulary: each token and adjacent token pair is hashed to a column,
+    with a second hash bit choosing the sign so collisions tend to cancel
+    out. Frequencies are sublinear (1 + log tf). IDF weighting is left to
+    VectorIndex, which knows the corpus, so stored vectors never go stale.
+    """
+
+    def __init__(self, n_features: int = VECTOR_DIM):
+        self.n_features = n_features
+
+    def _terms(self, text: str) -> Dict[str, int]:
+        tokens = tokenize(text)
+        counts: Dict[str, int] = {}
+        for term in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            counts[term] = counts.get(term, 0) + 1
+        return counts
+
+    def transform(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        for term, tf in self._terms(text).items():
+            h = zlib.crc32(term.encode("utf-8"))
+            sign = 1.0 if h & 0x80000000 else -1.0
+            vector[h % self.n_features] += sign * (1.0 + math.log(tf))
+        return vector
+
+    @staticmethod
+    def to_bytes(vector: np.ndarray) -> bytes:
+        return np.asarray(vector, dtype=np.float32).tobytes()
+
+    @staticmethod
+    def from_bytes(data: Optional[bytes]) -> Optional[np.ndarray]:
+        if not data:
+            return None
+        return np.frombuffer(data, dtype=np.float32)
+
+def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Plain cosine of two term-frequency vectors, for when no corpus statistics are at hand"""
+    norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(a @ b) / norm if norm else 0.0
+
+class VectorIndex:
+    """
+    In-memory matrix of candidate term-frequency vectors, one row per candidate.
+
+    Document frequencies per column are kept up to date as rows come and go,
+    so the TF-IDF cosine of a job against every candidate is computed with
+    IDF weights for the current pool: one matrix-vector product for the dot
+    products, plus one for the weighted row norms, which are cached until the
+    pool changes.
+    """
+
+    def __init__(self, n_features: int = VECTOR_DIM, initial_capacity: int = 1024):
+        self.n_features = n_features
+        self._matrix = np.zeros((initial_capacity, n_features), dtype=np.float32)
+        self._ids = np.zeros(initial_capacity, dtype=np.int64)
+        self._rows: Dict[int, int] = {}
+        self._df = np.zeros(n_features, dtype=np.int64)
+        self._row_norms: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def build(self, rows: Iterable[Tuple[int, Optional[np.ndarray]]]) -> None:
+        """Rebuild the index from (candidate_id, vector) rows, skipping missing vectors"""
+        with self._lock:
+            self._rows = {}
+            self._df[:] = 0
+            self._row_norms = None
+            for candidate_id, vector in rows:
+                if vector is not None and len(vector) == self.n_features:
+                    self._add(candidate_id, vector)
+        logger.info(f"Built vector index: {len(self._rows)} candidates, {self.n_features} dimensions")
+
+    def add(self, candidate_id: int, vector: Optional[np.ndarray]) -> None:
+        if vector is None or len(vector) != self.n_features:
+            return
+        with self._lock:
+            self._add(candidate_id, vector)
+
+    def _add(self, candidate_id: int, vector: np.ndarray) -> None:
+        row = self._rows.get(candidate_id)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self._matrix):
+                # Grow geometrically so appends stay amortized O(1)
+                self._matrix = np.concatenate([self._matrix, np.zeros_like(self._matrix)])
+                self._ids = np.concatenate([self._ids, np.zeros_like(self._ids)])
+            self._rows[candidate_id] = row
+            self._ids[row] = candidate_id
+        else:
+            self._df -= self._matrix[row] != 0
+        self._matrix[row] = vector
+        self._df += vector != 0
+        self._row_norms = None
+
+    def remove(self, candidate_id: int) -> None:
+        with self._lock:
+            row = self._rows.pop(candidate_id, None)
+            if row is None:
+                return
+            self._df -= self._matrix[row] != 0
+            # Move the last row into the gap to keep the matrix dense
+            last = len(self._rows)
+            if row != last:
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = self._ids[last]
+                self._rows[int(self._ids[row])] = row
+            self._matrix[last] = 0
+            self._row_norms = None
+
+    def _idf(self, n: int) -> np.ndarray:
+        return (np.log((1 + n) / (1 + self._df)) + 1).astype(np.float32)
+
+    def similarities(self, query: Optional[np.ndarray],
+                     candidate_ids: Optional[Iterable[int]] = None) -> Dict[int, float]:
+        """
+        TF-IDF cosine similarity of the query vector against every indexed
+        candidate, or only against the given ones
+        """
+        with self._lock:
+            n = len(self._rows)
+            if not n or query is None or len(query) != self.n_features:
+                return {}
+            idf_sq = self._idf(n) ** 2
+            query_norm = float(np.sqrt(np.square(query) @ idf_sq))
+            if not query_norm:
+                return {}
+            
+            if candidate_ids is None:
+                rows = slice(0, n)
+                if self._row_norms is None:
+                    self._row_norms = np.sqrt(np.square(self._matrix[:n]) @ idf_sq)
+                row_norms = self._row_norms
+            else:
+                rows = np.array([self._rows[c] for c in candidate_ids if c in self._rows], dtype=np.int64)
+                if self._row_norms is not None:
+                    row_norms = self._row_norms[rows]
+                else:
+                    row_norms = np.sqrt(np.square(self._matrix[rows]) @ idf_sq)
+            
+            scores = (self._matrix[rows] @ (query * idf_sq)) / (row_norms * query_norm + 1e-12)
+            return dict(zip(self._ids[rows].tolist(), scores.tolist()))
+
+    def __len__(self) -> int:
+        return len(self._rows)
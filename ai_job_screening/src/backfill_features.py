@@ -0,0 +1,71 @@
+"""
+Compute stored matching features for existing candidates, and
+description vectors for jobs saved without one.
+Only candidates without features, or with features from an older
+extractor version, are processed unless --all is given.
+"""
+import argparse
+import time
+
+from database.database import SessionLocal, engine, add_missing_columns
+from database.models import Base, Candidate, CandidateFeatures, JobDescription
+from agents.matching_engine import MatchingEngine
+from agents.text_vectorizer import HashingVectorizer
+
+def backfill_features(batch_size: int = 500, recompute_all: bool = False) -> int:
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(Base.metadata)
+    matching_engine = MatchingEngine()
+    db = SessionLocal()
+    updated = 0
+    last_id = 0
+    start_time = time.perf_counter()
+    
+    try:
+        while True:
+            # Walk the candidates in id order, one batch at a time
+            query = db.query(
+                Candidate.id,
+                Candidate.resume_text,
+                Candidate.skills,
+                Candidate.experience_years,
+                Candidate.qualifications
+            ).outerjoin(
+                CandidateFeatures, CandidateFeatures.candidate_id == Candidate.id
+            ).filter(Candidate.id > last_id)
+            if not recompute_all:
+                query = query.filter(
+                    (CandidateFeatures.candidate_id == None) |
+                    (CandidateFeatures.version != MatchingEngine.FEATURE_VERSION)
+                )
+            rows = query.order_by(Candidate.id).limit(batch_size).all()
+            if not rows:
+                break
+            
+            for row in rows:
+                features = matching_engine.extract_features(row._asdict())
+                db.merge(CandidateFeatures.from_features(row.id, MatchingEngine.FEATURE_VERSION, features))
+            db.commit()
+            
+            updated += len(rows)
+            last_id = rows[-1].id
+            print(f"Updated features for {updated} candidates (up to id {last_id})")
+        
+        jobs = db.query(JobDescription).filter(JobDescription.tf_vector == None).all()
+        for job in jobs:
+            job.tf_vector = HashingVectorizer.to_bytes(matching_engine.vectorizer.transform(job.description))
+        db.commit()
+        if jobs:
+            print(f"Stored description vectors for {len(jobs)} jobs")
+    finally:
+        db.close()
+    
+    print(f"Backfill complete: {updated} candidates in {time.perf_counter() - start_time:.2f}s")
+    return updated
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill candidate matching features")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--all", action="store_true", help="Recompute features for every candidate")
+    args = parser.parse_args()
+    backfill_features(args.batch_size, args.all)
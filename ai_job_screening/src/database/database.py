@@ -1,11 +1,18 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from pathlib import Path
+import os
+
+# Where the database, indexes, caches and uploads live; JOB_SCREENING_DATA_DIR moves all of them.
+# Everything else takes its paths from here, so there is one default
+DATA_DIR = Path(os.getenv("JOB_SCREENING_DATA_DIR", Path(__file__).parent.parent / "data"))
 
 # Create database directory if it doesn't exist
-db_dir = Path(__file__).parent.parent / "data"
-db_dir.mkdir(exist_ok=True)
+db_dir = DATA_DIR
+db_dir.mkdir(parents=True, exist_ok=True)
 
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{db_dir}/job_screening.db"
 print(f"Database path: {db_dir}/job_screening.db")
@@ -15,11 +22,65 @@ engine = create_engine(
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on the same database for request handlers: aiosqlite runs each
+# connection on its own thread, so queries no longer block the event loop
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{db_dir}/job_screening.db"
+
+# aiosqlite defaults to NullPool, which reopens the file and reruns the
+# pragmas for every session; keep connections around instead
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=AsyncAdaptedQueuePool, pool_size=10, max_overflow=20
+)
+# Rows stay usable after commit, handlers build their responses from them
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+@event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers carry on while a write is in progress, and the busy
+    # timeout makes writers wait for each other instead of failing
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
 Base = declarative_base()
 
+def add_missing_columns(metadata):
+    """
+    create_all only creates missing tables, so add the columns and indexes
+    that were introduced after a table was first created
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                    print(f"Added column {table.name}.{column.name}")
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db() -> AsyncSession:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def begin_immediate(db: AsyncSession) -> None:
+    """
+    Take SQLite's write lock now rather than at the first write, so what the
+    transaction reads next cannot be changed by another writer before it
+    commits. Call it before the session's first write; commit or rollback
+    releases the lock, other writers wait on the busy timeout meanwhile.
+    """
+    await db.execute(text("BEGIN IMMEDIATE"))
@@ -1,7 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, LargeBinary, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from array import array
+import json
+import numpy as np
 
 Base = declarative_base()
 
@@ -15,6 +18,7 @@ class JobDescription(Base):
     required_skills = Column(Text, nullable=False)
     required_experience = Column(Integer)
     required_qualifications = Column(Text)
+    tf_vector = Column(LargeBinary)  # float32 hashed term-frequency vector of the description
     created_at = Column(DateTime, default=datetime.utcnow)
     
     candidates = relationship("CandidateMatch", back_populates="job")
@@ -45,5 +49,158 @@ class CandidateMatch(Base):
     interview_datetime = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Full match result; the model's part is reused while the fingerprint of its inputs is unchanged
+    fingerprint = Column(String(64))
+    scoring_version = Column(Integer)
+    model = Column(String(255))
+    detailed_scores = Column(Text)  # JSON object
+    ai_reasoning = Column(Text)
+    interview_questions = Column(Text)  # JSON list
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
     job = relationship("JobDescription", back_populates="candidates")
     candidate = relationship("Candidate", back_populates="matches")
+    
+    __table_args__ = (
+        Index("ix_candidate_matches_job_candidate", "job_id", "candidate_id"),
+        # Serves "top matches for a job" in score order straight from the index, including
+        # keyset pages on (match_score, id); candidate_id and shortlisted make it covering
+        Index("ix_candidate_matches_job_score", job_id, match_score.desc(), id.desc(), candidate_id, shortlisted),
+    )
+
+class CandidateFeatures(Base):
+    """Matching features derived from a candidate at ingest time"""
+    __tablename__ = "candidate_features"
+    
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), primary_key=True)
+    version = Column(Integer, nullable=False)
+    skills = Column(Text)  # Hex skill bitset over the skill vocabulary ids
+    keywords = Column(Text)  # JSON list of technical keywords found in the resume
+    token_hashes = Column(LargeBinary)  # Packed 32-bit hashes of the resume tokens
+    experience_years = Column(Float)
+    qualifications = Column(Text)  # JSON list of normalized qualifications
+    tf_vector = Column(LargeBinary)  # float32 hashed term-frequency vector of the resume
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @staticmethod
+    def feature_columns(features: dict) -> dict:
+        """Column values storing a feature record, also used for bulk inserts"""
+        return {
+            "skills": format(features["skills"], "x"),
+            "keywords": json.dumps(sorted(features["keywords"])),
+            "token_hashes": array("I", sorted(features["token_hashes"])).tobytes(),
+            "experience_years": features["experience_years"],
+            "qualifications": json.dumps(sorted(features["qualifications"])),
+            "tf_vector": np.asarray(features["tf_vector"], dtype=np.float32).tobytes()
+        }
+    
+    @classmethod
+    def from_features(cls, candidate_id: int, version: int, features: dict) -> "CandidateFeatures":
+        return cls(candidate_id=candidate_id, version=version, **cls.feature_columns(features))
+    
+    def to_features(self) -> dict:
+        token_hashes = array("I")
+        token_hashes.frombytes(self.token_hashes or b"")
+        return {
+            "skills": int(self.skills or "0", 16),
+            "keywords": set(json.loads(self.keywords or "[]")),
+            "token_hashes": set(token_hashes),
+            "experience_years": self.experience_years or 0.0,
+            "qualifications": set(json.loads(self.qualifications or "[]")),
+            "tf_vector": np.frombuffer(self.tf_vector, dtype=np.float32) if self.tf_vector else None
+        }
+
+class ImportManifest(Base):
+    """Files and CSV rows already imported by import_dataset, so re-runs only process what changed"""
+    __tablename__ = "import_manifest"
+    
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(32), nullable=False)  # "resume", "job_csv", or "job" for a single CSV row
+    path = Column(String(1024), nullable=False)  # Absolute file path, "<csv path>#<title>" for CSV rows
+    size = Column(Integer)
+    mtime_ns = Column(Integer)
+    content_hash = Column(String(64), nullable=False)  # SHA-256 of the file, or of the row's description
+    record_id = Column(Integer)  # Candidate or job the entry produced
+    imported_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("kind", "path", name="uq_import_manifest_kind_path"),
+    )
+
+class ScreeningBatch(Base):
+    """A request to screen many candidates against one job, worked off by the task queue"""
+    __tablename__ = "screening_batches"
+    
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("job_descriptions.id"), nullable=False)
+    total = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    tasks = relationship("ScreeningTask", back_populates="batch")
+
+class ScreeningTask(Base):
+    """One job/candidate pair of a batch; claimed by a worker, retried until max attempts"""
+    __tablename__ = "screening_tasks"
+    
+    id = Column(Integer, primary_key=True)
+    batch_id = Column(Integer, ForeignKey("screening_batches.id"), nullable=False)
+    job_id = Column(Integer, ForeignKey("job_descriptions.id"), nullable=False)
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False)
+    status = Column(String(16), nullable=False, default="pending")  # pending, running, done or failed
+    attempts = Column(Integer, nullable=False, default=0)
+    match_id = Column(Integer, ForeignKey("candidate_matches.id"))
+    error = Column(Text)  # Last failure, kept while the task is retried
+    retry_at = Column(DateTime)  # A failed attempt is not retried before this time
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    
+    batch = relationship("ScreeningBatch", back_populates="tasks")
+    
+    __table_args__ = (
+        UniqueConstraint("batch_id", "candidate_id", name="uq_screening_tasks_batch_candidate"),
+        # Workers claim the oldest pending task
+        Index("ix_screening_tasks_status", "status", "id"),
+    )
+
+class EmailOutbox(Base):
+    """Rendered emails waiting for the background sender, written in the same transaction as the change they announce"""
+    __tablename__ = "email_outbox"
+    
+    id = Column(Integer, primary_key=True)
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(512), nullable=False)
+    html_body = Column(Text, nullable=False)
+    match_id = Column(Integer, ForeignKey("candidate_matches.id"))
+    status = Column(String(16), nullable=False, default="pending")  # pending, sending, sent or failed
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    retry_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index("ix_email_outbox_status", "status", "id"),
+    )
+
+class InterviewBooking(Base):
+    """
+    An interview slot held by one shortlisted match. The constraints only catch
+    identical start times; overlaps are prevented by the handlers, which check
+    and insert under one write lock (database.begin_immediate).
+    """
+    __tablename__ = "interview_bookings"
+    
+    id = Column(Integer, primary_key=True)
+    match_id = Column(Integer, ForeignKey("candidate_matches.id"), nullable=False)
+    job_id = Column(Integer, ForeignKey("job_descriptions.id"), nullable=False)
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False)
+    interviewer = Column(String(255), nullable=False)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("match_id", name="uq_interview_bookings_match"),
+        UniqueConstraint("interviewer", "start_time", name="uq_interview_bookings_interviewer_start"),
+        UniqueConstraint("candidate_id", "start_time", name="uq_interview_bookings_candidate_start"),
+    )
@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import smtplib
+import threading
+import time
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+class OutboxSender:
+    """
+    Background sender for the email_outbox table. Claims pending emails in
+    batches and sends them one after another over a single mailer connection
+    (see agents.interview_scheduler.SMTPMailer), which stays open while there is
+    mail to send and is closed after idle_timeout seconds without any. After
+    being woken it waits batch_window seconds so bursts go out together. smtplib
+    blocks, so each batch is sent on a worker thread. Failed emails are retried
+    with exponential backoff up to max_attempts; emails a previous process was
+    sending are put back to pending when the sender starts.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, mailer, build_message: Callable,
+                 batch_size: int = 50, max_attempts: int = 5, retry_delay: float = 30.0,
+                 poll_interval: float = 5.0, idle_timeout: float = 60.0, batch_window: float = 0.5):
+        self.session_factory = session_factory
+        self.mailer = mailer
+        self.build_message = build_message
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.batch_window = batch_window
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # A cancelled batch keeps running on its thread; closing must wait for it
+        self._mailer_lock = threading.Lock()
+
+    def add(self, db: AsyncSession, recipient: str, subject: str, html_body: str,
+            match_id: int = None) -> EmailOutbox:
+        """Stage an email in the caller's transaction; call notify() once it is committed"""
+        email = EmailOutbox(
+            recipient=recipient, subject=subject, html_body=html_body, match_id=match_id, status="pending"
+        )
+        db.add(email)
+        return email
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(EmailOutbox).where(EmailOutbox.status == "sending").values(status="pending")
+            )
+            await db.commit()
+        if result.rowcount:
+            logger.info(f"Requeued {result.rowcount} emails left sending by the previous process")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.to_thread(self._close_mailer)
+
+    def _close_mailer(self) -> None:
+        with self._mailer_lock:
+            self.mailer.close()
+
+    async def counts(self, db: AsyncSession) -> Dict[str, int]:
+        counts = {"pending": 0, "sending": 0, "sent": 0, "failed": 0}
+        rows = await db.execute(select(EmailOutbox.status, func.count()).group_by(EmailOutbox.status))
+        counts.update(dict(rows.all()))
+        return counts
+
+    async def _claim(self) -> List[EmailOutbox]:
+        async with self.session_factory() as db:
+            now = datetime.utcnow()
+            due = select(EmailOutbox.id).where(
+                EmailOutbox.status == "pending",
+                or_(EmailOutbox.retry_at.is_(None), EmailOutbox.retry_at <= now)
+            ).order_by(EmailOutbox.id).limit(self.batch_size)
+            emails = list((await db.execute(
+                update(EmailOutbox).where(EmailOutbox.id.in_(due)).values(
+                    status="sending", attempts=EmailOutbox.attempts + 1
+                ).returning(EmailOutbox)
+            )).scalars())
+            await db.commit()
+            return sorted(emails, key=lambda email: email.id)
+
+    def _send_batch(self, emails: List[EmailOutbox]) -> Tuple[Dict[int, Optional[str]], Set[int]]:
+        """
+        Send on the worker thread. Returns the error per email id, None when sent,
+        and the ids whose recipient the server refused.
+        """
+        errors = {}
+        refused = set()
+        with self._mailer_lock:
+            for email in emails:
+                try:
+                    self.mailer.send(self.build_message(email.recipient, email.subject, email.html_body))
+                    errors[email.id] = None
+                except smtplib.SMTPRecipientsRefused as e:
+                    # The server rejected the address, retrying will not help
+                    errors[email.id] = str(e)
+                    refused.add(email.id)
+                except Exception as e:
+                    errors[email.id] = str(e)
+                    if not self.mailer.connected:
+                        # No connection to the server: the rest of the batch would fail the same way
+                        for remaining in emails:
+                            errors.setdefault(remaining.id, str(e))
+                        break
+        return errors, refused
+
+    async def _record(self, emails: List[EmailOutbox], errors: Dict[int, Optional[str]], refused: Set[int]) -> None:
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            sent_ids = [email.id for email in emails if errors[email.id] is None]
+            if sent_ids:
+                await db.execute(
+                    update(EmailOutbox).where(EmailOutbox.id.in_(sent_ids)).values(
+                        status="sent", error=None, sent_at=now
+                    )
+                )
+            for email in emails:
+                error = errors[email.id]
+                if error is None:
+                    continue
+                if email.attempts < self.max_attempts and email.id not in refused:
+                    delay = self.retry_delay * 2 ** (email.attempts - 1)
+                    values = {"status": "pending", "error": error, "retry_at": now + timedelta(seconds=delay)}
+                else:
+                    values = {"status": "failed", "error": error}
+                logger.error(f"Email {email.id} to {email.recipient} failed on attempt {email.attempts}: {error}")
+                await db.execute(update(EmailOutbox).where(EmailOutbox.id == email.id).values(**values))
+            await db.commit()
+
+    async def _run(self) -> None:
+        while True:
+            # Cleared before claiming, so an email committed after an empty claim still wakes us
+            self._wakeup.clear()
+            try:
+                emails = await self._claim()
+            except Exception as e:
+                logger.error(f"Could not claim outbox emails: {str(e)}")
+                emails = []
+
+            if not emails:
+                if self.mailer.connected and time.monotonic() - self.mailer.last_used > self.idle_timeout:
+                    await asyncio.to_thread(self._close_mailer)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                    # Let a burst of scheduling requests land so they go out as one batch
+                    await asyncio.sleep(self.batch_window)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            errors, refused = await asyncio.to_thread(self._send_batch, emails)
+            logger.info(f"Sent {sum(error is None for error in errors.values())} of {len(emails)} outbox emails")
+            try:
+                await self._record(emails, errors, refused)
+            except Exception as e:
+                # Left sending, the emails are requeued on the next start
+                logger.error(f"Could not record the outcome of {len(emails)} outbox emails: {str(e)}")
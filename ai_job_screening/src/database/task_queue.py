@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .models import ScreeningBatch, ScreeningTask
+
+logger = logging.getLogger(__name__)
+
+# Handler for one claimed task: returns the id of the match row it produced
+TaskHandler = Callable[[AsyncSession, ScreeningTask], Awaitable[int]]
+
+class ScreeningQueue:
+    """
+    Persistent in-process task queue for screening batches. Tasks live in the
+    screening_tasks table, so a restart loses nothing: tasks a previous process
+    left running are put back to pending when the queue starts. Workers claim
+    the oldest pending task with a single UPDATE ... RETURNING, which SQLite
+    serializes, so two workers never get the same task. A failed attempt is
+    retried after an exponential backoff, up to max_attempts.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, handler: TaskHandler, workers: int = 2,
+                 max_attempts: int = 3, retry_delay: float = 30.0, poll_interval: float = 5.0):
+        self.session_factory = session_factory
+        self.handler = handler
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Requeue tasks interrupted by the last shutdown and start the workers"""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(ScreeningTask).where(ScreeningTask.status == "running").values(
+                    status="pending", started_at=None
+                )
+            )
+            await db.commit()
+        if result.rowcount:
+            logger.info(f"Requeued {result.rowcount} screening tasks left running by the previous process")
+        self._tasks = [asyncio.create_task(self._worker(number)) for number in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; their in-flight tasks are picked up again on the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, db: AsyncSession, job_id: int, candidate_ids: List[int]) -> ScreeningBatch:
+        """Create a batch with one pending task per candidate and wake the workers"""
+        batch = ScreeningBatch(job_id=job_id, total=len(candidate_ids))
+        db.add(batch)
+        await db.flush()
+        if candidate_ids:
+            await db.execute(insert(ScreeningTask), [
+                {"batch_id": batch.id, "job_id": job_id, "candidate_id": candidate_id, "status": "pending"}
+                for candidate_id in candidate_ids
+            ])
+        await db.commit()
+        self._wakeup.set()
+        return batch
+
+    async def progress(self, db: AsyncSession, batch_id: int) -> Dict[str, int]:
+        """Task counts of a batch by status"""
+        counts = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+        rows = await db.execute(
+            select(ScreeningTask.status, func.count()).where(
+                ScreeningTask.batch_id == batch_id
+            ).group_by(ScreeningTask.status)
+        )
+        counts.update(dict(rows.all()))
+        return counts
+
+    async def _claim(self) -> Optional[ScreeningTask]:
+        async with self.session_factory() as db:
+            now = datetime.utcnow()
+            oldest_pending = select(ScreeningTask.id).where(
+                ScreeningTask.status == "pending",
+                or_(ScreeningTask.retry_at.is_(None), ScreeningTask.retry_at <= now)
+            ).order_by(ScreeningTask.id).limit(1).scalar_subquery()
+            task = (await db.execute(
+                update(ScreeningTask).where(ScreeningTask.id == oldest_pending).values(
+                    status="running",
+                    attempts=ScreeningTask.attempts + 1,
+                    started_at=now
+                ).returning(ScreeningTask)
+            )).scalar()
+            await db.commit()
+            return task
+
+    def is_last_attempt(self, task: ScreeningTask) -> bool:
+        return task.attempts >= self.max_attempts
+
+    async def _finish(self, task: ScreeningTask, match_id: int = None, error: str = None) -> None:
+        if error is None:
+            values = {"status": "done", "match_id": match_id, "error": None, "finished_at": datetime.utcnow()}
+        elif not self.is_last_attempt(task):
+            delay = self.retry_delay * 2 ** (task.attempts - 1)
+            values = {
+                "status": "pending",
+                "error": error,
+                "retry_at": datetime.utcnow() + timedelta(seconds=delay),
+                "started_at": None
+            }
+        else:
+            values = {"status": "failed", "error": error, "finished_at": datetime.utcnow()}
+        async with self.session_factory() as db:
+            await db.execute(update(ScreeningTask).where(ScreeningTask.id == task.id).values(**values))
+            await db.commit()
+
+    async def _worker(self, number: int) -> None:
+        while True:
+            # Cleared before claiming, so a batch enqueued after an empty claim still wakes us
+            self._wakeup.clear()
+            try:
+                task = await self._claim()
+            except Exception as e:
+                logger.error(f"Screening worker {number} could not claim a task: {str(e)}")
+                task = None
+
+            if task is None:
+                # Idle until a batch is enqueued, polling in case tasks were added elsewhere
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                async with self.session_factory() as db:
+                    match_id = await self.handler(db, task)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    f"Screening task {task.id} (job {task.job_id}, candidate {task.candidate_id}) "
+                    f"failed on attempt {task.attempts}: {str(e)}"
+                )
+                match_id, error = None, str(e)
+            else:
+                error = None
+
+            try:
+                await self._finish(task, match_id=match_id, error=error)
+            except Exception as e:
+                # Left running, the task is requeued on the next start
+                logger.error(f"Could not record the outcome of screening task {task.id}: {str(e)}")
@@ -1,35 +1,54 @@
-from fastapi import FastAPI, File, UploadFile, Depends, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, Depends, HTTPException, Form, Query, Body, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
 import uvicorn
 from pathlib import Path
+from typing import List, Optional
 import json
-from datetime import datetime
-import shutil
+from datetime import datetime, timedelta
 import os
+import hashlib
+import base64
+import asyncio
+import aiofiles
+from concurrent.futures import ProcessPoolExecutor
 import logging
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-from database.database import get_db
-from database.models import JobDescription, Candidate, CandidateMatch
+from database.database import DATA_DIR, get_async_db, begin_immediate, SessionLocal, AsyncSessionLocal, async_engine, engine, add_missing_columns
+from database.models import (
+    Base, JobDescription, Candidate, CandidateMatch, CandidateFeatures, ScreeningBatch, ScreeningTask, InterviewBooking
+)
+from database.task_queue import ScreeningQueue
+from database.outbox import OutboxSender
 from agents.jd_summarizer import JobDescriptionSummarizer
-from agents.cv_parser import CVParser
+from agents.cv_parser import CVParser, parse_in_worker
 from agents.matching_engine import MatchingEngine
 from agents.ai_matcher import AIMatchingEngine
+from agents.llm_cache import LLMCache
 from agents.interview_scheduler import InterviewScheduler
+from agents.slot_allocator import SlotAllocator, naive_utc
+from agents.skill_index import SkillIndex
+from agents.skill_vocabulary import extract_job_requirements
+from agents.parse_cache import ParseCache
+from agents.bm25_index import BM25Index
+from agents.text_vectorizer import HashingVectorizer, VectorIndex
 
 # Set up base directory
 BASE_DIR = Path(__file__).parent
 STATIC_DIR = BASE_DIR / "static"
 TEMPLATES_DIR = BASE_DIR / "templates"
-UPLOADS_DIR = BASE_DIR / "data" / "uploads"
+UPLOADS_DIR = DATA_DIR / "uploads"
 
 # Create necessary directories
 STATIC_DIR.mkdir(parents=True, exist_ok=True)
@@ -57,12 +76,118 @@ templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 jd_summarizer = JobDescriptionSummarizer()
 cv_parser = CVParser()
 matching_engine = MatchingEngine()
-ai_matcher = AIMatchingEngine(model_name="llama2")
+llm_cache = LLMCache(DATA_DIR / "llm_cache.db")
+ai_matcher = AIMatchingEngine(model_name="llama2", cache=llm_cache)
 interview_scheduler = InterviewScheduler()
+skill_index = SkillIndex(matching_engine.normalize_skills)
+parse_cache = ParseCache(DATA_DIR / "parse_cache", parser_version=cv_parser.cache_version)
+bm25_index = BM25Index(DATA_DIR / "bm25_index.jsonl")
+vector_index = VectorIndex()
 
 # Create necessary directories
 os.makedirs('uploads', exist_ok=True)
 
+# SQLite limits the number of bound parameters per statement
+ID_CHUNK_SIZE = 500
+
+# Keyword component of matching: "bm25" scores against the resume index, "overlap" counts job keywords found
+KEYWORD_SCORING = os.getenv("MATCH_KEYWORD_SCORING", "bm25")
+
+# Pages parsed before /candidates/ responds; the rest of a long PDF is parsed in the background
+PREVIEW_PAGES = int(os.getenv("CV_PREVIEW_PAGES", "2"))
+
+# Upload limits and the process pool that keeps parsing off the event loop
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 256 * 1024
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+parse_executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+
+# Screening batches are matched by queue workers; a model outage is retried with backoff
+SCREEN_WORKERS = int(os.getenv("SCREEN_WORKERS", "2"))
+SCREEN_MAX_ATTEMPTS = int(os.getenv("SCREEN_MAX_ATTEMPTS", "3"))
+SCREEN_RETRY_DELAY = float(os.getenv("SCREEN_RETRY_DELAY", "30"))
+
+# Invitation emails go through the outbox, sent in batches over one SMTP connection
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_RETRY_DELAY = float(os.getenv("OUTBOX_RETRY_DELAY", "30"))
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+outbox_sender = OutboxSender(
+    AsyncSessionLocal,
+    interview_scheduler.create_mailer(),
+    interview_scheduler.build_message,
+    batch_size=OUTBOX_BATCH_SIZE,
+    max_attempts=OUTBOX_MAX_ATTEMPTS,
+    retry_delay=OUTBOX_RETRY_DELAY,
+    idle_timeout=SMTP_IDLE_TIMEOUT
+)
+
+@app.on_event("shutdown")
+def shutdown_parse_executor():
+    parse_executor.shutdown(wait=False, cancel_futures=True)
+
+@app.on_event("startup")
+def create_missing_tables():
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(Base.metadata)
+
+@app.on_event("startup")
+def build_skill_index():
+    db = SessionLocal()
+    try:
+        skill_index.build(db.query(Candidate.id, Candidate.skills).all())
+    except Exception as e:
+        logger.error(f"Error building skill index: {str(e)}")
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def build_vector_index():
+    db = SessionLocal()
+    try:
+        vector_index.build(
+            (candidate_id, HashingVectorizer.from_bytes(tf_vector))
+            for candidate_id, tf_vector in db.query(CandidateFeatures.candidate_id, CandidateFeatures.tf_vector).filter(
+                CandidateFeatures.version == MatchingEngine.FEATURE_VERSION
+            ).yield_per(ID_CHUNK_SIZE)
+        )
+    except Exception as e:
+        logger.error(f"Error building vector index: {str(e)}")
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def sync_bm25_index():
+    """
+    Bring the persisted BM25 index in line with the candidates table: drop deleted
+    candidates and index new ones and those whose resume text changed, e.g. by a re-import
+    """
+    db = SessionLocal()
+    try:
+        candidate_ids = set()
+        stale = []
+        reindexed = 0
+        for candidate_id, resume_text in db.query(Candidate.id, Candidate.resume_text).yield_per(ID_CHUNK_SIZE):
+            candidate_ids.add(candidate_id)
+            if not bm25_index.is_current(candidate_id, resume_text):
+                stale.append((candidate_id, resume_text))
+                if len(stale) >= ID_CHUNK_SIZE:
+                    reindexed += bm25_index.add_many(stale)
+                    stale = []
+        reindexed += bm25_index.add_many(stale)
+        
+        for candidate_id in bm25_index.doc_ids() - candidate_ids:
+            bm25_index.remove(candidate_id)
+        if reindexed:
+            logger.info(f"Indexed {reindexed} resumes missing from or changed since the BM25 index")
+        
+        if bm25_index.needs_compaction():
+            bm25_index.compact()
+    except Exception as e:
+        logger.error(f"Error syncing BM25 index: {str(e)}")
+    finally:
+        db.close()
+
 @app.get("/", response_class=HTMLResponse)
 async def root():
     try:
@@ -80,62 +205,93 @@ async def create_job_description(
     title: str = Form(...),
     company: str = Form(...),
     description: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> dict:
     logger.info(f"Received job description - Title: {title}, Company: {company}")
     logger.info(f"Description: {description}")
     # Extract and summarize job description
     try:
-        # Parse skills from description
-        skills_text = description.lower()
-        skills = []
-        common_skills = ["python", "javascript", "java", "c++", "sql", "aws", "docker", 
-                        "kubernetes", "react", "angular", "vue", "node.js", "tensorflow", 
-                        "pytorch", "machine learning", "deep learning", "nlp", "ai", 
-                        "data science", "cloud", "git", "agile", "devops"]
-        
-        for skill in common_skills:
-            if skill in skills_text:
-                skills.append(skill)
-        
-        # Extract experience requirement
-        import re
-        experience_pattern = r'(\d+)\+?\s*(?:years?|yrs?)'
-        experience_match = re.search(experience_pattern, description.lower())
-        required_experience = int(experience_match.group(1)) if experience_match else 0
-        
-        # Extract qualifications
-        qualifications = []
-        qual_keywords = ["bachelor", "master", "phd", "degree", "certification"]
-        for line in description.lower().split('\n'):
-            if any(keyword in line for keyword in qual_keywords):
-                qualifications.append(line.strip())
+        # Parse skills, experience and qualifications from the description
+        requirements = extract_job_requirements(description)
         
         # Create job description in database
         job = JobDescription(
             title=title,
             company=company,
             description=description,
-            required_skills=json.dumps(skills),
-            required_experience=required_experience,
-            required_qualifications=json.dumps(qualifications)
+            required_skills=json.dumps(requirements["required_skills"]),
+            required_experience=requirements["required_experience"],
+            required_qualifications=json.dumps(requirements["required_qualifications"]),
+            tf_vector=HashingVectorizer.to_bytes(matching_engine.vectorizer.transform(description))
         )
         
         db.add(job)
-        db.commit()
-        db.refresh(job)
+        await db.commit()
         
         return {"message": "Job description created successfully", "job_id": job.id}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+async def save_upload(upload: UploadFile, file_path: Path) -> tuple:
+    """
+    Stream an upload to disk in chunks, hashing it on the way.
+    Returns (size, sha256 hex digest) and rejects files over MAX_UPLOAD_BYTES.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(file_path, "wb") as f:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large. Maximum upload size is {MAX_UPLOAD_BYTES} bytes."
+                    )
+                digest.update(chunk)
+                await f.write(chunk)
+    except Exception:
+        if file_path.exists():
+            file_path.unlink()
+        raise
+    return size, digest.hexdigest()
+
+def complete_resume_parse(candidate_id: int, file_path: str, content_hash: str):
+    """Finish parsing a resume that was stored from a preview parse"""
+    db = SessionLocal()
+    try:
+        cv_data = parse_cache.get(content_hash)
+        if cv_data is None:
+            cv_data = parse_executor.submit(parse_in_worker, file_path).result()
+            parse_cache.put(content_hash, cv_data)
+        candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+        if not candidate:
+            return
+        
+        candidate.resume_text = cv_data.get("raw_text", "")
+        candidate.skills = json.dumps(cv_data.get("skills", []))
+        candidate.experience_years = cv_data.get("experience", {}).get("years", 0)
+        feature_record = build_feature_record(candidate)
+        db.merge(feature_record)
+        db.commit()
+        skill_index.add(candidate_id, cv_data.get("skills", []))
+        bm25_index.add(candidate_id, candidate.resume_text)
+        vector_index.add(candidate_id, HashingVectorizer.from_bytes(feature_record.tf_vector))
+        logger.info(f"Completed full resume parse for candidate {candidate_id}")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error completing resume parse for candidate {candidate_id}: {str(e)}")
+    finally:
+        db.close()
+
 @app.post("/candidates/")
 async def upload_candidate(
+    background_tasks: BackgroundTasks,
     name: str = Form(...),
     email: str = Form(...),
     resume: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger = logging.getLogger(__name__)
     file_path = None
@@ -154,19 +310,26 @@ async def upload_candidate(
         file_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{resume.filename}"
         file_path = UPLOADS_DIR / file_name
         
-        content = await resume.read()
-        if not content:
-            return JSONResponse(status_code=400, content={"detail": "Empty file uploaded"})
-        
         # Save file
-        with open(file_path, "wb") as f:
-            f.write(content)
+        size, content_hash = await save_upload(resume, file_path)
+        if not size:
+            file_path.unlink()
+            return JSONResponse(status_code=400, content={"detail": "Empty file uploaded"})
         
         # Parse CV
         try:
             logger.info("Parsing resume...")
-            cv_data = cv_parser.parse(str(file_path))
-            logger.info("Resume parsed successfully")
+            # The cache reads, writes and evicts files; keep that off the event loop too
+            cv_data = await asyncio.to_thread(parse_cache.get, content_hash)
+            if cv_data is None:
+                # Parse only the first pages now, long documents are completed in the background
+                cv_data = await asyncio.get_running_loop().run_in_executor(
+                    parse_executor, parse_in_worker, str(file_path), PREVIEW_PAGES or None
+                )
+                if not cv_parser.is_partial(cv_data):
+                    await asyncio.to_thread(parse_cache.put, content_hash, cv_data)
+            partial = cv_parser.is_partial(cv_data)
+            logger.info("Resume parsed successfully" + (" (preview)" if partial else ""))
         except ValueError as e:
             logger.error(f"ValueError while parsing resume: {str(e)}")
             if file_path and file_path.exists():
@@ -180,7 +343,7 @@ async def upload_candidate(
         
         # Check if candidate with email already exists
         try:
-            existing_candidate = db.query(Candidate).filter(Candidate.email == email).first()
+            existing_candidate = (await db.execute(select(Candidate.id).where(Candidate.email == email))).first()
             if existing_candidate:
                 logger.warning(f"Candidate with email {email} already exists")
                 if file_path and file_path.exists():
@@ -204,20 +367,28 @@ async def upload_candidate(
             )
             
             db.add(candidate)
-            db.commit()
-            db.refresh(candidate)
+            await db.flush()
+            feature_record = build_feature_record(candidate)
+            db.add(feature_record)
+            await db.commit()
+            skill_index.add(candidate.id, cv_data.get("skills", []))
+            bm25_index.add(candidate.id, candidate.resume_text)
+            vector_index.add(candidate.id, HashingVectorizer.from_bytes(feature_record.tf_vector))
+            if partial:
+                background_tasks.add_task(complete_resume_parse, candidate.id, str(file_path), content_hash)
             
             logger.info(f"Candidate created successfully with ID: {candidate.id}")
             return JSONResponse(
                 status_code=201,
                 content={
                     "message": "Candidate created successfully",
-                    "candidate_id": candidate.id
+                    "candidate_id": candidate.id,
+                    "parse_status": "partial" if partial else "complete"
                 }
             )
         except Exception as e:
             logger.error(f"Database error: {str(e)}")
-            db.rollback()
+            await db.rollback()
             if file_path and file_path.exists():
                 file_path.unlink()
             return JSONResponse(
@@ -233,17 +404,270 @@ async def upload_candidate(
             file_path.unlink()
         return JSONResponse(status_code=500, content={"detail": f"Error processing resume: {str(e)}"})
 
+def job_to_dict(job: JobDescription) -> dict:
+    return {
+        "description": job.description,
+        "required_skills": json.loads(job.required_skills) if job.required_skills else [],
+        "required_experience": job.required_experience or 0,
+        "required_qualifications": json.loads(job.required_qualifications) if job.required_qualifications else []
+    }
+
+def candidate_to_dict(candidate: Candidate) -> dict:
+    return {
+        "resume_text": candidate.resume_text,
+        "skills": json.loads(candidate.skills) if candidate.skills else [],
+        "experience_years": candidate.experience_years or 0,
+        "qualifications": json.loads(candidate.qualifications) if candidate.qualifications else []
+    }
+
+def build_feature_record(candidate: Candidate) -> CandidateFeatures:
+    """Compute the stored matching features for a candidate row"""
+    features = matching_engine.extract_features({
+        "resume_text": candidate.resume_text,
+        "skills": candidate.skills,
+        "experience_years": candidate.experience_years,
+        "qualifications": candidate.qualifications
+    })
+    return CandidateFeatures.from_features(candidate.id, MatchingEngine.FEATURE_VERSION, features)
+
+async def load_features(db: AsyncSession, candidate_id: int):
+    """Stored features for a candidate, or None when missing or built by an older extractor"""
+    record = await db.get(CandidateFeatures, candidate_id)
+    if record is None or record.version != MatchingEngine.FEATURE_VERSION:
+        return None
+    return record.to_features()
+
+async def load_ranking_candidates(db: AsyncSession, candidate_ids=None) -> list:
+    """
+    Candidate id, name and email with their stored features, without loading resume text.
+    Candidates whose features are missing or stale get them computed on the fly.
+    """
+    query = select(Candidate.id, Candidate.name, Candidate.email, CandidateFeatures).outerjoin(
+        CandidateFeatures, CandidateFeatures.candidate_id == Candidate.id
+    )
+    if candidate_ids is None:
+        rows = (await db.execute(query)).all()
+    else:
+        rows = []
+        for start in range(0, len(candidate_ids), ID_CHUNK_SIZE):
+            chunk = candidate_ids[start:start + ID_CHUNK_SIZE]
+            rows.extend((await db.execute(query.where(Candidate.id.in_(chunk)))).all())
+    
+    candidates = []
+    stale = {}
+    for candidate_id, name, email, record in rows:
+        candidate = {"id": candidate_id, "name": name, "email": email}
+        if record is not None and record.version == MatchingEngine.FEATURE_VERSION:
+            candidate["features"] = record.to_features()
+        else:
+            stale[candidate_id] = candidate
+        candidates.append(candidate)
+    
+    if stale:
+        logger.info(f"Computing features for {len(stale)} candidates without current stored features")
+        stale_ids = list(stale)
+        for start in range(0, len(stale_ids), ID_CHUNK_SIZE):
+            chunk = stale_ids[start:start + ID_CHUNK_SIZE]
+            for row in (await db.execute(select(
+                Candidate.id,
+                Candidate.resume_text,
+                Candidate.skills,
+                Candidate.experience_years,
+                Candidate.qualifications
+            ).where(Candidate.id.in_(chunk)))).all():
+                stale[row.id]["features"] = matching_engine.extract_features(row._asdict())
+    
+    return candidates
+
+def keyword_query(job_dict: dict) -> str:
+    """BM25 query for a job: its required skills plus the keywords found in its description"""
+    required_skills = matching_engine._load_list(job_dict.get("required_skills"))
+    keywords = matching_engine.extract_keywords((job_dict.get("description") or "").lower())
+    return " ".join(required_skills + keywords)
+
+def apply_keyword_scores(job_dict: dict, candidates: list) -> None:
+    """Set each candidate's keyword component to its normalized BM25 score against the job"""
+    if KEYWORD_SCORING != "bm25" or not len(bm25_index):
+        return
+    scores = bm25_index.score_all(keyword_query(job_dict), normalize=True)
+    for candidate in candidates:
+        features = candidate.get("features") or matching_engine.extract_features(candidate)
+        features["keyword_score"] = scores.get(candidate["id"], 0.0)
+        candidate["features"] = features
+
+def job_vector(job: JobDescription):
+    """Stored description vector, computed on the fly for jobs saved before vectors were"""
+    vector = HashingVectorizer.from_bytes(job.tf_vector)
+    return vector if vector is not None else matching_engine.vectorizer.transform(job.description)
+
+def apply_semantic_scores(query_vector, candidates: list) -> None:
+    """Set each candidate's semantic component to its TF-IDF cosine against the job"""
+    candidate_ids = [candidate["id"] for candidate in candidates]
+    # One product over the whole matrix is cheaper than gathering rows when nearly all are wanted
+    scores = vector_index.similarities(
+        query_vector, candidate_ids if len(candidate_ids) < len(vector_index) // 2 else None
+    )
+    for candidate in candidates:
+        if candidate["id"] in scores:
+            features = candidate.get("features") or matching_engine.extract_features(candidate)
+            features["semantic_score"] = scores[candidate["id"]]
+            candidate["features"] = features
+
+def match_message(score: float) -> str:
+    """Determine a message based on the score"""
+    if score >= 0.8:
+        return "Excellent match! Strongly recommended for interview."
+    elif score >= 0.6:
+        return "Good match. Consider for interview."
+    return "Below threshold. Not recommended."
+
+def match_fingerprint(job_dict: dict, candidate_dict: dict) -> str:
+    """Hash of what the model's part of a match depends on: job and candidate inputs, scoring version and model"""
+    # Features derive from the candidate fields; their BM25 and semantic scores depend on the whole
+    # corpus, so they are left out and recomputed whenever a stored result is reused
+    payload = json.dumps({
+        "job": job_dict,
+        "candidate": {key: value for key, value in candidate_dict.items() if key != "features"},
+        "scoring_version": MatchingEngine.SCORING_VERSION,
+        "keyword_scoring": KEYWORD_SCORING,
+        "model": ai_matcher.model_name
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+async def find_match(db: AsyncSession, job_id: int, candidate_id: int):
+    """Latest match row for a job/candidate pair"""
+    return (await db.execute(
+        select(CandidateMatch).where(
+            CandidateMatch.job_id == job_id,
+            CandidateMatch.candidate_id == candidate_id
+        ).order_by(CandidateMatch.id.desc()).limit(1)
+    )).scalar()
+
+def match_result(match_entry: CandidateMatch) -> dict:
+    return {
+        "match_id": match_entry.id,
+        "job_id": match_entry.job_id,
+        "candidate_id": match_entry.candidate_id,
+        "match_score": match_entry.match_score,
+        "detailed_scores": json.loads(match_entry.detailed_scores) if match_entry.detailed_scores else {},
+        "message": match_message(match_entry.match_score),
+        "ai_reasoning": match_entry.ai_reasoning or "",
+        "interview_questions": json.loads(match_entry.interview_questions) if match_entry.interview_questions else []
+    }
+
+def is_fallback_result(ai_reasoning: str, interview_questions: list) -> bool:
+    """True when either the analysis or the interview questions were produced without the model"""
+    return ai_matcher.is_fallback_reasoning(ai_reasoning) or ai_matcher.is_fallback_questions(interview_questions)
+
+async def stored_match_result(db: AsyncSession, job_id: int, candidate_id: int, fingerprint: str):
+    """The stored result for a pair if it was computed from the same inputs, otherwise None"""
+    match_entry = await find_match(db, job_id, candidate_id)
+    if match_entry is None or match_entry.fingerprint != fingerprint:
+        return None
+    # A result the model did not produce is never served again, even under a matching fingerprint
+    result = match_result(match_entry)
+    if is_fallback_result(result["ai_reasoning"], result["interview_questions"]):
+        return None
+    return result
+
+async def store_match(db: AsyncSession, job_id: int, candidate_id: int, fingerprint: str, final_score: float,
+                      detailed_scores: dict, ai_reasoning: str, interview_questions: list) -> CandidateMatch:
+    """Insert the match row for a pair, or refresh the existing one, with the full result"""
+    match_entry = await find_match(db, job_id, candidate_id)
+    if match_entry is None:
+        match_entry = CandidateMatch(job_id=job_id, candidate_id=candidate_id)
+        db.add(match_entry)
+    
+    match_entry.match_score = final_score
+    match_entry.shortlisted = final_score >= 0.7
+    # Results computed without the model are kept but not reused
+    match_entry.fingerprint = None if is_fallback_result(ai_reasoning, interview_questions) else fingerprint
+    match_entry.scoring_version = MatchingEngine.SCORING_VERSION
+    match_entry.model = ai_matcher.model_name
+    match_entry.detailed_scores = json.dumps(detailed_scores)
+    match_entry.ai_reasoning = ai_reasoning
+    match_entry.interview_questions = json.dumps(interview_questions)
+    await db.commit()
+    return match_entry
+
+async def prepare_candidate(db: AsyncSession, job: JobDescription, job_dict: dict, candidate: Candidate) -> dict:
+    """Candidate inputs of a match: stored features plus keyword and semantic scores against the job"""
+    candidate_dict = candidate_to_dict(candidate)
+    candidate_dict["id"] = candidate.id
+    candidate_dict["features"] = await load_features(db, candidate.id)
+    apply_keyword_scores(job_dict, [candidate_dict])
+    apply_semantic_scores(job_vector(job), [candidate_dict])
+    return candidate_dict
+
+async def run_match(db: AsyncSession, job_id: int, candidate_id: int, job_dict: dict, candidate_dict: dict,
+                    keep_fallback: bool = True) -> dict:
+    """
+    Score a pair with the model and store the result, or return the stored one while its inputs are unchanged.
+    With keep_fallback=False a score or questions produced without the model raise RuntimeError instead of
+    being stored.
+    """
+    # Reuse the stored result while none of its inputs have changed
+    fingerprint = match_fingerprint(job_dict, candidate_dict)
+    stored = await stored_match_result(db, job_id, candidate_id, fingerprint)
+    if stored is not None:
+        logger.info(f"Returning stored match {stored['match_id']} for job {job_id} and candidate {candidate_id}")
+        # Only the model's score, reasoning and questions are reused; the detailed scores follow the current corpus
+        _, detailed_scores = matching_engine.calculate_match(job_dict, candidate_dict)
+        if detailed_scores != stored["detailed_scores"]:
+            await db.execute(
+                update(CandidateMatch).where(CandidateMatch.id == stored["match_id"]).values(
+                    detailed_scores=json.dumps(detailed_scores)
+                )
+            )
+            await db.commit()
+        return {**stored, "detailed_scores": detailed_scores, "cached": True}
+    
+    # Get AI-powered match score first
+    ai_score, ai_reasoning = await ai_matcher.analyze_match(job_dict, candidate_dict)
+    if not keep_fallback and ai_matcher.is_fallback_reasoning(ai_reasoning):
+        raise RuntimeError(f"Model unavailable for job {job_id} and candidate {candidate_id}")
+    
+    # Generate interview questions for good matches
+    interview_questions = await ai_matcher.get_interview_questions(
+        job_dict, 
+        candidate_dict, 
+        ai_score
+    )
+    if not keep_fallback and ai_matcher.is_fallback_questions(interview_questions):
+        raise RuntimeError(f"Model unavailable for interview questions for job {job_id} and candidate {candidate_id}")
+    
+    logger.info(f"AI match score: {ai_score}")
+    logger.info(f"AI reasoning: {ai_reasoning}")
+    logger.info(f"Generated {len(interview_questions)} interview questions")
+    
+    # Get traditional match score as backup
+    match_score, detailed_scores = matching_engine.calculate_match(job_dict, candidate_dict)
+    
+    logger.info(f"Traditional match score: {match_score}")
+    logger.info(f"Detailed scores: {detailed_scores}")
+    
+    # Use AI score if valid, otherwise fall back to traditional score
+    final_score = ai_score if 0 <= ai_score <= 1 else match_score
+    
+    # Store the full result, replacing any earlier one for this pair
+    match_entry = await store_match(
+        db, job_id, candidate_id, fingerprint, final_score,
+        detailed_scores, ai_reasoning, interview_questions
+    )
+    
+    return {**match_result(match_entry), "cached": False}
+
 @app.post("/match/{job_id}/{candidate_id}")
 async def match_candidate(
     job_id: int,
     candidate_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Matching job {job_id} with candidate {candidate_id}")
     try:
         # Get job and candidate
-        job = db.query(JobDescription).filter(JobDescription.id == job_id).first()
-        candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+        job = await db.get(JobDescription, job_id)
+        candidate = await db.get(Candidate, candidate_id)
         
         if not job:
             logger.warning(f"Job {job_id} not found")
@@ -261,12 +685,7 @@ async def match_candidate(
         
         # Parse job requirements
         try:
-            job_dict = {
-                "description": job.description,
-                "required_skills": json.loads(job.required_skills) if job.required_skills else [],
-                "required_experience": job.required_experience or 0,
-                "required_qualifications": json.loads(job.required_qualifications) if job.required_qualifications else []
-            }
+            job_dict = job_to_dict(job)
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing job requirements: {str(e)}")
             return JSONResponse(
@@ -276,12 +695,7 @@ async def match_candidate(
         
         # Parse candidate data
         try:
-            candidate_dict = {
-                "resume_text": candidate.resume_text,
-                "skills": json.loads(candidate.skills) if candidate.skills else [],
-                "experience_years": candidate.experience_years or 0,
-                "qualifications": json.loads(candidate.qualifications) if candidate.qualifications else []
-            }
+            candidate_dict = await prepare_candidate(db, job, job_dict, candidate)
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing candidate data: {str(e)}")
             return JSONResponse(
@@ -289,77 +703,558 @@ async def match_candidate(
                 content={"detail": "Invalid candidate data format"}
             )
         
-        # Get AI-powered match score first
-        ai_score, ai_reasoning = await ai_matcher.analyze_match(job_dict, candidate_dict)
+        return await run_match(db, job_id, candidate_id, job_dict, candidate_dict)
         
-        # Generate interview questions for good matches
-        interview_questions = await ai_matcher.get_interview_questions(
-            job_dict, 
-            candidate_dict, 
-            ai_score
+    except Exception as e:
+        logger.error(f"Error matching candidate: {str(e)}")
+        return JSONResponse(
+            status_code=500,
+            content={"detail": f"Error matching candidate: {str(e)}"}
         )
-        
-        logger.info(f"AI match score: {ai_score}")
-        logger.info(f"AI reasoning: {ai_reasoning}")
-        logger.info(f"Generated {len(interview_questions)} interview questions")
-        
-        # Get traditional match score as backup
-        matching_engine = MatchingEngine()
+
+def sse_event(event: str, data) -> str:
+    """Format a server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get("/match/{job_id}/{candidate_id}/stream")
+async def stream_match(
+    job_id: int,
+    candidate_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Server-sent event version of /match. Emits the deterministic score straight away,
+    then the AI reasoning tokens as they are generated, the AI score and finally
+    the interview questions. A stored result with unchanged inputs is replayed
+    without any token events.
+    """
+    logger.info(f"Streaming match of job {job_id} with candidate {candidate_id}")
+    job = await db.get(JobDescription, job_id)
+    candidate = await db.get(Candidate, candidate_id)
+    
+    if not job:
+        return JSONResponse(
+            status_code=404,
+            content={"detail": f"Job with ID {job_id} not found"}
+        )
+    if not candidate:
+        return JSONResponse(
+            status_code=404,
+            content={"detail": f"Candidate with ID {candidate_id} not found"}
+        )
+    
+    try:
+        job_dict = job_to_dict(job)
+        candidate_dict = await prepare_candidate(db, job, job_dict, candidate)
+    except json.JSONDecodeError as e:
+        logger.error(f"Error parsing match inputs: {str(e)}")
+        return JSONResponse(
+            status_code=400,
+            content={"detail": "Invalid job or candidate data format"}
+        )
+    
+    fingerprint = match_fingerprint(job_dict, candidate_dict)
+    stored = await stored_match_result(db, job_id, candidate_id, fingerprint)
+    
+    async def events():
         match_score, detailed_scores = matching_engine.calculate_match(job_dict, candidate_dict)
+        yield sse_event("score", {
+            "job_id": job_id,
+            "candidate_id": candidate_id,
+            "match_score": match_score,
+            "detailed_scores": detailed_scores
+        })
+        
+        if stored is not None:
+            yield sse_event("ai_score", {
+                "ai_score": stored["match_score"],
+                "ai_reasoning": stored["ai_reasoning"],
+                "match_score": stored["match_score"],
+                "message": stored["message"]
+            })
+            yield sse_event("questions", {"interview_questions": stored["interview_questions"]})
+            yield sse_event("done", {"match_id": stored["match_id"], "cached": True})
+            return
         
-        logger.info(f"Traditional match score: {match_score}")
-        logger.info(f"Detailed scores: {detailed_scores}")
+        ai_score, ai_reasoning = 0.5, ""
+        async for kind, payload in ai_matcher.stream_match_analysis(job_dict, candidate_dict):
+            if kind == "token":
+                yield sse_event("token", {"text": payload})
+            else:
+                ai_score, ai_reasoning = payload
         
-        # Use AI score if valid, otherwise fall back to traditional score
         final_score = ai_score if 0 <= ai_score <= 1 else match_score
+        yield sse_event("ai_score", {
+            "ai_score": ai_score,
+            "ai_reasoning": ai_reasoning,
+            "match_score": final_score,
+            "message": match_message(final_score)
+        })
         
-        # Determine a message based on the score
-        if final_score >= 0.8:
-            message = "Excellent match! Strongly recommended for interview."
-        elif final_score >= 0.6:
-            message = "Good match. Consider for interview."
-        else:
-            message = "Below threshold. Not recommended."
+        interview_questions = await ai_matcher.get_interview_questions(job_dict, candidate_dict, ai_score)
+        yield sse_event("questions", {"interview_questions": interview_questions})
         
-        # Create a new match entry in database - only use fields that exist in the model
-        match_entry = CandidateMatch(
-            job_id=job_id,
-            candidate_id=candidate_id,
-            match_score=final_score,
-            shortlisted=final_score >= 0.7
+        # Record the match like /match does
+        async with AsyncSessionLocal() as match_db:
+            try:
+                match_entry = await store_match(
+                    match_db, job_id, candidate_id, fingerprint, final_score,
+                    detailed_scores, ai_reasoning, interview_questions
+                )
+                yield sse_event("done", {"match_id": match_entry.id, "cached": False})
+            except Exception as e:
+                await match_db.rollback()
+                logger.error(f"Error saving streamed match: {str(e)}")
+                yield sse_event("error", {"detail": f"Error saving match: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/jobs/{job_id}/ranking")
+async def rank_candidates(
+    job_id: int,
+    k: int = Query(50, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Rank every candidate for a job with the deterministic matching engine and return the top k"""
+    logger.info(f"Ranking candidates for job {job_id} (k={k})")
+    job = await db.get(JobDescription, job_id)
+    if not job:
+        logger.warning(f"Job {job_id} not found")
+        return JSONResponse(
+            status_code=404,
+            content={"detail": f"Job with ID {job_id} not found"}
         )
-        
-        db.add(match_entry)
-        db.commit()
-        db.refresh(match_entry)
-        
-        # Return match results including details that aren't stored in the database
+
+    try:
+        job_dict = {
+            "description": job.description,
+            "required_skills": job.required_skills,
+            "required_experience": job.required_experience or 0,
+            "required_qualifications": job.required_qualifications,
+            "tf_vector": job_vector(job)
+        }
+
+        # Only score candidates sharing at least one required skill
+        if json.loads(job.required_skills or '[]'):
+            candidates = await load_ranking_candidates(db, skill_index.candidates_for(job.required_skills))
+        else:
+            candidates = await load_ranking_candidates(db)
+
+        apply_keyword_scores(job_dict, candidates)
+        apply_semantic_scores(job_dict["tf_vector"], candidates)
+        ranking = matching_engine.rank_candidates(job_dict, candidates, k)
+
         return {
-            "match_id": match_entry.id,
             "job_id": job_id,
-            "candidate_id": candidate_id,
-            "match_score": final_score,
-            "detailed_scores": detailed_scores,
-            "message": message,
-            "ai_reasoning": ai_reasoning,
-            "interview_questions": interview_questions
+            "k": k,
+            "total_candidates": len(skill_index),
+            "candidates_scored": len(candidates),
+            "ranking": ranking
         }
-        
     except Exception as e:
-        logger.error(f"Error matching candidate: {str(e)}")
+        logger.error(f"Error ranking candidates: {str(e)}")
         return JSONResponse(
             status_code=500,
-            content={"detail": f"Error matching candidate: {str(e)}"}
+            content={"detail": f"Error ranking candidates: {str(e)}"}
         )
 
+@app.get("/candidates/search")
+async def search_candidates(
+    q: str = Query(..., min_length=1),
+    k: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over resumes, ranked by BM25"""
+    hits = bm25_index.search(q, k)
+    if not hits:
+        return {"query": q, "k": k, "results": []}
+    
+    rows = (await db.execute(select(Candidate.id, Candidate.name, Candidate.email).where(
+        Candidate.id.in_([candidate_id for candidate_id, _ in hits])
+    ))).all()
+    candidates = {row.id: row for row in rows}
+    return {
+        "query": q,
+        "k": k,
+        "results": [
+            {
+                "candidate_id": candidate_id,
+                "name": candidates[candidate_id].name,
+                "email": candidates[candidate_id].email,
+                "score": round(score, 4)
+            }
+            for candidate_id, score in hits
+            if candidate_id in candidates
+        ]
+    }
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset cursor holding the sort key of the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str, length: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError):
+        values = None
+    if not isinstance(values, list) or len(values) != length:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def keyset_page(rows: list, limit: int, sort_key) -> tuple:
+    """Split the limit + 1 rows fetched for a page into the page and the cursor for the next one"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*sort_key(rows[-1]))
+
+@app.get("/jobs")
+async def list_jobs(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Jobs, newest first, a keyset page at a time. Descriptions are left out."""
+    query = select(
+        JobDescription.id,
+        JobDescription.title,
+        JobDescription.company,
+        JobDescription.required_skills,
+        JobDescription.required_experience,
+        JobDescription.created_at
+    )
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        query = query.where(JobDescription.id < last_id)
+    rows, next_cursor = keyset_page(
+        (await db.execute(query.order_by(JobDescription.id.desc()).limit(limit + 1))).all(), limit, lambda row: (row.id,)
+    )
+    return {
+        "jobs": [
+            {
+                "job_id": row.id,
+                "title": row.title,
+                "company": row.company,
+                "required_skills": json.loads(row.required_skills) if row.required_skills else [],
+                "required_experience": row.required_experience or 0,
+                "created_at": row.created_at
+            }
+            for row in rows
+        ],
+        "next_cursor": next_cursor
+    }
+
+@app.get("/candidates")
+async def list_candidates(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Candidates, newest first, a keyset page at a time. Resume text is never loaded."""
+    query = select(
+        Candidate.id,
+        Candidate.name,
+        Candidate.email,
+        Candidate.skills,
+        Candidate.experience_years,
+        Candidate.created_at
+    )
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        query = query.where(Candidate.id < last_id)
+    rows, next_cursor = keyset_page(
+        (await db.execute(query.order_by(Candidate.id.desc()).limit(limit + 1))).all(), limit, lambda row: (row.id,)
+    )
+    return {
+        "candidates": [
+            {
+                "candidate_id": row.id,
+                "name": row.name,
+                "email": row.email,
+                "skills": json.loads(row.skills) if row.skills else [],
+                "experience_years": row.experience_years or 0,
+                "created_at": row.created_at
+            }
+            for row in rows
+        ],
+        "next_cursor": next_cursor
+    }
+
+@app.get("/jobs/{job_id}/matches")
+async def list_job_matches(
+    job_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str = None,
+    shortlisted: bool = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stored matches for a job, best first, a keyset page at a time. Pages are read
+    in (match_score, id) order from ix_candidate_matches_job_score, so the cost of
+    a page does not grow with the number of matches or how deep the page is.
+    """
+    if (await db.execute(select(JobDescription.id).where(JobDescription.id == job_id))).first() is None:
+        logger.warning(f"Job {job_id} not found")
+        return JSONResponse(
+            status_code=404,
+            content={"detail": f"Job with ID {job_id} not found"}
+        )
+
+    query = select(
+        CandidateMatch.id,
+        CandidateMatch.candidate_id,
+        CandidateMatch.match_score,
+        CandidateMatch.shortlisted,
+        Candidate.name,
+        Candidate.email
+    ).join(Candidate, Candidate.id == CandidateMatch.candidate_id).where(CandidateMatch.job_id == job_id)
+    if shortlisted is not None:
+        query = query.where(CandidateMatch.shortlisted == shortlisted)
+    if cursor:
+        last_score, last_id = decode_cursor(cursor, 2)
+        query = query.where(tuple_(CandidateMatch.match_score, CandidateMatch.id) < tuple_(last_score, last_id))
+    rows, next_cursor = keyset_page(
+        (await db.execute(query.order_by(CandidateMatch.match_score.desc(), CandidateMatch.id.desc()).limit(limit + 1))).all(),
+        limit,
+        lambda row: (row.match_score, row.id)
+    )
+    return {
+        "job_id": job_id,
+        "matches": [
+            {
+                "match_id": row.id,
+                "candidate_id": row.candidate_id,
+                "name": row.name,
+                "email": row.email,
+                "match_score": row.match_score,
+                "shortlisted": bool(row.shortlisted)
+            }
+            for row in rows
+        ],
+        "next_cursor": next_cursor
+    }
+
+async def screen_task(db: AsyncSession, task: ScreeningTask) -> int:
+    """Queue handler: match one candidate of a screening batch the way /match does"""
+    job = await db.get(JobDescription, task.job_id)
+    candidate = await db.get(Candidate, task.candidate_id)
+    if job is None or candidate is None:
+        raise ValueError(f"Job {task.job_id} or candidate {task.candidate_id} no longer exists")
+    
+    job_dict = job_to_dict(job)
+    candidate_dict = await prepare_candidate(db, job, job_dict, candidate)
+    # A fallback score or fallback questions mean the model could not be reached; they are only stored once
+    # retries are used up, every earlier attempt raises so the queue tries the model again after its backoff
+    result = await run_match(
+        db, task.job_id, task.candidate_id, job_dict, candidate_dict,
+        keep_fallback=screening_queue.is_last_attempt(task)
+    )
+    return result["match_id"]
+
+screening_queue = ScreeningQueue(
+    AsyncSessionLocal,
+    screen_task,
+    workers=SCREEN_WORKERS,
+    max_attempts=SCREEN_MAX_ATTEMPTS,
+    retry_delay=SCREEN_RETRY_DELAY
+)
+
+@app.on_event("startup")
+async def start_screening_queue():
+    await screening_queue.start()
+
+@app.on_event("shutdown")
+async def stop_screening_queue():
+    await screening_queue.stop()
+
+@app.post("/jobs/{job_id}/screen", status_code=202)
+async def screen_job(
+    job_id: int,
+    candidate_ids: Optional[List[int]] = Body(None, embed=True),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Queue a match of every candidate, or of the given candidate_ids, against a job
+    and return the batch id straight away. Progress and results are polled from
+    /batches/{batch_id}.
+    """
+    job = await db.get(JobDescription, job_id)
+    if not job:
+        logger.warning(f"Job {job_id} not found")
+        return JSONResponse(
+            status_code=404,
+            content={"detail": f"Job with ID {job_id} not found"}
+        )
+    
+    if candidate_ids is None:
+        candidate_ids = list((await db.execute(select(Candidate.id).order_by(Candidate.id))).scalars())
+    else:
+        candidate_ids = list(dict.fromkeys(candidate_ids))
+        existing = set()
+        for start in range(0, len(candidate_ids), ID_CHUNK_SIZE):
+            chunk = candidate_ids[start:start + ID_CHUNK_SIZE]
+            existing.update((await db.execute(select(Candidate.id).where(Candidate.id.in_(chunk)))).scalars())
+        unknown = [candidate_id for candidate_id in candidate_ids if candidate_id not in existing]
+        if unknown:
+            return JSONResponse(
+                status_code=404,
+                content={"detail": f"Candidates not found: {unknown[:20]}"}
+            )
+    
+    if not candidate_ids:
+        return JSONResponse(
+            status_code=400,
+            content={"detail": "No candidates to screen"}
+        )
+    
+    batch = await screening_queue.enqueue(db, job_id, candidate_ids)
+    logger.info(f"Queued screening batch {batch.id}: {batch.total} candidates for job {job_id}")
+    return {
+        "batch_id": batch.id,
+        "job_id": job_id,
+        "total": batch.total,
+        "status_url": f"/batches/{batch.id}"
+    }
+
+@app.get("/batches/{batch_id}")
+async def get_batch(
+    batch_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Progress of a screening batch, its best results so far and the candidates that failed"""
+    batch = await db.get(ScreeningBatch, batch_id)
+    if not batch:
+        return JSONResponse(
+            status_code=404,
+            content={"detail": f"Batch with ID {batch_id} not found"}
+        )
+    
+    counts = await screening_queue.progress(db, batch_id)
+    finished = counts["done"] + counts["failed"]
+    if finished == batch.total:
+        status = "complete"
+    elif finished or counts["running"]:
+        status = "running"
+    else:
+        status = "queued"
+    
+    results = (await db.execute(
+        select(
+            ScreeningTask.candidate_id,
+            Candidate.name,
+            Candidate.email,
+            CandidateMatch.id.label("match_id"),
+            CandidateMatch.match_score,
+            CandidateMatch.shortlisted
+        ).join(CandidateMatch, CandidateMatch.id == ScreeningTask.match_id).join(
+            Candidate, Candidate.id == ScreeningTask.candidate_id
+        ).where(
+            ScreeningTask.batch_id == batch_id,
+            ScreeningTask.status == "done"
+        ).order_by(CandidateMatch.match_score.desc(), CandidateMatch.id.desc()).limit(limit)
+    )).all()
+    failed = (await db.execute(
+        select(ScreeningTask.candidate_id, ScreeningTask.attempts, ScreeningTask.error).where(
+            ScreeningTask.batch_id == batch_id,
+            ScreeningTask.status == "failed"
+        ).order_by(ScreeningTask.id).limit(limit)
+    )).all()
+    
+    return {
+        "batch_id": batch.id,
+        "job_id": batch.job_id,
+        "status": status,
+        "total": batch.total,
+        "progress": round(finished / batch.total, 3) if batch.total else 1.0,
+        "counts": counts,
+        "created_at": batch.created_at,
+        "results": [
+            {
+                "match_id": row.match_id,
+                "candidate_id": row.candidate_id,
+                "name": row.name,
+                "email": row.email,
+                "match_score": row.match_score,
+                "shortlisted": bool(row.shortlisted)
+            }
+            for row in results
+        ],
+        "failed": [
+            {"candidate_id": row.candidate_id, "attempts": row.attempts, "error": row.error}
+            for row in failed
+        ]
+    }
+
+@app.on_event("startup")
+async def start_outbox_sender():
+    await outbox_sender.start()
+
+@app.on_event("shutdown")
+async def stop_outbox_sender():
+    await outbox_sender.stop()
+
+@app.on_event("shutdown")
+async def close_ai_matcher():
+    await ai_matcher.close()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
+@app.get("/metrics/llm")
+async def llm_metrics():
+    """Queue depth, in-flight generations and cache counters for the Ollama client"""
+    return ai_matcher.stats()
+
+@app.get("/metrics/outbox")
+async def outbox_metrics(db: AsyncSession = Depends(get_async_db)):
+    """Outbox emails by status and the SMTP connections opened so far"""
+    return {
+        "emails": await outbox_sender.counts(db),
+        "smtp_connections_opened": outbox_sender.mailer.connections_opened
+    }
+
+@app.delete("/llm-cache")
+async def invalidate_llm_cache(model: str = None):
+    """Drop cached LLM responses, optionally only those for one model"""
+    removed = await asyncio.to_thread(llm_cache.invalidate, model=model)
+    logger.info(f"Invalidated {removed} cached LLM responses")
+    return {"message": "LLM cache invalidated", "removed": removed}
+
+async def booking_conflict(db: AsyncSession, interviewer: str, candidate_id: int,
+                           start: datetime, end: datetime, match_id: int) -> bool:
+    """True when the slot overlaps another booking of the interviewer or the candidate"""
+    conflict = (await db.execute(
+        select(InterviewBooking.id).where(
+            or_(InterviewBooking.interviewer == interviewer, InterviewBooking.candidate_id == candidate_id),
+            InterviewBooking.start_time < end,
+            InterviewBooking.end_time > start,
+            InterviewBooking.match_id != match_id
+        ).limit(1)
+    )).scalar()
+    return conflict is not None
+
 @app.post("/schedule-interview/{match_id}")
 async def schedule_interview(
     match_id: int,
     interview_datetime: datetime,
-    db: Session = Depends(get_db)
+    interviewer: Optional[str] = Query(None, min_length=1, max_length=255),
+    duration_minutes: int = Query(60, ge=15, le=480),
+    db: AsyncSession = Depends(get_async_db)
 ):
+    """
+    Book an interview for a shortlisted match at the given time and queue the
+    invitation. The booking goes through the same overlap check and constraints
+    as /jobs/{job_id}/interviews/allocate; scheduling a match again moves its
+    booking. Without an interviewer the slot is booked for the job's company.
+    """
     # Get match details
-    match = db.query(CandidateMatch).filter(CandidateMatch.id == match_id).first()
+    match = await db.get(CandidateMatch, match_id)
     
     if not match or not match.shortlisted:
         raise HTTPException(
@@ -368,36 +1263,220 @@ async def schedule_interview(
         )
     
     # Get job and candidate details
-    job = db.query(JobDescription).filter(JobDescription.id == match.job_id).first()
-    candidate = db.query(Candidate).filter(Candidate.id == match.candidate_id).first()
+    job = await db.get(JobDescription, match.job_id)
+    candidate = await db.get(Candidate, match.candidate_id)
     
-    # Schedule interview
-    success = interview_scheduler.schedule_interview(
-        {
-            "id": candidate.id,
-            "name": candidate.name,
-            "contact": {"email": candidate.email}
-        },
-        {
-            "id": job.id,
-            "title": job.title,
-            "company": job.company
-        },
-        interview_datetime
-    )
+    start = naive_utc(interview_datetime)
+    end = start + timedelta(minutes=duration_minutes)
+    interviewer = interviewer or job.company
+    # Hold the write lock from the overlap check to the insert
+    await begin_immediate(db)
+    if await booking_conflict(db, interviewer, candidate.id, start, end, match.id):
+        raise HTTPException(
+            status_code=409,
+            detail="The interviewer or the candidate already has an interview at that time"
+        )
     
-    if success:
-        # Update match record
-        match.interview_scheduled = True
-        match.interview_datetime = interview_datetime
-        db.commit()
-        
-        return {"message": "Interview scheduled successfully"}
-    else:
+    booking = (await db.execute(
+        select(InterviewBooking).where(InterviewBooking.match_id == match.id)
+    )).scalar()
+    if booking is None:
+        booking = InterviewBooking(match_id=match.id, job_id=job.id, candidate_id=candidate.id)
+        db.add(booking)
+    booking.interviewer = interviewer
+    booking.start_time = start
+    booking.end_time = end
+    
+    # Queue the invitation with the booking; the outbox sender delivers it
+    subject, html_body = interview_scheduler.render_invitation(
+        candidate.name,
+        job.title,
+        job.company,
+        start,
+        interview_scheduler.meeting_link(job.id, candidate.id)
+    )
+    email = outbox_sender.add(db, candidate.email, subject, html_body, match_id=match.id)
+    match.interview_scheduled = True
+    match.interview_datetime = start
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        # Booked concurrently by another request
+        await db.rollback()
+        logger.warning(f"Interview for match {match_id} conflicted with a concurrent booking: {str(e)}")
         raise HTTPException(
-            status_code=500,
-            detail="Failed to schedule interview"
+            status_code=409,
+            detail="The interviewer or the candidate already has an interview at that time"
+        )
+    outbox_sender.notify()
+    
+    return {
+        "message": "Interview scheduled successfully",
+        "booking_id": booking.id,
+        "email_id": email.id,
+        "email_status": "queued"
+    }
+
+class AvailabilityWindow(BaseModel):
+    interviewer: str = Field(..., min_length=1, max_length=255)
+    start: datetime
+    end: datetime
+
+class SlotAllocationRequest(BaseModel):
+    windows: List[AvailabilityWindow] = Field(..., min_length=1)
+    duration_minutes: int = Field(60, ge=15, le=480)
+    gap_minutes: int = Field(0, ge=0, le=240)
+    send_invitations: bool = True
+
+@app.post("/jobs/{job_id}/interviews/allocate")
+async def allocate_interviews(
+    job_id: int,
+    request: SlotAllocationRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Book an interview for every shortlisted match of a job that has none yet,
+    best match first, from the interviewers' availability windows. Slots never
+    overlap an existing booking of the interviewer or the candidate, and the
+    invitations are queued in the outbox with the bookings.
+    """
+    job = await db.get(JobDescription, job_id)
+    if not job:
+        logger.warning(f"Job {job_id} not found")
+        return JSONResponse(
+            status_code=404,
+            content={"detail": f"Job with ID {job_id} not found"}
+        )
+    # Stored bookings are naive UTC, windows given with an offset are compared in UTC
+    windows = [
+        (window.interviewer, naive_utc(window.start), naive_utc(window.end))
+        for window in request.windows
+    ]
+    if any(end <= start for _, start, end in windows):
+        return JSONResponse(
+            status_code=400,
+            content={"detail": "Every availability window must end after it starts"}
+        )
+    
+    # Hold the write lock from reading the busy intervals to inserting the bookings,
+    # so a concurrent allocation or /schedule-interview cannot book an overlapping slot in between
+    await begin_immediate(db)
+    matches = (await db.execute(
+        select(
+            CandidateMatch.id,
+            CandidateMatch.candidate_id,
+            Candidate.name,
+            Candidate.email
+        ).join(Candidate, Candidate.id == CandidateMatch.candidate_id).outerjoin(
+            InterviewBooking, InterviewBooking.match_id == CandidateMatch.id
+        ).where(
+            CandidateMatch.job_id == job_id,
+            CandidateMatch.shortlisted == True,
+            or_(CandidateMatch.interview_scheduled == False, CandidateMatch.interview_scheduled.is_(None)),
+            InterviewBooking.id.is_(None)
+        ).order_by(CandidateMatch.match_score.desc(), CandidateMatch.id.desc())
+    )).all()
+    if not matches:
+        return {"job_id": job_id, "booked": [], "unassigned": [], "message": "No shortlisted candidates without an interview"}
+    
+    # One booking per candidate, for their best match
+    matches_by_candidate = {}
+    for row in matches:
+        matches_by_candidate.setdefault(row.candidate_id, row)
+    
+    # Bookings that could collide with the windows, for these interviewers or candidates
+    window_start = min(start for _, start, _ in windows)
+    window_end = max(end for _, _, end in windows)
+    interviewers = sorted({interviewer for interviewer, _, _ in windows})
+    interviewer_bookings = (await db.execute(
+        select(InterviewBooking.interviewer, InterviewBooking.start_time, InterviewBooking.end_time).where(
+            InterviewBooking.interviewer.in_(interviewers),
+            InterviewBooking.start_time < window_end,
+            InterviewBooking.end_time > window_start
         )
+    )).all()
+    candidate_ids = list(matches_by_candidate)
+    candidate_bookings = []
+    for start in range(0, len(candidate_ids), ID_CHUNK_SIZE):
+        chunk = candidate_ids[start:start + ID_CHUNK_SIZE]
+        candidate_bookings.extend((await db.execute(
+            select(InterviewBooking.candidate_id, InterviewBooking.start_time, InterviewBooking.end_time).where(
+                InterviewBooking.candidate_id.in_(chunk),
+                InterviewBooking.start_time < window_end,
+                InterviewBooking.end_time > window_start
+            )
+        )).all())
+    
+    allocator = SlotAllocator(
+        duration=timedelta(minutes=request.duration_minutes),
+        gap=timedelta(minutes=request.gap_minutes)
+    )
+    assigned, unassigned = allocator.allocate(
+        candidate_ids,
+        windows,
+        interviewer_bookings,
+        candidate_bookings
+    )
+    
+    bookings = [
+        {
+            "match_id": matches_by_candidate[candidate_id].id,
+            "job_id": job_id,
+            "candidate_id": candidate_id,
+            "interviewer": interviewer,
+            "start_time": start,
+            "end_time": end
+        }
+        for candidate_id, (interviewer, start, end) in assigned.items()
+    ]
+    try:
+        if bookings:
+            await db.execute(insert(InterviewBooking), bookings)
+            await db.execute(update(CandidateMatch), [
+                {"id": booking["match_id"], "interview_scheduled": True, "interview_datetime": booking["start_time"]}
+                for booking in bookings
+            ])
+        if request.send_invitations:
+            for booking in bookings:
+                match = matches_by_candidate[booking["candidate_id"]]
+                subject, html_body = interview_scheduler.render_invitation(
+                    match.name,
+                    job.title,
+                    job.company,
+                    booking["start_time"],
+                    interview_scheduler.meeting_link(job_id, match.candidate_id)
+                )
+                outbox_sender.add(db, match.email, subject, html_body, match_id=match.id)
+        await db.commit()
+    except IntegrityError as e:
+        # A booking written outside the write lock, e.g. by a client without begin_immediate
+        await db.rollback()
+        logger.warning(f"Interview allocation for job {job_id} conflicted with concurrent bookings: {str(e)}")
+        return JSONResponse(
+            status_code=409,
+            content={"detail": "Some slots were booked concurrently, please retry"}
+        )
+    if request.send_invitations and bookings:
+        outbox_sender.notify()
+    
+    logger.info(f"Booked {len(bookings)} interviews for job {job_id}, {len(unassigned)} candidates without a slot")
+    return {
+        "job_id": job_id,
+        "booked": [
+            {
+                "match_id": booking["match_id"],
+                "candidate_id": booking["candidate_id"],
+                "interviewer": booking["interviewer"],
+                "start": booking["start_time"],
+                "end": booking["end_time"]
+            }
+            for booking in sorted(bookings, key=lambda booking: (booking["start_time"], booking["interviewer"]))
+        ],
+        "unassigned": [
+            {"match_id": matches_by_candidate[candidate_id].id, "candidate_id": candidate_id}
+            for candidate_id in unassigned
+        ]
+    }
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
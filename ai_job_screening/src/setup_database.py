@@ -23,6 +23,7 @@ def create_tables():
         required_skills TEXT NOT NULL,
         required_experience INTEGER,
         required_qualifications TEXT,
+        tf_vector BLOB,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     """)
@@ -52,10 +53,136 @@ def create_tables():
         interview_scheduled BOOLEAN DEFAULT FALSE,
         interview_datetime TIMESTAMP,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        fingerprint VARCHAR(64),
+        scoring_version INTEGER,
+        model VARCHAR(255),
+        detailed_scores TEXT,
+        ai_reasoning TEXT,
+        interview_questions TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         FOREIGN KEY (job_id) REFERENCES job_descriptions(id),
         FOREIGN KEY (candidate_id) REFERENCES candidates(id)
     )
     """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS ix_candidate_matches_job_candidate
+    ON candidate_matches (job_id, candidate_id)
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS ix_candidate_matches_job_score
+    ON candidate_matches (job_id, match_score DESC, id DESC, candidate_id, shortlisted)
+    """)
+
+    # Create candidate_features table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS candidate_features (
+        candidate_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL,
+        skills TEXT,
+        keywords TEXT,
+        token_hashes BLOB,
+        experience_years FLOAT,
+        qualifications TEXT,
+        tf_vector BLOB,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (candidate_id) REFERENCES candidates(id)
+    )
+    """)
+
+    # Create import_manifest table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS import_manifest (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind VARCHAR(32) NOT NULL,
+        path VARCHAR(1024) NOT NULL,
+        size INTEGER,
+        mtime_ns INTEGER,
+        content_hash VARCHAR(64) NOT NULL,
+        record_id INTEGER,
+        imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT uq_import_manifest_kind_path UNIQUE (kind, path)
+    )
+    """)
+
+    # Create screening queue tables
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS screening_batches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (job_id) REFERENCES job_descriptions (id)
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS screening_tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        batch_id INTEGER NOT NULL,
+        job_id INTEGER NOT NULL,
+        candidate_id INTEGER NOT NULL,
+        status VARCHAR(16) NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        match_id INTEGER,
+        error TEXT,
+        retry_at TIMESTAMP,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP,
+        FOREIGN KEY (batch_id) REFERENCES screening_batches (id),
+        FOREIGN KEY (job_id) REFERENCES job_descriptions (id),
+        FOREIGN KEY (candidate_id) REFERENCES candidates (id),
+        FOREIGN KEY (match_id) REFERENCES candidate_matches (id),
+        CONSTRAINT uq_screening_tasks_batch_candidate UNIQUE (batch_id, candidate_id)
+    )
+    """)
+
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS ix_screening_tasks_status
+    ON screening_tasks (status, id)
+    """)
+
+    # Create email_outbox table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS email_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        recipient VARCHAR(255) NOT NULL,
+        subject VARCHAR(512) NOT NULL,
+        html_body TEXT NOT NULL,
+        match_id INTEGER,
+        status VARCHAR(16) NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        retry_at TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        sent_at TIMESTAMP,
+        FOREIGN KEY (match_id) REFERENCES candidate_matches (id)
+    )
+    """)
+
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS ix_email_outbox_status
+    ON email_outbox (status, id)
+    """)
+
+    # Create interview_bookings table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS interview_bookings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        match_id INTEGER NOT NULL,
+        job_id INTEGER NOT NULL,
+        candidate_id INTEGER NOT NULL,
+        interviewer VARCHAR(255) NOT NULL,
+        start_time TIMESTAMP NOT NULL,
+        end_time TIMESTAMP NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (match_id) REFERENCES candidate_matches (id),
+        FOREIGN KEY (job_id) REFERENCES job_descriptions (id),
+        FOREIGN KEY (candidate_id) REFERENCES candidates (id),
+        CONSTRAINT uq_interview_bookings_match UNIQUE (match_id),
+        CONSTRAINT uq_interview_bookings_interviewer_start UNIQUE (interviewer, start_time),
+        CONSTRAINT uq_interview_bookings_candidate_start UNIQUE (candidate_id, start_time)
+    )
+    """)
 
     conn.commit()
     conn.close()
@@ -5,12 +5,19 @@ This script imports job descriptions from a CSV file and resumes from a folder o
 
 import os
 import csv
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from pathlib import Path
 import shutil
 import logging
 import sys
+from sqlalchemy import bindparam, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
+from datetime import datetime
+import hashlib
 import json
 
 # Setup logging
@@ -21,9 +28,13 @@ logger = logging.getLogger(__name__)
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import project modules
-from ai_job_screening.src.database.database import get_db, engine
-from ai_job_screening.src.database.models import JobDescription, Candidate, Base
+from ai_job_screening.src.database.database import DATA_DIR, engine, add_missing_columns
+from ai_job_screening.src.database.models import JobDescription, Candidate, CandidateFeatures, ImportManifest, Base
 from ai_job_screening.src.agents.cv_parser import CVParser
+from ai_job_screening.src.agents.skill_vocabulary import extract_job_requirements
+from ai_job_screening.src.agents.parse_cache import ParseCache, hash_file
+from ai_job_screening.src.agents.matching_engine import MatchingEngine
+from ai_job_screening.src.agents.text_vectorizer import HashingVectorizer
 
 def ensure_uploads_dir():
     """Ensure the uploads directory exists."""
@@ -31,185 +42,430 @@ def ensure_uploads_dir():
     uploads_dir.mkdir(exist_ok=True)
     return uploads_dir
 
-def import_job_descriptions(csv_path, db):
+def read_job_csv(csv_path):
     """
-    Import job descriptions from a CSV file.
-    Expected columns: Job Title, Job Description
+    Read the job description CSV, trying several encodings to handle special characters.
+    Returns None when it cannot be decoded or lacks the Job Title / Job Description columns.
     """
-    logger.info(f"Importing job descriptions from {csv_path}")
+    encodings_to_try = ['utf-8', 'latin1', 'cp1252', 'ISO-8859-1']
+    
+    df = None
+    for encoding in encodings_to_try:
+        try:
+            logger.info(f"Trying to read CSV with {encoding} encoding")
+            df = pd.read_csv(csv_path, encoding=encoding)
+            logger.info(f"Successfully read CSV with {encoding} encoding")
+            break
+        except UnicodeDecodeError:
+            logger.warning(f"Failed to decode with {encoding}, trying next encoding")
+    
+    if df is None:
+        logger.error("Failed to read CSV with any encoding")
+        return None
+    
+    # Check if required columns exist (adjusted for your actual dataset)
+    if 'Job Title' not in df.columns or 'Job Description' not in df.columns:
+        logger.error(f"CSV must contain columns: 'Job Title', 'Job Description'")
+        return None
+    return df
+
+def default_email(filename_stem):
+    """Email given to a candidate whose resume does not yield one, unique per file name"""
+    return f"{filename_stem.lower()}@example.com"
+
+def candidate_fields(filename_stem, resume_data):
+    """
+    Build Candidate column values from parsed resume data,
+    falling back to defaults derived from the file name.
+    """
+    experience = resume_data.get('experience') or {}
+    return {
+        "name": resume_data.get('name', f"Candidate_{filename_stem}"),
+        "email": resume_data.get('email', default_email(filename_stem)),
+        "resume_text": resume_data.get('raw_text', ''),
+        "skills": json.dumps(resume_data.get('skills', [])),
+        "experience_years": resume_data.get('experience_years', experience.get('years', 0)),
+        "qualifications": json.dumps(resume_data.get('qualifications', []))
+    }
+
+# Per-process parser state for parallel imports
+_worker_parser = None
+_worker_cache = None
+_worker_engine = None
+
+def _init_worker():
+    global _worker_parser, _worker_cache, _worker_engine
+    _worker_parser = CVParser()
+    _worker_cache = ParseCache(DATA_DIR / "parse_cache", parser_version=_worker_parser.cache_version)
+    _worker_engine = MatchingEngine()
+
+def _parse_resume_worker(pdf_path, uploads_dir, known_hash=None):
+    """
+    Copy and parse one resume inside a worker process, also computing its matching features.
+    Returns (file name, content hash, candidate fields, features, error message) so failures
+    travel back to the writer. When the content hash equals known_hash the file is left
+    alone and fields and features are None.
+    """
+    pdf_path = Path(pdf_path)
+    content_hash = None
+    error = None
     try:
-        # Read CSV file with different encodings to handle special characters
-        encodings_to_try = ['utf-8', 'latin1', 'cp1252', 'ISO-8859-1']
-        
-        df = None
-        for encoding in encodings_to_try:
-            try:
-                logger.info(f"Trying to read CSV with {encoding} encoding")
-                df = pd.read_csv(csv_path, encoding=encoding)
-                logger.info(f"Successfully read CSV with {encoding} encoding")
-                break
-            except UnicodeDecodeError:
-                logger.warning(f"Failed to decode with {encoding}, trying next encoding")
-        
-        if df is None:
-            logger.error("Failed to read CSV with any encoding")
-            return False
-        
-        # Check if required columns exist (adjusted for your actual dataset)
-        if 'Job Title' not in df.columns or 'Job Description' not in df.columns:
-            logger.error(f"CSV must contain columns: 'Job Title', 'Job Description'")
-            return False
-        
-        # Process each job description
-        for _, row in df.iterrows():
-            title = row['Job Title']
-            description = row['Job Description']
-            company = "Hackathon Company"  # Default company name
-            
+        content_hash = hash_file(pdf_path)
+        if content_hash == known_hash:
+            return pdf_path.name, content_hash, None, None, None
+        dest_path = Path(uploads_dir) / pdf_path.name
+        shutil.copy2(pdf_path, dest_path)
+        data = _worker_cache.parse(_worker_parser, str(dest_path), content_hash)
+    except Exception as e:
+        data = {}
+        error = str(e)
+    fields = candidate_fields(pdf_path.stem, data)
+    return pdf_path.name, content_hash, fields, _worker_engine.extract_features(fields), error
+
+def load_manifest(kind):
+    """Import manifest entries of one kind, by path"""
+    manifest_table = ImportManifest.__table__
+    with engine.connect() as conn:
+        return {
+            row.path: row
+            for row in conn.execute(select(manifest_table).where(manifest_table.c.kind == kind))
+        }
+
+def manifest_entry(kind, path, content_hash, record_id, size=None, mtime_ns=None):
+    return {
+        "kind": kind,
+        "path": path,
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "content_hash": content_hash,
+        "record_id": record_id,
+        "imported_at": datetime.utcnow()
+    }
+
+def record_manifest(conn, entries):
+    """Insert or refresh manifest entries, in the same transaction as the records they describe"""
+    if not entries:
+        return
+    stmt = sqlite_insert(ImportManifest.__table__)
+    conn.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["kind", "path"],
+            set_={column: stmt.excluded[column] for column in ("size", "mtime_ns", "content_hash", "record_id", "imported_at")}
+        ),
+        entries
+    )
+
+def import_job_descriptions_bulk(csv_path, chunk_size=1000, rescan=False):
+    """
+    Bulk, incremental job description import.
+
+    The CSV is skipped outright while its size and mtime (or, failing that,
+    its hash) match the manifest. Otherwise each row is keyed by title and
+    only rows whose description hash differs from the manifest are processed:
+    new titles are inserted with executemany, changed ones updated in place.
+    Every chunk commits its rows together with their manifest entries, so an
+    interrupted import picks up where it stopped.
+    """
+    logger.info(f"Bulk importing job descriptions from {csv_path}")
+    csv_path = Path(csv_path)
+    csv_key = str(csv_path.resolve())
+    stat = csv_path.stat()
+    csv_entry = load_manifest("job_csv").get(csv_key)
+    if csv_entry is not None and not rescan and (csv_entry.size, csv_entry.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+        logger.info(f"{csv_path} is unchanged since the last import, skipping")
+        return True
+    csv_hash = hash_file(csv_path)
+    if csv_entry is not None and csv_entry.content_hash == csv_hash:
+        with engine.begin() as conn:
+            record_manifest(conn, [manifest_entry("job_csv", csv_key, csv_hash, None, stat.st_size, stat.st_mtime_ns)])
+        logger.info(f"{csv_path} content is unchanged since the last import, skipping")
+        return True
+
+    df = read_job_csv(csv_path)
+    if df is None:
+        return False
+
+    vectorizer = HashingVectorizer()
+    jobs_table = JobDescription.__table__
+    start_time = time.perf_counter()
+    added = 0
+    updated = 0
+    unchanged = 0
+    inserts = []
+    updates = []
+    adopted = []
+
+    def flush():
+        nonlocal added, updated
+        if not inserts and not updates and not adopted:
+            return
+        with engine.begin() as conn:
+            if inserts:
+                ids = dict(conn.execute(
+                    jobs_table.insert().returning(jobs_table.c.title, jobs_table.c.id),
+                    [values for values, _ in inserts]
+                ).all())
+                for values, entry in inserts:
+                    entry["record_id"] = ids[values["title"]]
+            if updates:
+                conn.execute(
+                    jobs_table.update().where(jobs_table.c.id == bindparam("record_id")),
+                    [{"record_id": entry["record_id"], **values} for values, entry in updates]
+                )
+            record_manifest(conn, [entry for _, entry in inserts + updates] + adopted)
+        added += len(inserts)
+        updated += len(updates)
+        inserts.clear()
+        updates.clear()
+        adopted.clear()
+        elapsed = time.perf_counter() - start_time
+        logger.info(f"Committed {added + updated} jobs ({(added + updated) / elapsed:.1f} rows/s)")
+
+    try:
+        row_manifest = load_manifest("job")
+        with engine.connect() as conn:
+            job_ids = dict(conn.execute(select(jobs_table.c.title, jobs_table.c.id)).all())
+        known_job_ids = set(job_ids.values())
+        seen = set()
+
+        for title, description in zip(df['Job Title'], df['Job Description']):
             # Skip if title or description is empty
             if pd.isna(title) or pd.isna(description) or not str(title).strip() or not str(description).strip():
                 continue
-                
-            logger.info(f"Processing job: {title}")
-            
-            # Parse skills from description
-            skills_text = str(description).lower()
-            skills = []
-            common_skills = ["python", "javascript", "java", "c++", "sql", "aws", "docker", 
-                            "kubernetes", "react", "angular", "vue", "node.js", "tensorflow", 
-                            "pytorch", "machine learning", "deep learning", "nlp", "ai", 
-                            "data science", "cloud", "git", "agile", "devops"]
-            
-            for skill in common_skills:
-                if skill in skills_text:
-                    skills.append(skill)
-            
-            # Extract experience requirement
-            import re
-            experience_pattern = r'(\d+)\+?\s*(?:years?|yrs?)'
-            experience_match = re.search(experience_pattern, skills_text)
-            required_experience = int(experience_match.group(1)) if experience_match else 0
-            
-            # Extract qualifications
-            qualifications = []
-            qual_keywords = ["bachelor", "master", "phd", "degree", "certification"]
-            for line in skills_text.split('\n'):
-                if any(keyword in line for keyword in qual_keywords):
-                    qualifications.append(line.strip())
-            
-            # Check if job with this title already exists
-            existing_job = db.query(JobDescription).filter(
-                JobDescription.title == title
-            ).first()
-            
-            if existing_job:
-                logger.info(f"Job {title} already exists, skipping.")
+            if title in seen:
                 continue
-            
-            # Create new job description
-            job = JobDescription(
-                title=title,
-                company=company,
-                description=description,
-                required_skills=json.dumps(skills),
-                required_experience=required_experience,
-                required_qualifications=json.dumps(qualifications)
-            )
-            
-            db.add(job)
-            logger.info(f"Added job: {title}")
-        
-        # Commit all changes
-        db.commit()
-        logger.info("Successfully imported job descriptions")
-        return True
-    
+            seen.add(title)
+
+            row_key = f"{csv_key}#{title}"
+            description_hash = hashlib.sha256(str(description).encode("utf-8")).hexdigest()
+            row_entry = row_manifest.get(row_key)
+            record_id = row_entry.record_id if row_entry is not None else None
+            if record_id is not None and record_id not in known_job_ids:
+                # The job was deleted since, import it again
+                record_id = None
+            if record_id is not None and row_entry.content_hash == description_hash:
+                unchanged += 1
+                continue
+            entry = manifest_entry("job", row_key, description_hash, record_id)
+            if record_id is None and title in job_ids:
+                # Imported before the manifest existed, or created through the API: keep it as it is
+                entry["record_id"] = job_ids[title]
+                adopted.append(entry)
+                unchanged += 1
+                continue
+
+            requirements = extract_job_requirements(str(description))
+            values = {
+                "title": title,
+                "company": "Hackathon Company",
+                "description": description,
+                "required_skills": json.dumps(requirements["required_skills"]),
+                "required_experience": requirements["required_experience"],
+                "required_qualifications": json.dumps(requirements["required_qualifications"]),
+                "tf_vector": HashingVectorizer.to_bytes(vectorizer.transform(str(description)))
+            }
+            if record_id is None:
+                inserts.append((values, entry))
+            else:
+                updates.append((values, entry))
+            if len(inserts) + len(updates) + len(adopted) >= chunk_size:
+                flush()
+        flush()
+
+        # Only once every row is in, so an interrupted import reads the CSV again
+        with engine.begin() as conn:
+            record_manifest(conn, [manifest_entry("job_csv", csv_key, csv_hash, None, stat.st_size, stat.st_mtime_ns)])
     except Exception as e:
-        db.rollback()
-        logger.error(f"Error importing job descriptions: {str(e)}")
+        logger.error(f"Error importing job descriptions after {added + updated} rows: {str(e)}")
         return False
 
-def import_resumes(resumes_dir, db):
+    elapsed = time.perf_counter() - start_time
+    logger.info(
+        f"Imported {added} new jobs, updated {updated} changed, {unchanged} unchanged in {elapsed:.2f}s "
+        f"({(added + updated + unchanged) / elapsed:.1f} rows/s)"
+    )
+    return True
+
+def import_resumes_bulk(resumes_dir, workers=1, chunk_size=1000, rescan=False):
     """
-    Import resumes from a directory of PDF files.
+    Bulk, incremental resume import.
+
+    Files whose size and mtime match the manifest are skipped without being
+    read. The rest are hashed in the worker processes, and only new files and
+    files whose content hash changed are copied and parsed: new candidates are
+    inserted with executemany, changed ones updated in place. Every chunk
+    commits the candidates, their features and their manifest entries together,
+    so an interrupted import resumes where it stopped and a re-run costs work
+    proportional to what changed.
     """
-    logger.info(f"Importing resumes from {resumes_dir}")
+    logger.info(f"Bulk importing resumes from {resumes_dir} with {workers} workers")
     uploads_dir = ensure_uploads_dir()
-    cv_parser = CVParser()
-    
+
+    pdf_files = sorted(Path(resumes_dir).glob("*.pdf"))
+    if not pdf_files:
+        logger.warning(f"No PDF files found in {resumes_dir}")
+        return False
+
+    candidates_table = Candidate.__table__
+    features_stmt = sqlite_insert(CandidateFeatures.__table__)
+    features_upsert = features_stmt.on_conflict_do_update(
+        index_elements=["candidate_id"],
+        set_={
+            column.name: features_stmt.excluded[column.name]
+            for column in CandidateFeatures.__table__.columns if column.name != "candidate_id"
+        }
+    )
+    start_time = time.perf_counter()
+    added = 0
+    updated = 0
+    unchanged = 0
+    failures = []
+    inserts = []
+    updates = []
+    touched = []
+
+    def feature_row(candidate_id, features):
+        return {
+            "candidate_id": candidate_id,
+            "version": MatchingEngine.FEATURE_VERSION,
+            "updated_at": datetime.utcnow(),
+            **CandidateFeatures.feature_columns(features)
+        }
+
+    def flush():
+        nonlocal added, updated
+        if not inserts and not updates and not touched:
+            return
+        try:
+            with engine.begin() as conn:
+                feature_rows = []
+                if inserts:
+                    ids = dict(conn.execute(
+                        candidates_table.insert().returning(candidates_table.c.email, candidates_table.c.id),
+                        [fields for fields, _, _ in inserts]
+                    ).all())
+                    for fields, features, entry in inserts:
+                        feature_rows.append(feature_row(ids[fields["email"]], features))
+                        if entry is not None:
+                            entry["record_id"] = ids[fields["email"]]
+                if updates:
+                    # The email stays as imported, it is the candidate's key
+                    conn.execute(
+                        candidates_table.update().where(candidates_table.c.id == bindparam("record_id")),
+                        [
+                            {"record_id": record_id, **{k: v for k, v in fields.items() if k != "email"}}
+                            for record_id, fields, _, _ in updates
+                        ]
+                    )
+                    feature_rows.extend(feature_row(record_id, features) for record_id, _, features, _ in updates)
+                if feature_rows:
+                    conn.execute(features_upsert, feature_rows)
+                record_manifest(conn, [
+                    entry for entry in
+                    [entry for _, _, entry in inserts] + [entry for *_, entry in updates] + touched
+                    if entry is not None
+                ])
+            added += len(inserts)
+            updated += len(updates)
+            elapsed = time.perf_counter() - start_time
+            logger.info(f"Committed {added + updated} candidates ({(added + updated) / elapsed:.1f} rows/s)")
+        except Exception as e:
+            logger.error(f"Error inserting batch of {len(inserts) + len(updates)} candidates: {str(e)}")
+            failures.extend((fields["email"], str(e)) for fields, _, _ in inserts)
+            failures.extend((fields["email"], str(e)) for _, fields, _, _ in updates)
+        inserts.clear()
+        updates.clear()
+        touched.clear()
+
     try:
-        # Get all PDF files in the directory
-        pdf_files = list(Path(resumes_dir).glob("*.pdf"))
-        if not pdf_files:
-            logger.warning(f"No PDF files found in {resumes_dir}")
-            return False
-        
-        logger.info(f"Found {len(pdf_files)} PDF files")
-        
-        # Process each resume
+        manifest = load_manifest("resume")
+        with engine.connect() as conn:
+            candidate_ids = dict(conn.execute(select(candidates_table.c.email, candidates_table.c.id)).all())
+        known_ids = set(candidate_ids.values())
+
+        # (path, manifest key, stat, content hash on record, candidate id) of each file to look at
+        to_check = []
         for pdf_path in pdf_files:
-            try:
-                # Copy file to uploads directory
-                dest_path = uploads_dir / pdf_path.name
-                shutil.copy2(pdf_path, dest_path)
-                
-                logger.info(f"Processing resume: {pdf_path.name}")
-                
-                # Generate candidate name and email from filename
-                filename_stem = pdf_path.stem  # e.g., "C1061"
-                
-                # Parse resume
-                try:
-                    resume_data = cv_parser.parse(str(dest_path))
-                    name = resume_data.get('name', f"Candidate_{filename_stem}")
-                    email = resume_data.get('email', f"{filename_stem.lower()}@example.com")
-                    resume_text = resume_data.get('raw_text', '')
-                    skills = resume_data.get('skills', [])
-                    experience_years = resume_data.get('experience_years', 0)
-                    qualifications = resume_data.get('qualifications', [])
-                except Exception as parse_error:
-                    logger.warning(f"Error parsing resume, using default values: {str(parse_error)}")
-                    name = f"Candidate_{filename_stem}"
-                    email = f"{filename_stem.lower()}@example.com"
-                    resume_text = ""
-                    skills = []
-                    experience_years = 0
-                    qualifications = []
-                
-                # Check if candidate already exists
-                existing_candidate = db.query(Candidate).filter(Candidate.email == email).first()
-                if existing_candidate:
-                    logger.info(f"Candidate with email {email} already exists, skipping.")
+            key = str(pdf_path.resolve())
+            stat = pdf_path.stat()
+            entry = manifest.get(key)
+            if entry is not None and entry.record_id in known_ids:
+                if not rescan and (entry.size, entry.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                    unchanged += 1
                     continue
-                
-                # Create candidate record - removed resume_path field since it doesn't exist in the model
-                candidate = Candidate(
-                    name=name,
-                    email=email,
-                    resume_text=resume_text,
-                    skills=json.dumps(skills),
-                    experience_years=experience_years,
-                    qualifications=json.dumps(qualifications)
-                )
-                
-                db.add(candidate)
-                logger.info(f"Added candidate: {name} ({email})")
-                
-            except Exception as e:
-                logger.error(f"Error processing resume {pdf_path}: {str(e)}")
-        
-        # Commit all changes
-        db.commit()
-        logger.info("Successfully imported resumes")
-        return True
-        
+                to_check.append((pdf_path, key, stat, entry.content_hash, entry.record_id))
+            else:
+                # New, or imported before the manifest existed: then it is parsed again and updated once
+                to_check.append((pdf_path, key, stat, None, candidate_ids.get(default_email(pdf_path.stem))))
+        logger.info(f"Found {len(pdf_files)} PDF files, {unchanged} unchanged since the last import")
+
+        paths = [str(item[0]) for item in to_check]
+        known_hashes = [item[3] for item in to_check]
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+            results = executor.map(
+                _parse_resume_worker,
+                paths,
+                [str(uploads_dir)] * len(paths),
+                known_hashes,
+                chunksize=max(1, min(16, len(paths) // (workers * 4)))
+            )
+        else:
+            executor = None
+            _init_worker()
+            results = map(_parse_resume_worker, paths, [str(uploads_dir)] * len(paths), known_hashes)
+
+        try:
+            for (pdf_path, key, stat, _, record_id), (file_name, content_hash, fields, features, error) in zip(to_check, results):
+                if fields is None:
+                    # Touched but not modified, remember the new mtime
+                    unchanged += 1
+                    touched.append(manifest_entry("resume", key, content_hash, record_id, stat.st_size, stat.st_mtime_ns))
+                else:
+                    entry = manifest_entry("resume", key, content_hash, record_id, stat.st_size, stat.st_mtime_ns)
+                    if error:
+                        logger.warning(f"Error parsing resume {file_name}, using default values: {error}")
+                        failures.append((file_name, error))
+                        # Leave it out of the manifest so the next run tries again
+                        entry = None
+                    if record_id is not None:
+                        updates.append((record_id, fields, features, entry))
+                    elif fields["email"] in candidate_ids:
+                        logger.info(f"Candidate with email {fields['email']} already exists, skipping.")
+                        unchanged += 1
+                    else:
+                        candidate_ids[fields["email"]] = None
+                        inserts.append((fields, features, entry))
+                if len(inserts) + len(updates) + len(touched) >= chunk_size:
+                    flush()
+            flush()
+        finally:
+            if executor is not None:
+                executor.shutdown()
     except Exception as e:
-        db.rollback()
-        logger.error(f"Error importing resumes: {str(e)}")
+        logger.error(f"Error importing resumes after {added + updated} rows: {str(e)}")
         return False
 
+    elapsed = time.perf_counter() - start_time
+    logger.info(
+        f"Imported {added} new resumes, updated {updated} changed, {unchanged} unchanged, "
+        f"{len(failures)} errors in {elapsed:.2f}s ({len(pdf_files) / elapsed:.1f} files/s)"
+    )
+    for name, error in failures:
+        logger.warning(f"  {name}: {error}")
+    return True
+
 def main():
     """Main function to import dataset."""
+    parser = argparse.ArgumentParser(description="Import the hackathon dataset")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes used to parse resumes (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="Rows written per commit (default: 1000)")
+    parser.add_argument("--rescan", action="store_true",
+                        help="Hash every file instead of trusting unchanged sizes and mtimes in the import manifest")
+    args = parser.parse_args()
+    
     # Define paths to your dataset - Updated to actual location
     dataset_dir = Path("ai_job_screening/dataset")
     job_csv_path = dataset_dir / "job_description.csv"
@@ -223,15 +479,13 @@ def main():
         logger.error(f"Resumes directory not found: {resumes_dir}")
         return
     
-    # Get database session
-    db = next(get_db())
+    # Make sure newer tables and columns exist
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(Base.metadata)
     
     try:
-        # Import job descriptions
-        job_import_success = import_job_descriptions(job_csv_path, db)
-        
-        # Import resumes
-        resume_import_success = import_resumes(resumes_dir, db)
+        job_import_success = import_job_descriptions_bulk(job_csv_path, args.chunk_size, args.rescan)
+        resume_import_success = import_resumes_bulk(resumes_dir, args.workers, args.chunk_size, args.rescan)
         
         if job_import_success:
             logger.info("Job descriptions imported successfully")
@@ -245,8 +499,6 @@ def main():
             
     except Exception as e:
         logger.error(f"Error during import: {str(e)}")
-    finally:
-        db.close()
 
 if __name__ == "__main__":
     main()